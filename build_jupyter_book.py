@@ -1,55 +1,314 @@
 #!/usr/bin/env python
 import argparse
+import hashlib
+import json
 import os
 import pathlib
-import fnmatch
 import shutil
 
+from copy_build_artifacts import copy_build_artifacts, PATTERNS_TO_COPY
+
 
 _this_file = pathlib.Path(__file__).resolve()
 REPO_ROOT = _this_file.parent
 BOOK_DIR = pathlib.Path(REPO_ROOT, 'openmdao_book')
 
+# Location of the jupyter-cache used by jupyter-book, relative to the book directory.
+CACHE_DIR = pathlib.PurePath('_build', '.jupyter_cache')
+FINGERPRINT_FILE = 'openmdao_book_fingerprints.json'
+EXCLUDE_DIRS = ('_build', '_srcdocs', '.ipynb_checkpoints')
+
 
-def copy_build_artifacts(book_dir=BOOK_DIR):
+def _openmdao_version():
     """
-    Copy build artifacts (html files, images, etc) to the output _build directory.
+    Return the version string of the installed OpenMDAO, or 'none' if it is not installed.
+    """
+    try:
+        import openmdao
+    except ImportError:
+        return 'none'
+    return openmdao.__version__
+
+
+def notebook_fingerprint(nb_path, om_version=None, book_dir=None):
+    """
+    Return a hash of everything that determines the executed outputs of a notebook.
+
+    The hash covers the source of the code cells, the installed OpenMDAO version, the
+    helper scripts (e.g. extcode_*.py, paraboloid.py) that live next to the notebook and any
+    other files of the book that the notebook refers to (see notebook_deps.py).
+    Markdown cells are not included, so prose edits do not change the fingerprint.
+
+    Parameters
+    ----------
+    nb_path : str
+        Path to the notebook.
+    om_version : str or None
+        The OpenMDAO version string. If None, it will be determined from the installed package.
+    book_dir : str or None
+        The directory containing the Jupyter-Book. If given, the files of the book that the
+        notebook refers to are included in the hash.
+
+    Returns
+    -------
+    str
+        The hex digest of the fingerprint.
+    """
+    if om_version is None:
+        om_version = _openmdao_version()
+
+    nb_path = pathlib.Path(nb_path).resolve()
+    h = hashlib.sha256()
+    h.update(f'openmdao {om_version}\n'.encode())
+
+    with open(nb_path) as f:
+        nb = json.load(f)
+    for cell in nb['cells']:
+        if cell['cell_type'] == 'code':
+            h.update(''.join(cell['source']).encode())
+            h.update(b'\0')
+
+    for helper in helper_files(nb_path, book_dir):
+        h.update(helper.name.encode())
+        h.update(helper.read_bytes())
+
+    return h.hexdigest()
+
+
+def helper_files(nb_path, book_dir=None):
+    """
+    Return the files, other than the notebook itself, whose content may affect its outputs.
+
+    These are the Python files in the directory of the notebook and, if book_dir is given,
+    the other files of the book that the notebook refers to (see notebook_deps.py).
+
+    Parameters
+    ----------
+    nb_path : str
+        Path to the notebook.
+    book_dir : str or None
+        The directory containing the Jupyter-Book.
+
+    Returns
+    -------
+    list of pathlib.Path
+        The files, sorted.
+    """
+    from notebook_deps import notebook_dependencies
+
+    nb_path = pathlib.Path(nb_path).resolve()
+    helpers = set(nb_path.parent.glob('*.py'))
+    if book_dir is not None:
+        book_dir = pathlib.Path(book_dir).resolve()
+        files, _ = notebook_dependencies(nb_path, book_dir)
+        helpers.update(pathlib.Path(book_dir, f) for f in files)
+
+    return sorted(helpers)
+
+
+def collect_fingerprints(book_dir=BOOK_DIR):
+    """
+    Return the fingerprints of all notebooks under book_dir.
+
+    Parameters
+    ----------
+    book_dir : str
+        The directory containing the Jupyter-Book to be created.
+
+    Returns
+    -------
+    dict
+        Mapping of notebook path (relative to book_dir) to its fingerprint.
+    """
+    from notebook_runner import collect_filenames
+
+    om_version = _openmdao_version()
+    fingerprints = {}
+    for nb_path in collect_filenames(book_dir):
+        rel_path = pathlib.Path(nb_path).relative_to(book_dir).as_posix()
+        fingerprints[rel_path] = notebook_fingerprint(pathlib.Path(nb_path), om_version, book_dir)
+    return fingerprints
+
+
+def invalidate_stale_cache(book_dir=BOOK_DIR):
+    """
+    Remove cached executions of notebooks whose fingerprint changed since the last build.
+
+    jupyter-cache only keys on the code cells of a notebook, so a new OpenMDAO version or a
+    modified helper script would otherwise leave stale outputs in the book.
+
     Parameters
     ----------
     book_dir : str
         The directory containing the Jupyter-Book to be created.
+
+    Returns
+    -------
+    dict
+        The current fingerprints, to be saved with save_fingerprints after a successful build.
     """
-    PATTERNS_TO_COPY = ('*.html', '*.png')
-    TARGET_DIR = '_build'
-    EXCLUDE_DIRS = ('_build', '.ipynb_checkpoints')
+    import nbformat
+    from jupyter_cache import get_cache
+
+    cache_dir = pathlib.Path(book_dir, CACHE_DIR)
+    fingerprint_file = pathlib.Path(cache_dir, FINGERPRINT_FILE)
+
+    old_fingerprints = {}
+    if fingerprint_file.is_file():
+        with open(fingerprint_file) as f:
+            old_fingerprints = json.load(f)
 
-    for dirpath, dirs, files in os.walk(book_dir, topdown=True):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        rel_path = pathlib.PurePath(dirpath).parts[1:]
-        target_path = pathlib.PurePath(book_dir, TARGET_DIR, 'html', *rel_path)
-        files_to_copy = set()
-        for pattern in PATTERNS_TO_COPY:
-            files_to_copy |= set(fnmatch.filter(files, pattern))
-        for f in files_to_copy:
-            src = pathlib.PurePath(dirpath, f)
-            dst = pathlib.PurePath(target_path, f)
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            shutil.copyfile(src, dst)
+    fingerprints = collect_fingerprints(book_dir)
 
+    if old_fingerprints:
+        cache = get_cache(str(cache_dir))
+        for rel_path, fingerprint in fingerprints.items():
+            if old_fingerprints.get(rel_path) in (None, fingerprint):
+                continue
+            nb = nbformat.read(str(pathlib.Path(book_dir, rel_path)), as_version=4)
+            try:
+                record = cache.match_cache_notebook(nb)
+            except KeyError:
+                continue
+            print(f'Invalidating cached execution of {rel_path}')
+            cache.remove_cache(record.pk)
 
-def build_book(book_dir=BOOK_DIR, clean=True):
+    return fingerprints
+
+
+def save_fingerprints(fingerprints, book_dir=BOOK_DIR):
+    """
+    Save the notebook fingerprints next to the jupyter-cache of the book.
+
+    Parameters
+    ----------
+    fingerprints : dict
+        Mapping of notebook path (relative to book_dir) to its fingerprint.
+    book_dir : str
+        The directory containing the Jupyter-Book to be created.
+    """
+    cache_dir = pathlib.Path(book_dir, CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(pathlib.Path(cache_dir, FINGERPRINT_FILE), 'w') as f:
+        json.dump(fingerprints, f, indent=1, sort_keys=True)
+
+
+def clear_cache(book_dir=BOOK_DIR):
+    """
+    Remove the jupyter-cache of the book so that every notebook is executed on the next build.
+
+    Parameters
+    ----------
+    book_dir : str
+        The directory containing the Jupyter-Book to be created.
+    """
+    cache_dir = pathlib.Path(book_dir, CACHE_DIR)
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+
+
+def _write_cache_config(book_dir=BOOK_DIR):
+    """
+    Write a copy of the book's _config.yml with notebook execution switched to 'cache'.
+
+    Parameters
+    ----------
+    book_dir : str
+        The directory containing the Jupyter-Book to be created.
+
+    Returns
+    -------
+    pathlib.Path
+        The path of the generated config file.
+    """
+    import yaml
+
+    with open(pathlib.Path(book_dir, '_config.yml')) as f:
+        config = yaml.safe_load(f)
+
+    config.setdefault('execute', {})['execute_notebooks'] = 'cache'
+
+    config_path = pathlib.Path(book_dir, '_build', '_config_cache.yml')
+    os.makedirs(config_path.parent, exist_ok=True)
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+
+    return config_path
+
+
+def pre_execute(book_dir=BOOK_DIR, jobs=None):
+    """
+    Execute the notebooks missing from the jupyter-cache in parallel and add them to the cache.
+
+    The notebooks are executed by the warm kernel pool of notebook_runner, so jupyter-book
+    finds them in the cache and does not execute them one at a time with fresh kernels.
+    Notebooks that fail are left out of the cache so that jupyter-book reports the error.
+
+    Parameters
+    ----------
+    book_dir : str
+        The directory containing the Jupyter-Book to be created.
+    jobs : int or None
+        Number of worker processes. Defaults to the number of CPUs.
+    """
+    import nbformat
+    from jupyter_cache import get_cache
+    from jupyter_cache.base import NbBundleIn
+
+    from notebook_runner import collect_filenames, run_notebooks
+
+    cache = get_cache(str(pathlib.Path(book_dir, CACHE_DIR)))
+
+    to_execute = []
+    for nb_path in collect_filenames(book_dir):
+        try:
+            cache.match_cache_notebook(nbformat.read(nb_path, as_version=4))
+        except KeyError:
+            to_execute.append(nb_path)
+
+    if not to_execute:
+        return
+
+    print(f'Executing {len(to_execute)} notebooks')
+    results = run_notebooks(to_execute, book_dir=book_dir, jobs=jobs, return_notebook=True,
+                            keep=PATTERNS_TO_COPY)
+    for result in results:
+        if result['status'] == 'passed':
+            uri = str(pathlib.Path(book_dir, result['path']).resolve())
+            cache.cache_notebook_bundle(NbBundleIn(result['notebook'], uri),
+                                        check_validity=False, overwrite=True)
+
+
+def build_book(book_dir=BOOK_DIR, clean=True, cache=False, jobs=None):
     """
     Clean (if requested), build, and copy over necessary files for the JupyterBook to be created.
     Parameters
     ----------
-    book_dir
-    clean
+    book_dir : str
+        The directory containing the Jupyter-Book to be created.
+    clean : bool
+        If True, clean the old book out before building.
+    cache : bool
+        If True, only execute the notebooks whose code cells, helper scripts, or OpenMDAO
+        version changed since the last cached build.
+    jobs : int or None
+        If given (and cache is True), execute the notebooks that need it in this many worker
+        processes with pre-started kernels before handing over to jupyter-book.
     """
     save_cwd = os.getcwd()
     os.chdir(REPO_ROOT)
     if clean:
         os.system(f'jupyter-book clean {book_dir}')
-    os.system(f'jupyter-book build -W {book_dir}')
+    if cache:
+        fingerprints = invalidate_stale_cache(book_dir)
+        if jobs:
+            pre_execute(book_dir, jobs)
+        config_path = _write_cache_config(book_dir)
+        status = os.system(f'jupyter-book build -W --config {config_path} {book_dir}')
+        if status == 0:
+            save_fingerprints(fingerprints, book_dir)
+    else:
+        os.system(f'jupyter-book build -W {book_dir}')
     copy_build_artifacts(book_dir)
     os.chdir(save_cwd)
 
@@ -61,7 +320,19 @@ if __name__ == '__main__':
                         help='Clean the old book out before building (default is False).')
     parser.add_argument('-b', '--book', action='store', default='openmdao_book',
                         help="The name of the book to be built (default is 'openmdao_book').")
+    parser.add_argument('--cache', action='store_true',
+                        help='Only execute notebooks whose code, helper scripts, or OpenMDAO '
+                             'version changed since the last cached build (default is False).')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Remove all cached notebook executions before building '
+                             '(default is False).')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='With --cache, execute the notebooks that need it in this many '
+                             'processes with pre-started kernels (default is to let '
+                             'jupyter-book execute them serially).')
     args = parser.parse_args()
-    build_book(book_dir=args.book, clean=args.clean)
+    if args.clear_cache:
+        clear_cache(pathlib.Path(REPO_ROOT, args.book))
+    build_book(book_dir=args.book, clean=args.clean, cache=args.cache, jobs=args.jobs)
 
 
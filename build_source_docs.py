@@ -1,3 +1,4 @@
+import argparse
 import os
 import json
 
@@ -82,30 +83,41 @@ def _header_cell():
     return template
 
 
-def build_src_docs(top, dir, project_name='openmdao'):
-    # docs_dir = os.path.dirname(dir)
+_HEADER_NB = json.loads(_header_cell())
+
+
+def _notebook_text(source):
+    """
+    Return the text of a notebook whose single markdown cell contains source.
+    """
+    cell = dict(_HEADER_NB['cells'][0], source=source)
+    return json.dumps(dict(_HEADER_NB, cells=[cell]), indent=4)
 
-    doc_dir = os.path.join(top, "_srcdocs")
-    if os.path.isdir(doc_dir):
-        import shutil
-        shutil.rmtree(doc_dir)
 
-    if not os.path.isdir(doc_dir):
-        os.mkdir(doc_dir)
+def generate_src_docs(dir, project_name='openmdao'):
+    """
+    Generate the content of all source docs notebooks in memory.
 
-    packages_dir = os.path.join(doc_dir, "packages")
-    if not os.path.isdir(packages_dir):
-        os.mkdir(packages_dir)
+    Parameters
+    ----------
+    dir : str
+        The directory containing the OpenMDAO repository.
+    project_name : str
+        Name of the top level package.
 
-    index_filename = os.path.join(doc_dir, "index.ipynb")
-    index = open(index_filename, "w")
+    Returns
+    -------
+    dict
+        Mapping of file name (relative to the _srcdocs directory, with forward slashes) to the
+        text of the notebook.
+    """
+    files = {}
     index_data = index_top
 
     for package in packages:
         # a package is e.g. openmdao.core, that contains source files
         # a sub_package, is a src file, e.g. openmdao.core.component
         sub_packages = []
-        package_filename = os.path.join(packages_dir, package + ".ipynb")
         package_name = project_name + "." + package
 
         # the sub_listing is going into each package dir and listing what's in it
@@ -128,12 +140,7 @@ def build_src_docs(top, dir, project_name='openmdao'):
             link = f"(packages/{package}.md)\n"
             index_data += f"- {title}{link}"
 
-            # make subpkg directory (e.g. _srcdocs/packages/core) for ref sheets
-            package_dir = os.path.join(packages_dir, package)
-            os.mkdir(package_dir)
-
-            # create/write a package index file: (e.g. "_srcdocs/packages/openmdao.core.ipynb")
-            package_file = open(package_filename, "w")
+            # package index file: (e.g. "_srcdocs/packages/openmdao.core.ipynb")
             package_data = f"# {package_name}\n\n"
 
             for sub_package in sub_packages:
@@ -147,45 +154,137 @@ def build_src_docs(top, dir, project_name='openmdao'):
                     link = f"({package}/{sub_package}.md)\n"
                     package_data += f"- {title}{link}"
 
-                    # creates and writes out one reference sheet (e.g. core/component.ipynb)
-                    ref_sheet_filename = os.path.join(package_dir, sub_package + ".ipynb")
-                    ref_sheet = open(ref_sheet_filename, "w")
-
-                    # get the meat of the ref sheet code done
+                    # one reference sheet (e.g. packages/core/component.ipynb)
                     filename = sub_package + ".py"
-                    ref_sheet.write(_header_cell())
-                    ref_sheet.close()
-
-                    # Open the json file and fill in the template details
-                    with open(ref_sheet_filename, 'r+') as f:
-                        data = json.load(f)
-                        data['cells'][0]['source'] = header(filename,
-                                                            package_name + "." + sub_package)
-                        f.seek(0)
-                        json.dump(data, f, indent=4)
-                        f.truncate()
-
-            # finish and close each package file
-            package_file.write(_header_cell())
-            package_file.close()
-            with open(package_filename, 'r+') as f:
-                data = json.load(f)
-                data['cells'][0]['source'] = package_data
-                f.seek(0)
-                json.dump(data, f, indent=4)
-                f.truncate()
-            package_file.close()
-
-    # finish and close top-level index file
-    index.write(_header_cell())
-    index.close()
-    with open(index_filename, 'r+') as f:
-        data = json.load(f)
-        data['cells'][0]['source'] = index_data
-        f.seek(0)
-        json.dump(data, f, indent=4)
-        f.truncate()
-    index.close()
+                    files[f"packages/{package}/{sub_package}.ipynb"] = \
+                        _notebook_text(header(filename, package_name + "." + sub_package))
+
+            files[f"packages/{package}.ipynb"] = _notebook_text(package_data)
+
+    files["index.ipynb"] = _notebook_text(index_data)
+
+    return files
+
+
+def _write_if_changed(filename, text):
+    """
+    Write text to filename unless the file already has exactly that content.
+
+    Leaving unchanged files alone preserves their mtime, so Sphinx does not re-read them.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+    text : str
+        The new content of the file.
+
+    Returns
+    -------
+    bool
+        True if the file was written.
+    """
+    if os.path.isfile(filename):
+        with open(filename) as f:
+            if f.read() == text:
+                return False
+
+    with open(filename, "w") as f:
+        f.write(text)
+    return True
+
+
+def _remove_stale_files(doc_dir, keep):
+    """
+    Remove files (and then empty directories) under doc_dir that are not in keep.
+    """
+    for dirpath, dirs, files in os.walk(doc_dir, topdown=False):
+        for f in files:
+            filename = os.path.join(dirpath, f)
+            if filename not in keep:
+                os.remove(filename)
+        if dirpath != doc_dir and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+
+def write_src_docs(files, doc_dir, incremental=False, jobs=None):
+    """
+    Write the generated source docs notebooks, each with a single write.
+
+    Parameters
+    ----------
+    files : dict
+        Mapping of file name (relative to doc_dir) to the text of the notebook, as returned
+        by generate_src_docs.
+    doc_dir : str
+        The _srcdocs directory.
+    incremental : bool
+        If True, only rewrite files whose content changed and remove those that are no longer
+        generated, instead of starting from an empty doc_dir.
+    jobs : int or None
+        If given, write the files with this many threads.
+
+    Returns
+    -------
+    int
+        The number of files that were written.
+    """
+    if os.path.isdir(doc_dir) and not incremental:
+        import shutil
+        shutil.rmtree(doc_dir)
+
+    filenames = {os.path.join(doc_dir, *name.split('/')): text for name, text in files.items()}
+    for dirname in {os.path.dirname(f) for f in filenames}:
+        os.makedirs(dirname, exist_ok=True)
+
+    if jobs:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            n_written = sum(executor.map(_write_if_changed, filenames, filenames.values()))
+    else:
+        n_written = sum(map(_write_if_changed, filenames, filenames.values()))
+
+    if incremental:
+        _remove_stale_files(doc_dir, filenames)
+
+    return n_written
+
+
+def build_src_docs(top, dir, project_name='openmdao', incremental=False, jobs=None):
+    """
+    Generate the source docs notebooks for all packages.
+
+    Parameters
+    ----------
+    top : str
+        The directory of the book, in which the _srcdocs directory is created.
+    dir : str
+        The directory containing the OpenMDAO repository.
+    project_name : str
+        Name of the top level package.
+    incremental : bool
+        If True, only rewrite generated files whose content changed and remove those that
+        are no longer generated, instead of starting from an empty _srcdocs directory.
+        Unchanged files keep their mtime, so Sphinx can skip their autodoc pages.
+    jobs : int or None
+        If given, write the files with this many threads.
+    """
+    doc_dir = os.path.join(top, "_srcdocs")
+    files = generate_src_docs(dir, project_name)
+    n_written = write_src_docs(files, doc_dir, incremental=incremental, jobs=jobs)
+
+    if incremental:
+        print(f"Source docs: {n_written} of {len(files)} files updated.")
+
 
 if __name__ == '__main__':
-    build_src_docs("openmdao_book/", "openmdao_book/OpenMDAO/")
+    parser = argparse.ArgumentParser(description='Generate the source docs notebooks.')
+    parser.add_argument('-i', '--incremental', action='store_true',
+                        help='Only rewrite the source docs that changed instead of regenerating '
+                             'all of them (default is False).')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Write the files with this many threads (default is to write them '
+                             'serially).')
+    args = parser.parse_args()
+    build_src_docs("openmdao_book/", "openmdao_book/OpenMDAO/", incremental=args.incremental,
+                   jobs=args.jobs)
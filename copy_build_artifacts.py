@@ -1,36 +1,183 @@
 #!/usr/bin/env python
+import argparse
+import concurrent.futures
+import hashlib
 import os
 import pathlib
 import fnmatch
 import shutil
 
-def copy_build_artifacts(book_dir='openmdao_book'):
+PATTERNS_TO_COPY = ('*.html', '*.png')
+TARGET_DIR = '_build'
+EXCLUDE_DIRS = ('_build', '.ipynb_checkpoints')
+
+# ioctl request that asks the filesystem (e.g. btrfs, xfs) for a copy-on-write clone on Linux.
+FICLONE = 0x40049409
+
+
+def _file_hash(fname):
+    """
+    Return the sha256 digest of the contents of a file.
+    """
+    h = hashlib.sha256()
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+def _up_to_date(src, dst, check_hash=False):
+    """
+    Return True if dst already holds the contents of src.
+
+    Parameters
+    ----------
+    src : str
+        The source file.
+    dst : str
+        The destination file.
+    check_hash : bool
+        If True, compare file contents instead of modification times.
+
+    Returns
+    -------
+    bool
+        True if src does not need to be copied.
+    """
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+
+    src_stat = os.stat(src)
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        # dst is a hard link to src
+        return True
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if check_hash:
+        return _file_hash(src) == _file_hash(dst)
+    # copies keep the modification time of their source (see _copy_file)
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def _reflink(src, dst):
+    """
+    Create dst as a copy-on-write clone of src, raising OSError if that is not supported.
+    """
+    import fcntl
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+
+def _copy_file(src, dst, link=None, check_hash=False):
+    """
+    Copy src to dst unless dst is already up to date.
+
+    Parameters
+    ----------
+    src : str
+        The source file.
+    dst : str
+        The destination file.
+    link : str or None
+        'hard' to hard link and 'reflink' to clone the file instead of copying it. Falls back
+        to a regular copy if the link cannot be made (e.g. across filesystems).
+    check_hash : bool
+        If True, compare file contents instead of modification times to detect changes.
+
+    Returns
+    -------
+    tuple of (bool, int)
+        Whether the file was copied and its size in bytes.
+    """
+    size = os.path.getsize(src)
+    if _up_to_date(src, dst, check_hash):
+        return False, size
+
+    if os.path.lexists(dst):
+        os.remove(dst)
+
+    try:
+        if link == 'hard':
+            os.link(src, dst)
+        elif link == 'reflink':
+            _reflink(src, dst)
+        else:
+            shutil.copy2(src, dst)
+    except (OSError, ImportError):
+        if os.path.lexists(dst):
+            os.remove(dst)
+        shutil.copy2(src, dst)
+
+    return True, size
+
+
+def copy_build_artifacts(book_dir='openmdao_book', jobs=None, link=None, check_hash=False):
     """
     Copy build artifacts (html files, images, etc) to the output _build directory.
+
+    Files whose destination already matches (same size and modification time, or same
+    contents if check_hash is True) are skipped, and the rest are copied concurrently.
+
     Parameters
     ----------
     book_dir : str
         The directory containing the Jupyter-Book to be created.
-    """
-    PATTERNS_TO_COPY = ('*.html', '*.png')
-    TARGET_DIR = '_build'
-    EXCLUDE_DIRS = ('_build', '.ipynb_checkpoints')
+    jobs : int or None
+        Number of threads used to copy files. Defaults to a number based on the CPU count.
+    link : str or None
+        'hard' to hard link and 'reflink' to clone files instead of copying them.
+    check_hash : bool
+        If True, compare file contents instead of modification times to detect changes.
 
+    Returns
+    -------
+    dict
+        Number of files and bytes that were 'copied' and 'skipped'.
+    """
+    copies = []
     for dirpath, dirs, files in os.walk(book_dir, topdown=True):
         dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        rel_path = pathlib.PurePath(dirpath).parts[1:]
+        rel_path = pathlib.PurePath(dirpath).relative_to(book_dir).parts
         target_path = pathlib.PurePath(book_dir, TARGET_DIR, 'html', *rel_path)
         files_to_copy = set()
         for pattern in PATTERNS_TO_COPY:
             files_to_copy |= set(fnmatch.filter(files, pattern))
+        if files_to_copy:
+            os.makedirs(target_path, exist_ok=True)
         for f in files_to_copy:
-            src = pathlib.PurePath(dirpath, f)
-            dst = pathlib.PurePath(target_path, f)
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            shutil.copyfile(src, dst)
+            copies.append((pathlib.PurePath(dirpath, f), pathlib.PurePath(target_path, f)))
 
+    stats = {'copied': 0, 'copied_bytes': 0, 'skipped': 0, 'skipped_bytes': 0}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_copy_file, src, dst, link, check_hash) for src, dst in copies]
+        for future in futures:
+            copied, size = future.result()
+            key = 'copied' if copied else 'skipped'
+            stats[key] += 1
+            stats[key + '_bytes'] += size
 
-if __name__ == '__main__':
-    copy_build_artifacts('openmdao_book')
+    print(f"Build artifacts: copied {stats['copied']} files ({stats['copied_bytes']} bytes), "
+          f"skipped {stats['skipped']} up to date files ({stats['skipped_bytes']} bytes).")
 
+    return stats
 
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Copy build artifacts (html files, images) '
+                                                 'into the _build directory of the book.')
+    parser.add_argument('-b', '--book', action='store', default='openmdao_book',
+                        help="The name of the book (default is 'openmdao_book').")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of threads used to copy files.')
+    parser.add_argument('--link', choices=['hard', 'reflink'], default=None,
+                        help='Hard link or reflink (copy-on-write clone) the files instead of '
+                             'copying them, falling back to a copy where that is not possible.')
+    parser.add_argument('--hash', action='store_true',
+                        help='Compare file contents instead of modification times to decide '
+                             'which files are up to date.')
+    args = parser.parse_args()
+    copy_build_artifacts(args.book, jobs=args.jobs, link=args.link, check_hash=args.hash)
@@ -0,0 +1,348 @@
+"""
+A cache of the outputs and kernel state of the code cells of a notebook.
+
+Each code cell gets a key that hashes its source and tags with the key of the code cell before
+it, starting from a key of the environment (the Python version, the versions of all installed
+packages, such as OpenMDAO, NumPy and SciPy, and the helper files of the notebook, see
+build_jupyter_book.helper_files). A cell's key therefore only stays the same if neither it nor
+any cell before it changed.
+
+When a notebook is executed again, the cells before the first changed cell have their stored
+outputs replayed instead of being executed. To continue from there, the kernel needs the state
+those cells left behind, so after each code cell that takes a while, the variables of the user
+namespace are pickled with dill and the files written in the working directory are copied.
+Execution resumes after the last such snapshot before the first changed cell, or from the
+beginning if there is none.
+
+A snapshot is only kept if it can be loaded back, and many objects cannot be pickled (open
+files, database connections and, at the moment, OpenMDAO Problems and their systems), so
+notebooks that create a Problem usually resume from before its creation. A notebook in which
+no cell changed is replayed entirely without executing anything. Module-level state, such as
+the global NumPy random generator, is not part of a snapshot.
+"""
+import functools
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import shutil
+import sys
+
+# Only take a snapshot after code cells that took at least this many seconds; cheaper cells are
+# executed again instead.
+SNAPSHOT_MIN_TIME = 1.0
+
+# Snapshots of the user namespace larger than this many bytes are not kept.
+SNAPSHOT_MAX_SIZE = 200 * 1024 * 1024
+
+INDEX_FILE = 'cells.json'
+STATE_FILE = 'state.pkl'
+FILES_DIR = 'files'
+
+# Executed in the kernel to pickle the variables of the user namespace. The snapshot is only
+# written if it can be loaded back. Names starting with an underscore (IPython's output
+# history and the runner's own variables) are left out.
+SNAPSHOT_CODE = """\
+try:
+    import dill as _nbr_dill
+    _nbr_shell = get_ipython()
+    _nbr_data = _nbr_dill.dumps({{_nbr_k: _nbr_v for _nbr_k, _nbr_v in _nbr_shell.user_ns.items()
+                                  if not _nbr_k.startswith('_')
+                                  and _nbr_k not in _nbr_shell.user_ns_hidden}})
+    if len(_nbr_data) > {max_size}:
+        raise ValueError(f'the snapshot takes {{len(_nbr_data)}} bytes')
+    _nbr_dill.loads(_nbr_data)
+except Exception as _nbr_err:
+    print('unrestorable', type(_nbr_err).__name__)
+else:
+    with open({path!r}, 'wb') as _nbr_f:
+        _nbr_f.write(_nbr_data)
+    print('saved', len(_nbr_data))
+    del _nbr_f
+for _nbr_k in ('_nbr_dill', '_nbr_shell', '_nbr_data', '_nbr_err', '_nbr_k', '_nbr_v'):
+    globals().pop(_nbr_k, None)
+"""
+
+# Executed in the kernel to load a snapshot into the user namespace and continue the execution
+# count after the replayed cells.
+RESTORE_CODE = """\
+import dill as _nbr_dill
+with open({path!r}, 'rb') as _nbr_f:
+    get_ipython().user_ns.update(_nbr_dill.load(_nbr_f))
+get_ipython().execution_count = {count}
+del _nbr_dill, _nbr_f
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def installed_packages():
+    """
+    Return the name and version of every package installed in this Python environment.
+
+    Returns
+    -------
+    str
+        One 'name==version' line per package, sorted by name.
+    """
+    packages = set()
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata['Name']
+        if name:
+            packages.add(f"{name.lower()}=={dist.version}\n")
+    return ''.join(sorted(packages))
+
+
+def environment_key(nb_path, book_dir=None):
+    """
+    Return a hash of everything other than the code cells that determines the outputs.
+
+    Parameters
+    ----------
+    nb_path : str
+        Path to the notebook.
+    book_dir : str or None
+        The directory containing the Jupyter-Book. If given, the files of the book that the
+        notebook refers to are included in the hash.
+
+    Returns
+    -------
+    str
+        The hex digest of the key.
+    """
+    from build_jupyter_book import _openmdao_version, helper_files
+
+    h = hashlib.sha256()
+    h.update(f'openmdao {_openmdao_version()}\n'.encode())
+    h.update(f'python {sys.version_info[0]}.{sys.version_info[1]}\n'.encode())
+    # the outputs depend on more than OpenMDAO, e.g. NumPy changes how arrays are printed
+    h.update(installed_packages().encode())
+    for helper in helper_files(nb_path, book_dir):
+        h.update(helper.name.encode())
+        h.update(helper.read_bytes())
+
+    return h.hexdigest()
+
+
+def cell_keys(nb, env_key):
+    """
+    Return the key of each cell of a notebook.
+
+    Parameters
+    ----------
+    nb : dict
+        The notebook.
+    env_key : str
+        The key of the environment, see environment_key.
+
+    Returns
+    -------
+    list of str or None
+        The key of each code cell, and None for the other cells.
+    """
+    keys = []
+    key = env_key
+    for cell in nb['cells']:
+        if cell['cell_type'] != 'code':
+            keys.append(None)
+            continue
+
+        source = cell['source']
+        if isinstance(source, list):
+            source = ''.join(source)
+        tags = cell.get('metadata', {}).get('tags', [])
+
+        h = hashlib.sha256(key.encode())
+        h.update(b'\0')
+        h.update(source.encode())
+        h.update(b'\0')
+        h.update(json.dumps(sorted(tags)).encode())
+        key = h.hexdigest()
+        keys.append(key)
+
+    return keys
+
+
+def _copy_written_files(run_path, nb_dir, dest):
+    """
+    Copy the files written by the notebook in its private working directory to dest.
+
+    Symlinks into the book are skipped, and so are the copies of the files of the notebook's
+    own directory that were not modified.
+    """
+    for dirpath, dirs, files in os.walk(run_path):
+        rel_dir = pathlib.Path(dirpath).relative_to(run_path)
+        for name in files:
+            src = pathlib.Path(dirpath, name)
+            if src.is_symlink():
+                continue
+            orig = pathlib.Path(nb_dir, rel_dir, name)
+            if orig.is_file():
+                src_stat = src.stat()
+                orig_stat = orig.stat()
+                if (src_stat.st_size, src_stat.st_mtime) == (orig_stat.st_size,
+                                                             orig_stat.st_mtime):
+                    continue
+            os.makedirs(dest / rel_dir, exist_ok=True)
+            shutil.copy2(src, dest / rel_dir / name)
+
+
+class CellCache(object):
+    """
+    The cached outputs and snapshots of the code cells of one notebook.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of the cache of all notebooks.
+    nb_path : str
+        Path to the notebook.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+    min_snapshot_time : float
+        Only take a snapshot after code cells that took at least this many seconds.
+
+    Attributes
+    ----------
+    replayed : int
+        Number of code cells whose outputs were replayed from the cache.
+    """
+
+    def __init__(self, cache_dir, nb_path, book_dir, min_snapshot_time=SNAPSHOT_MIN_TIME):
+        nb_path = pathlib.Path(nb_path).resolve()
+        book_dir = pathlib.Path(book_dir).resolve()
+        self.nb_dir = nb_path.parent
+        self.cache_dir = pathlib.Path(cache_dir, nb_path.relative_to(book_dir))
+        self.env_key = environment_key(nb_path, book_dir)
+        self.min_snapshot_time = min_snapshot_time
+        self.replayed = 0
+        self._keys = None
+        self._entries = {}
+        self._new_entries = {}
+
+        index_file = self.cache_dir / INDEX_FILE
+        if index_file.is_file():
+            try:
+                with open(index_file) as f:
+                    self._entries = json.load(f)
+            except ValueError:
+                # a corrupt index is the same as an empty cache
+                pass
+
+    def restore(self, kernel, nb, path):
+        """
+        Replay the cells of the notebook that are in the cache and restore the kernel state.
+
+        Parameters
+        ----------
+        kernel : WarmKernel
+            The kernel that will execute the rest of the notebook.
+        nb : NotebookNode
+            The notebook. The outputs and execution counts of the replayed cells are set.
+        path : pathlib.Path
+            The working directory of the notebook. Files saved with the snapshot are copied
+            into it.
+
+        Returns
+        -------
+        int
+            Index of the first cell to execute.
+        """
+        self._keys = cell_keys(nb, self.env_key)
+
+        first_changed = len(nb.cells)
+        for index, key in enumerate(self._keys):
+            if key is not None and key not in self._entries:
+                first_changed = index
+                break
+
+        start = 0
+        if first_changed == len(nb.cells):
+            start = first_changed
+        else:
+            for index in range(first_changed - 1, -1, -1):
+                key = self._keys[index]
+                if key is not None and self._entries[key]['snapshot'] and \
+                        (self.cache_dir / key / STATE_FILE).is_file():
+                    start = index + 1
+                    break
+
+        if start == 0:
+            return 0
+
+        import nbformat
+
+        count = 0
+        for index in range(start):
+            key = self._keys[index]
+            if key is None:
+                continue
+            entry = self._entries[key]
+            nb.cells[index].outputs = [nbformat.from_dict(out) for out in entry['outputs']]
+            nb.cells[index].execution_count = entry['execution_count']
+            count = entry['execution_count'] or count
+            self._new_entries[key] = entry
+            self.replayed += 1
+
+        if start < len(nb.cells):
+            snapshot = self.cache_dir / self._keys[start - 1]
+            if (snapshot / FILES_DIR).is_dir():
+                shutil.copytree(snapshot / FILES_DIR, path, dirs_exist_ok=True)
+            kernel.run_code(RESTORE_CODE.format(path=str(snapshot / STATE_FILE),
+                                                count=count + 1))
+
+        return start
+
+    def store(self, kernel, index, cell, wall_time, path):
+        """
+        Record the outputs of a code cell that was executed, and take a snapshot if it was slow.
+
+        Parameters
+        ----------
+        kernel : WarmKernel
+            The kernel that executed the cell.
+        index : int
+            Index of the cell in the notebook.
+        cell : NotebookNode
+            The executed cell.
+        wall_time : float
+            The time the cell took to execute.
+        path : pathlib.Path
+            The working directory of the notebook.
+        """
+        key = self._keys[index]
+        snapshot = False
+
+        if wall_time >= self.min_snapshot_time:
+            snapshot_dir = self.cache_dir / key
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+            os.makedirs(snapshot_dir)
+            out = kernel.run_code(SNAPSHOT_CODE.format(path=str(snapshot_dir / STATE_FILE),
+                                                       max_size=SNAPSHOT_MAX_SIZE))
+            text = ''.join(o.get('text', '') for o in out.outputs if o.output_type == 'stream')
+            snapshot = text.startswith('saved')
+            if snapshot:
+                _copy_written_files(path, self.nb_dir, snapshot_dir / FILES_DIR)
+            else:
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+        self._new_entries[key] = {
+            'outputs': cell.outputs,
+            'execution_count': cell.execution_count,
+            'snapshot': snapshot,
+        }
+
+    def save(self):
+        """
+        Write the entries of the cells of the last execution, and remove the stale ones.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        tmp_file = self.cache_dir / (INDEX_FILE + '.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(self._new_entries, f)
+        os.replace(tmp_file, self.cache_dir / INDEX_FILE)
+
+        for entry in self.cache_dir.iterdir():
+            if entry.is_dir() and not self._new_entries.get(entry.name, {}).get('snapshot'):
+                shutil.rmtree(entry, ignore_errors=True)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+import argparse
+import ast
+import functools
+import importlib.util
+import json
+import os
+import pathlib
+import re
+import subprocess
+import sys
+
+from notebook_runner import BOOK_DIR, REPO_ROOT, collect_filenames
+
+
+# Suffixes of files that a notebook refers to by name. References to such files are kept
+# even if the file does not exist, so that a notebook still depends on a deleted helper.
+DATA_SUFFIXES = ('.py', '.ipynb', '.json', '.csv', '.txt', '.dat', '.yml', '.yaml', '.npy',
+                 '.npz', '.pkl')
+
+# Lines of IPython magics and shell escapes, which are not valid Python.
+MAGIC_RE = re.compile(r'^\s*(%%?|!)(.*)$')
+
+
+def _split_magics(source):
+    """
+    Separate a code cell into Python source and the arguments of its magics.
+
+    Parameters
+    ----------
+    source : str
+        The source of the code cell.
+
+    Returns
+    -------
+    tuple of (str, list of str)
+        The source with each magic line blanked out, and the text of the magic lines
+        (e.g. 'run paraboloid.py' or 'openmdao tree ../circuit.py').
+    """
+    lines = []
+    magics = []
+    for line in source.splitlines():
+        match = MAGIC_RE.match(line)
+        if match:
+            magics.append(match.group(2))
+            lines.append('')
+        else:
+            lines.append(line)
+    return '\n'.join(lines), magics
+
+
+def _resolve_file(name, base_dir, book_dir, missing=False):
+    """
+    Return the book-relative path of name if it names a file in the book.
+
+    If missing is True, the path is returned even if the file does not exist (e.g. a helper
+    that has been deleted), as long as it names a file of a type that notebooks read.
+    """
+    if not name or len(name) > 255 or '\n' in name:
+        return None
+    path = pathlib.Path(os.path.normpath(pathlib.Path(base_dir, name)))
+    try:
+        rel_path = path.relative_to(book_dir)
+        if path.is_file() or (missing and path.suffix in DATA_SUFFIXES and
+                              not path.exists() and not re.search(r'[*?[]', name)):
+            return rel_path.as_posix()
+    except (ValueError, OSError):
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _is_installed(module):
+    """
+    Return True if the top-level package of a module can be found outside the book.
+    """
+    try:
+        return importlib.util.find_spec(module.partition('.')[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def scan_source(source, base_dir, book_dir=BOOK_DIR):
+    """
+    Statically find the files and modules that a piece of code depends on.
+
+    Imports of modules that exist next to the code (e.g. 'import paraboloid') and string
+    literals or magic arguments that name files in the book (e.g. 'extcode_mach.py',
+    '%run ../circuit.py') are reported as files; all other imports are reported as modules.
+    Files that no longer exist are reported as well, so that the code depends on a helper
+    after it has been deleted or renamed.
+
+    Parameters
+    ----------
+    source : str
+        The code, which may contain IPython magics.
+    base_dir : str
+        The directory the code is executed in.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+
+    Returns
+    -------
+    tuple of (set, set)
+        Book-relative paths of the files and the names of the modules the code depends on.
+    """
+    base_dir = pathlib.Path(base_dir).resolve()
+    book_dir = pathlib.Path(book_dir).resolve()
+    files = set()
+    modules = set()
+
+    code, magics = _split_magics(source)
+
+    names = []
+    for magic in magics:
+        names.extend(magic.split())
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        # fall back to anything that looks like a file name
+        names.extend(re.findall(r'[\w./\\-]+\.\w+', code))
+        tree = None
+
+    if tree is not None:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.module and not node.level:
+                    modules.add(node.module)
+                    modules.update(f'{node.module}.{alias.name}' for alias in node.names)
+            elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+                names.extend(node.value.split())
+
+    for name in names:
+        rel_path = _resolve_file(name.strip('\'"'), base_dir, book_dir, missing=True)
+        if rel_path is not None:
+            files.add(rel_path)
+
+    # imports of modules that live next to the code are file dependencies, and so are
+    # top-level imports that cannot be found at all, which are most likely of a deleted helper
+    for module in list(modules):
+        rel_path = _resolve_file(module.replace('.', '/') + '.py', base_dir, book_dir,
+                                 missing='.' not in module and not _is_installed(module))
+        if rel_path is not None:
+            files.add(rel_path)
+            modules.discard(module)
+
+    return files, modules
+
+
+def notebook_dependencies(nb_path, book_dir=BOOK_DIR):
+    """
+    Return the files and modules that the code cells of a notebook depend on.
+
+    Python files found this way are scanned as well, so that the dependencies of helper
+    scripts (e.g. the modules imported by sellar.py) are included.
+
+    Parameters
+    ----------
+    nb_path : str
+        Path to the notebook.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+
+    Returns
+    -------
+    tuple of (set, set)
+        Book-relative paths of the files and the names of the modules the notebook depends on.
+    """
+    nb_path = pathlib.Path(nb_path)
+    book_dir = pathlib.Path(book_dir).resolve()
+
+    with open(nb_path) as f:
+        nb = json.load(f)
+    source = '\n'.join(''.join(cell['source']) for cell in nb['cells']
+                       if cell['cell_type'] == 'code')
+
+    files, modules = scan_source(source, nb_path.parent, book_dir)
+
+    to_scan = [f for f in files if f.endswith('.py')]
+    while to_scan:
+        helper = pathlib.Path(book_dir, to_scan.pop())
+        if not helper.is_file():
+            continue
+        with open(helper) as f:
+            helper_files, helper_modules = scan_source(f.read(), helper.parent, book_dir)
+        to_scan.extend(f for f in helper_files - files if f.endswith('.py'))
+        files |= helper_files
+        modules |= helper_modules
+
+    return files, modules
+
+
+def build_graph(book_dir=BOOK_DIR):
+    """
+    Return the dependency graph of all notebooks in the book.
+
+    Parameters
+    ----------
+    book_dir : str
+        The directory containing the Jupyter-Book.
+
+    Returns
+    -------
+    dict
+        Mapping of the book-relative path of each notebook to a dict with the sorted lists of
+        the 'files' and 'modules' it depends on.
+    """
+    book_dir = pathlib.Path(book_dir).resolve()
+    graph = {}
+    for nb_path in collect_filenames(book_dir):
+        files, modules = notebook_dependencies(nb_path, book_dir)
+        rel_path = pathlib.Path(nb_path).relative_to(book_dir).as_posix()
+        graph[rel_path] = {'files': sorted(files), 'modules': sorted(modules)}
+    return graph
+
+
+def _path_to_module(path):
+    """
+    Return the dotted module name of a python file path such as openmdao/core/group.py.
+    """
+    parts = list(pathlib.PurePosixPath(path).with_suffix('').parts)
+    if parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+
+def affected_notebooks(graph, changed, book_dir=BOOK_DIR):
+    """
+    Return the notebooks that must be re-executed because of the changed files.
+
+    Parameters
+    ----------
+    graph : dict
+        The dependency graph returned by build_graph.
+    changed : iter of str
+        Paths of the changed files. Paths inside the book may be relative to the repository
+        root or to the book. Python files outside the book are matched against the modules
+        the notebooks import, so changed files of an OpenMDAO checkout (e.g.
+        'openmdao/test_suite/components/sellar.py') can be passed as well.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+
+    Returns
+    -------
+    list of str
+        Sorted book-relative paths of the affected notebooks.
+    """
+    book_dir = pathlib.Path(book_dir).resolve()
+    try:
+        book_prefix = book_dir.relative_to(REPO_ROOT).as_posix() + '/'
+    except ValueError:
+        book_prefix = None
+
+    changed_files = set()
+    changed_modules = set()
+    for path in changed:
+        path = pathlib.PurePath(path).as_posix()
+        if book_prefix and path.startswith(book_prefix):
+            path = path[len(book_prefix):]
+        changed_files.add(path)
+        if path.endswith('.py'):
+            changed_modules.add(_path_to_module(path))
+
+    affected = []
+    for nb, deps in graph.items():
+        if nb in changed_files or changed_files.intersection(deps['files']) or \
+                changed_modules.intersection(deps['modules']):
+            affected.append(nb)
+
+    return sorted(affected)
+
+
+def changed_since(ref, repo_dir=REPO_ROOT):
+    """
+    Return the files that differ between the git revision ref and the working tree.
+
+    Untracked files that are not ignored are included, since a new helper file or notebook
+    is not known to git diff until it has been added.
+
+    Parameters
+    ----------
+    ref : str
+        A git revision, e.g. 'origin/main'.
+    repo_dir : str
+        The git repository.
+
+    Returns
+    -------
+    list of str
+        Paths of the changed files, relative to the repository root.
+    """
+    changed = []
+    for cmd in (['git', 'diff', '--name-only', ref, '--'],
+                ['git', 'ls-files', '--others', '--exclude-standard', '--full-name']):
+        out = subprocess.run(cmd, cwd=repo_dir, check=True, capture_output=True,
+                             text=True).stdout
+        changed.extend(out.splitlines())
+    return changed
+
+
+def notebook_deps_cmd():
+    """
+    Print the notebooks affected by a set of changed files, or the whole dependency graph.
+    """
+    parser = argparse.ArgumentParser(description='Find the notebooks that depend on changed '
+                                                 'files.')
+    parser.add_argument('files', nargs='*',
+                        help='Changed files, relative to the repository root.')
+    parser.add_argument('--since', action='store', default=None,
+                        help="Use the files changed since this git revision (e.g. 'origin/main').")
+    parser.add_argument('-b', '--book', action='store', default=str(BOOK_DIR),
+                        help="The directory of the book (default is 'openmdao_book').")
+    parser.add_argument('--graph', action='store_true',
+                        help='Print the dependency graph of all notebooks as JSON.')
+    args = parser.parse_args()
+
+    graph = build_graph(args.book)
+
+    if args.graph:
+        json.dump(graph, sys.stdout, indent=1)
+        print()
+        return
+
+    changed = list(args.files)
+    if args.since:
+        changed.extend(changed_since(args.since))
+
+    for nb in affected_notebooks(graph, changed, args.book):
+        print(pathlib.Path(args.book, nb))
+
+
+if __name__ == '__main__':
+    notebook_deps_cmd()
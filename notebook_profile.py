@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+"""
+Profiles of the notebooks executed by notebook_runner, and a report of the hottest OpenMDAO
+functions across the book.
+
+Each notebook is profiled with cProfile, which writes a file that pstats (or a viewer such as
+snakeviz) can read. Optionally, the notebooks that build a Problem are profiled with OpenMDAO's
+iprofile instead, which times the OpenMDAO methods of each system, solver and driver instance
+and writes a file that 'openmdao iprof_totals' and 'openmdao view_iprof' can read. iprofile
+can only be set up once in a process, so those notebooks are executed in a new kernel.
+
+Only the code cells of the notebook are profiled, not the code that notebook_runner executes
+in the kernel between them. The profile of a notebook with '%%px' cells only covers its
+kernel, not the MPI engines.
+"""
+import argparse
+import collections
+import json
+import os
+import pathlib
+import pstats
+import re
+import sys
+
+CPROFILE_SUFFIX = '.prof'
+IPROFILE_SUFFIX = '.iprof'
+
+# Name of the cProfile file merging the profiles of all notebooks, written next to the report.
+MERGED_FILE = 'book.prof'
+REPORT_FILE = 'report.txt'
+
+# Number of functions listed in each table of the report.
+REPORT_TOP = 30
+
+# Executed in the kernel before the first cell of a notebook. The profiler is turned on and off
+# around each cell of the notebook by IPython's cell events. The code executed by the runner
+# itself is run without storing history, which is how it is told apart.
+CPROFILE_START_CODE = """\
+import cProfile as _nbr_cProfile
+_nbr_profiler = _nbr_cProfile.Profile()
+def _nbr_profile_on(info):
+    if info.store_history:
+        _nbr_profiler.enable()
+def _nbr_profile_off(result):
+    if result.info.store_history:
+        _nbr_profiler.disable()
+get_ipython().events.register('pre_run_cell', _nbr_profile_on)
+get_ipython().events.register('post_run_cell', _nbr_profile_off)
+del _nbr_cProfile
+"""
+
+# pstats can't read an empty profile, so none is written for a notebook without code cells.
+CPROFILE_STOP_CODE = """\
+get_ipython().events.unregister('pre_run_cell', _nbr_profile_on)
+get_ipython().events.unregister('post_run_cell', _nbr_profile_off)
+_nbr_profiler.disable()
+_nbr_profiler.create_stats()
+if _nbr_profiler.stats:
+    _nbr_profiler.dump_stats({filename!r})
+del _nbr_profiler, _nbr_profile_on, _nbr_profile_off
+"""
+
+IPROFILE_START_CODE = """\
+from openmdao.devtools import iprofile as _nbr_iprofile
+_nbr_iprofile.setup(finalize=False)
+def _nbr_profile_on(info):
+    if info.store_history:
+        _nbr_iprofile.start()
+def _nbr_profile_off(result):
+    if result.info.store_history:
+        _nbr_iprofile.stop()
+get_ipython().events.register('pre_run_cell', _nbr_profile_on)
+get_ipython().events.register('post_run_cell', _nbr_profile_off)
+"""
+
+# iprofile writes 'iprof.0' in the current directory, which the notebook may have changed.
+IPROFILE_STOP_CODE = """\
+import os as _nbr_os, shutil as _nbr_shutil
+get_ipython().events.unregister('pre_run_cell', _nbr_profile_on)
+get_ipython().events.unregister('post_run_cell', _nbr_profile_off)
+_nbr_os.chdir({path!r})
+_nbr_iprofile._finalize_profile()
+_nbr_iprofile._profile_out.close()
+_nbr_shutil.move('iprof.0', {filename!r})
+del _nbr_os, _nbr_shutil, _nbr_iprofile, _nbr_profile_on, _nbr_profile_off
+"""
+
+# A call to a Problem constructor in a code cell, e.g. 'om.Problem(' or 'Problem(model=...'.
+_PROBLEM_RE = re.compile(r'\bProblem\s*\(')
+
+# The part of a path inside the openmdao package, e.g. 'openmdao/core/group.py'.
+_OPENMDAO_FILE_RE = re.compile(r'[/\\](openmdao[/\\](?!.*[/\\]openmdao[/\\]).*)$')
+
+# The method in an iprofile function name, e.g. 'Group._setup_procs' in
+# 'cycle.<Group._setup_procs>' or 'Problem._setup' in '<Problem#1._setup>'.
+_IPROF_METHOD_RE = re.compile(r'<([^<>#:]+)(?:[#:]\d+)?\.([^<>.]+)>$')
+
+
+def builds_problem(nb_path):
+    """
+    Return True if a code cell of the notebook creates a Problem.
+
+    Parameters
+    ----------
+    nb_path : str
+        Path to the notebook.
+
+    Returns
+    -------
+    bool
+        True if the notebook builds a Problem.
+    """
+    with open(nb_path) as f:
+        nb = json.load(f)
+    for cell in nb['cells']:
+        if cell['cell_type'] == 'code' and _PROBLEM_RE.search(''.join(cell['source'])):
+            return True
+    return False
+
+
+class NotebookProfiler(object):
+    """
+    Profiles the execution of one notebook in a kernel.
+
+    Parameters
+    ----------
+    profile_dir : str
+        The directory of the profiles of all notebooks. The profile of the notebook is written
+        to the same relative path in it as the notebook in the book.
+    nb_path : str
+        Path to the notebook.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+    instance : bool
+        If True and the notebook builds a Problem, profile it with iprofile instead of cProfile.
+
+    Attributes
+    ----------
+    kind : str
+        'cprofile' or 'iprofile'.
+    filename : pathlib.Path
+        The profile file written when the notebook has been executed.
+    """
+
+    def __init__(self, profile_dir, nb_path, book_dir, instance=False):
+        nb_path = pathlib.Path(nb_path).resolve()
+        rel_path = nb_path.relative_to(pathlib.Path(book_dir).resolve())
+        if instance and builds_problem(nb_path):
+            self.kind = 'iprofile'
+            suffix = IPROFILE_SUFFIX
+        else:
+            self.kind = 'cprofile'
+            suffix = CPROFILE_SUFFIX
+        self.filename = pathlib.Path(profile_dir, rel_path).with_suffix(suffix).resolve()
+
+    @property
+    def needs_new_kernel(self):
+        """
+        Return True if the notebook must be executed in a kernel of its own.
+        """
+        return self.kind == 'iprofile'
+
+    def start(self, kernel):
+        """
+        Start profiling the cells executed by the kernel.
+
+        Parameters
+        ----------
+        kernel : WarmKernel
+            The kernel that is about to execute the notebook.
+        """
+        os.makedirs(self.filename.parent, exist_ok=True)
+        if self.filename.exists():
+            self.filename.unlink()
+        kernel.run_code(IPROFILE_START_CODE if self.kind == 'iprofile' else CPROFILE_START_CODE)
+
+    def stop(self, kernel, path):
+        """
+        Stop profiling and write the profile file.
+
+        Parameters
+        ----------
+        kernel : WarmKernel
+            The kernel that executed the notebook.
+        path : pathlib.Path
+            The working directory of the notebook.
+        """
+        if self.kind == 'iprofile':
+            code = IPROFILE_STOP_CODE.format(path=str(path), filename=str(self.filename))
+        else:
+            code = CPROFILE_STOP_CODE.format(filename=str(self.filename))
+        kernel.run_code(code)
+
+
+def _openmdao_file(filename):
+    """
+    Return the path of a file relative to the directory above the openmdao package, or None.
+    """
+    match = _OPENMDAO_FILE_RE.search(filename)
+    if match is None or 'openmdao_book' in filename:
+        return None
+    return match.group(1).replace('\\', '/')
+
+
+def cprofile_totals(filenames):
+    """
+    Add up the time spent in each OpenMDAO function over several cProfile files.
+
+    Parameters
+    ----------
+    filenames : iter of str
+        The cProfile files, one for each notebook.
+
+    Returns
+    -------
+    dict
+        A dict for each function, keyed by its name (e.g.
+        'openmdao/core/group.py:100(_setup_procs)'), with the number of 'calls', the time
+        spent in the function itself ('tottime'), the time spent in it and the functions it
+        called ('cumtime'), the number of 'notebooks' that called it and the notebook in
+        which it took the most cumulative time ('top_notebook').
+    """
+    totals = {}
+    for filename in filenames:
+        stats = pstats.Stats(str(filename)).stats
+        for (path, line, name), (_, ncalls, tottime, cumtime, _) in stats.items():
+            path = _openmdao_file(path)
+            if path is None:
+                continue
+            func = f'{path}:{line}({name})'
+            tot = totals.get(func)
+            if tot is None:
+                totals[func] = tot = {'calls': 0, 'tottime': 0., 'cumtime': 0., 'notebooks': 0,
+                                      'top_notebook': None, '_top_time': -1.}
+            tot['calls'] += ncalls
+            tot['tottime'] += tottime
+            tot['cumtime'] += cumtime
+            tot['notebooks'] += 1
+            if cumtime > tot['_top_time']:
+                tot['top_notebook'] = str(filename)
+                tot['_top_time'] = cumtime
+
+    for tot in totals.values():
+        del tot['_top_time']
+
+    return totals
+
+
+def iprofile_totals(filenames):
+    """
+    Add up the time spent in each OpenMDAO method over several iprofile files.
+
+    Parameters
+    ----------
+    filenames : iter of str
+        The iprofile files, one for each notebook.
+
+    Returns
+    -------
+    dict
+        A dict for each method, keyed by its class and name (e.g. 'Group._setup_procs'), with
+        the number of 'calls', the time spent in it over all instances ('cumtime'), the number
+        of 'notebooks' that called it and the notebook in which it took the most time
+        ('top_notebook'). The time of a call made while the same method was already running
+        (e.g. on a subgroup) is only counted once.
+    """
+    totals = {}
+    for filename in filenames:
+        times = collections.defaultdict(float)
+        calls = collections.defaultdict(int)
+        with open(filename) as f:
+            for line in f:
+                funcpath, count, elapsed = line.split()
+                methods = []
+                for func in funcpath.split('|')[1:]:
+                    match = _IPROF_METHOD_RE.search(func)
+                    methods.append(match.group(1) + '.' + match.group(2) if match else func)
+                if not methods:
+                    continue
+                method = methods[-1]
+                calls[method] += int(count)
+                if method not in methods[:-1]:
+                    times[method] += float(elapsed)
+
+        for method, count in calls.items():
+            tot = totals.get(method)
+            if tot is None:
+                totals[method] = tot = {'calls': 0, 'cumtime': 0., 'notebooks': 0,
+                                        'top_notebook': None, '_top_time': -1.}
+            tot['calls'] += count
+            tot['cumtime'] += times[method]
+            tot['notebooks'] += 1
+            if times[method] > tot['_top_time']:
+                tot['top_notebook'] = str(filename)
+                tot['_top_time'] = times[method]
+
+    for tot in totals.values():
+        del tot['_top_time']
+
+    return totals
+
+
+def find_profiles(profile_dir):
+    """
+    Return the profile files under a directory.
+
+    Parameters
+    ----------
+    profile_dir : str
+        The directory given to notebook_runner with --profile.
+
+    Returns
+    -------
+    list of pathlib.Path
+        The cProfile and iprofile files of the notebooks, sorted.
+    """
+    profile_dir = pathlib.Path(profile_dir)
+    return sorted(p for p in profile_dir.rglob('*')
+                  if p.suffix in (CPROFILE_SUFFIX, IPROFILE_SUFFIX) and p.name != MERGED_FILE)
+
+
+def profile_report(filenames, profile_dir, out=sys.stdout, top=REPORT_TOP):
+    """
+    Write a report of the hottest OpenMDAO functions in the given profiles.
+
+    The cProfile files are also merged into MERGED_FILE in profile_dir.
+
+    Parameters
+    ----------
+    filenames : iter of str
+        The profile files of the notebooks.
+    profile_dir : str
+        The directory containing the profile files. Notebooks are named relative to it.
+    out : file-like
+        Where the report is written.
+    top : int
+        Number of functions listed in each table.
+    """
+    profile_dir = pathlib.Path(profile_dir).resolve()
+    filenames = [pathlib.Path(f).resolve() for f in filenames]
+    cprofiles = [f for f in filenames if f.suffix == CPROFILE_SUFFIX]
+    iprofiles = [f for f in filenames if f.suffix == IPROFILE_SUFFIX]
+
+    def rel(filename):
+        return pathlib.Path(filename).relative_to(profile_dir).with_suffix('.ipynb').as_posix()
+
+    if cprofiles:
+        merged = pstats.Stats(str(cprofiles[0]))
+        for filename in cprofiles[1:]:
+            merged.add(str(filename))
+        merged.dump_stats(str(profile_dir / MERGED_FILE))
+
+        totals = cprofile_totals(cprofiles)
+        out.write(f"cProfile of {len(cprofiles)} notebooks, merged into {MERGED_FILE}\n")
+        for key, title in (('tottime', 'own time'), ('cumtime', 'cumulative time')):
+            out.write(f"\nOpenMDAO functions with the most {title}:\n")
+            out.write(f"{'calls':>10}{'tottime':>10}{'cumtime':>10}{'notebooks':>11}  function\n")
+            if not totals:
+                out.write("  (none)\n")
+            for func, tot in sorted(totals.items(), key=lambda t: t[1][key], reverse=True)[:top]:
+                out.write(f"{tot['calls']:10d}{tot['tottime']:10.3f}{tot['cumtime']:10.3f}"
+                          f"{tot['notebooks']:11d}  {func}\n")
+                out.write(f"{'':41}  most in {rel(tot['top_notebook'])}\n")
+
+    if iprofiles:
+        if cprofiles:
+            out.write('\n')
+        totals = iprofile_totals(iprofiles)
+        out.write(f"iprofile of {len(iprofiles)} notebooks\n")
+        out.write("\nOpenMDAO methods with the most time, over all instances:\n")
+        out.write(f"{'calls':>10}{'time':>10}{'notebooks':>11}  method\n")
+        for method, tot in sorted(totals.items(), key=lambda t: t[1]['cumtime'],
+                                  reverse=True)[:top]:
+            out.write(f"{tot['calls']:10d}{tot['cumtime']:10.3f}{tot['notebooks']:11d}  "
+                      f"{method}\n")
+            out.write(f"{'':31}  most in {rel(tot['top_notebook'])}\n")
+
+
+def notebook_profile_cmd():
+    """
+    Write the report of the profiles found in the directory given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Report the hottest OpenMDAO functions in the '
+                                                 'notebook profiles written by notebook_runner.')
+    parser.add_argument('profile_dir', help="The directory given to 'notebook_runner.py "
+                                            "--profile'.")
+    parser.add_argument('-n', '--top', type=int, default=REPORT_TOP,
+                        help=f'Number of functions listed in each table (default is '
+                             f'{REPORT_TOP}).')
+    parser.add_argument('-o', '--output', action='store', default=None,
+                        help='Write the report to this file instead of stdout.')
+    args = parser.parse_args()
+
+    filenames = find_profiles(args.profile_dir)
+    if not filenames:
+        print(f"No profiles found in '{args.profile_dir}'.", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            profile_report(filenames, args.profile_dir, f, args.top)
+    else:
+        profile_report(filenames, args.profile_dir, top=args.top)
+
+
+if __name__ == '__main__':
+    sys.exit(notebook_profile_cmd())
@@ -0,0 +1,1175 @@
+#!/usr/bin/env python
+import argparse
+import atexit
+import concurrent.futures
+import csv
+import fnmatch
+import json
+import multiprocessing
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+_this_file = pathlib.Path(__file__).resolve()
+REPO_ROOT = _this_file.parent
+BOOK_DIR = pathlib.Path(REPO_ROOT, 'openmdao_book')
+
+TIMEOUT = 600
+KERNEL = 'python3'
+EXCLUDE_DIRS = set(['_build', '_srcdocs', '.ipynb_checkpoints'])
+
+# Number of notebooks a warm kernel executes before it is replaced by a fresh one.
+MAX_KERNEL_USES = 20
+
+# Executed once in every warm kernel, so that the notebooks don't pay for these imports.
+WARMUP_CODE = """\
+import numpy
+import scipy
+import scipy.optimize
+import scipy.sparse
+import openmdao.api as om
+"""
+
+# Executed in a warm kernel before each notebook. Moves to the working directory of the
+# notebook (first, since %reset needs a current directory and the previous one may have been
+# removed), clears the user namespace, forgets modules imported from the book or a previous
+# working directory (e.g. paraboloid.py exists in several places) and restarts the execution
+# count.
+RESET_CODE = """\
+import os as _nbr_os
+_nbr_os.chdir({path!r})
+%reset -f
+import os as _nbr_os, sys as _nbr_sys
+for _nbr_name, _nbr_mod in list(_nbr_sys.modules.items()):
+    _nbr_file = getattr(_nbr_mod, '__file__', None)
+    if _nbr_file and _nbr_os.path.realpath(_nbr_file).startswith({prefixes!r}):
+        del _nbr_sys.modules[_nbr_name]
+del _nbr_os, _nbr_sys, _nbr_name, _nbr_mod, _nbr_file
+get_ipython().execution_count = 1
+"""
+
+# Executed once in every kernel after the warmup code, to save the process-wide state that
+# notebooks commonly change and that %reset does not clear.
+SAVE_STATE_CODE = """\
+import os as _nbr_os, random as _nbr_random, sys as _nbr_sys, warnings as _nbr_warnings
+import numpy as _nbr_numpy
+get_ipython()._nbr_state = {
+    'environ': dict(_nbr_os.environ),
+    'path': list(_nbr_sys.path),
+    'filters': list(_nbr_warnings.filters),
+    'printoptions': _nbr_numpy.get_printoptions(),
+    'errstate': _nbr_numpy.geterr(),
+    'random': _nbr_random.getstate(),
+    'numpy_random': _nbr_numpy.random.get_state(),
+}
+del _nbr_os, _nbr_random, _nbr_sys, _nbr_warnings, _nbr_numpy
+"""
+
+# Executed in a warm kernel after RESET_CODE, so that a notebook sees the same environment
+# variables, sys.path, warnings filters (and warnings not shown yet), NumPy print options and
+# error handling, random states and matplotlib rcParams as in a fresh kernel.
+RESTORE_STATE_CODE = """\
+import os as _nbr_os, random as _nbr_random, sys as _nbr_sys, warnings as _nbr_warnings
+import numpy as _nbr_numpy
+_nbr_state = get_ipython()._nbr_state
+_nbr_os.environ.clear()
+_nbr_os.environ.update(_nbr_state['environ'])
+_nbr_sys.path[:] = _nbr_state['path']
+_nbr_warnings.filters[:] = _nbr_state['filters']
+_nbr_warnings._filters_mutated()
+_nbr_numpy.set_printoptions(**_nbr_state['printoptions'])
+_nbr_numpy.seterr(**_nbr_state['errstate'])
+_nbr_random.setstate(_nbr_state['random'])
+_nbr_numpy.random.set_state(_nbr_state['numpy_random'])
+if 'matplotlib.pyplot' in _nbr_sys.modules:
+    _nbr_sys.modules['matplotlib.pyplot'].close('all')
+if 'matplotlib' in _nbr_sys.modules:
+    _nbr_sys.modules['matplotlib'].rc_file_defaults()
+del _nbr_os, _nbr_random, _nbr_sys, _nbr_warnings, _nbr_numpy, _nbr_state
+"""
+
+# Executed in the kernel after each cell to measure its CPU time (including subprocesses such
+# as external codes) and peak resident set size.
+PROBE_CODE = """\
+import resource as _nbr_resource
+_nbr_self = _nbr_resource.getrusage(_nbr_resource.RUSAGE_SELF)
+_nbr_children = _nbr_resource.getrusage(_nbr_resource.RUSAGE_CHILDREN)
+print(_nbr_self.ru_utime + _nbr_self.ru_stime + _nbr_children.ru_utime + _nbr_children.ru_stime,
+      _nbr_self.ru_maxrss)
+del _nbr_resource, _nbr_self, _nbr_children
+"""
+
+# A notebook is flagged as a regression if it is this many times slower than its baseline.
+SLOWDOWN_THRESHOLD = 2.0
+
+# Notebooks faster than this (in seconds) in the baseline are too noisy to compare.
+MIN_BASELINE_TIME = 1.0
+
+# Number of MPI engines of the cluster started for the notebooks with '%%px' cells. The DOE
+# examples split their cases over up to 4 processes.
+MPI_ENGINES = 4
+
+# Profile the MPI notebooks connect to, with 'Client(profile="mpi")'.
+MPI_PROFILE = 'mpi'
+
+# Time in seconds to wait for the engines of the cluster to register.
+CLUSTER_TIMEOUT = 120
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+_RSS_TO_MB = 1.0 / 1024 ** 2 if sys.platform == 'darwin' else 1.0 / 1024
+
+_worker_kernel = None
+
+
+def collect_filenames(book_dir=BOOK_DIR):
+    """
+    Return filenames of notebooks under book_dir.
+
+    Notebooks matching the exclude_patterns of the book's _config.yml are left out, since
+    they are not part of the book.
+
+    Parameters
+    ----------
+    book_dir : str
+        The directory containing the Jupyter-Book to be created.
+
+    Yields
+    ------
+    str
+        The name of a notebook.
+
+    """
+    patterns = book_exclude_patterns(book_dir)
+    for dirpath, dirs, files in os.walk(book_dir, topdown=True):
+        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+        for f in files:
+            if f.endswith('.ipynb'):
+                nb_path = pathlib.PurePath(dirpath, f)
+                if not is_excluded(nb_path.relative_to(book_dir).as_posix(), patterns):
+                    yield str(nb_path)
+
+
+def book_exclude_patterns(book_dir=BOOK_DIR):
+    """
+    Return the exclude_patterns of the _config.yml of a book.
+
+    Parameters
+    ----------
+    book_dir : str
+        The directory containing the Jupyter-Book.
+
+    Returns
+    -------
+    list of str
+        The patterns, or an empty list if the book has no config file.
+    """
+    config_path = pathlib.Path(book_dir, '_config.yml')
+    if not config_path.is_file():
+        return []
+
+    import yaml
+
+    with open(config_path) as f:
+        config = yaml.safe_load(f) or {}
+    return list(config.get('exclude_patterns') or [])
+
+
+def is_excluded(rel_path, patterns):
+    """
+    Return True if a file of the book matches any of the given exclude patterns.
+
+    A pattern is matched against the path of the file relative to the book, where '*' also
+    matches '/', and a pattern without a '/' (e.g. 'template.ipynb') is also matched against
+    the name of the file and of each of its directories.
+
+    Parameters
+    ----------
+    rel_path : str
+        Path of the file relative to the book, with '/' separators.
+    patterns : iter of str
+        The exclude patterns, see book_exclude_patterns.
+
+    Returns
+    -------
+    bool
+        True if the file is excluded from the book.
+    """
+    parts = rel_path.split('/')
+    for pattern in patterns:
+        if fnmatch.fnmatch(rel_path, pattern):
+            return True
+        if '/' not in pattern and any(fnmatch.fnmatch(part, pattern) for part in parts):
+            return True
+    return False
+
+
+def needs_cluster(nb_path):
+    """
+    Return True if the notebook runs cells on an ipyparallel cluster.
+
+    Parameters
+    ----------
+    nb_path : str
+        Path to the notebook.
+
+    Returns
+    -------
+    bool
+        True if any code cell starts with the '%%px' cell magic.
+    """
+    try:
+        with open(nb_path, encoding='utf-8') as f:
+            cells = json.load(f)['cells']
+    except Exception:
+        return False
+
+    for cell in cells:
+        source = cell['source']
+        if isinstance(source, list):
+            source = ''.join(source)
+        if cell['cell_type'] == 'code' and source.lstrip().startswith('%%px'):
+            return True
+    return False
+
+
+class LocalCluster(object):
+    """
+    An ipyparallel cluster of MPI engines, started for the notebooks that need one.
+
+    The notebooks connect to it with 'Client(profile="mpi")', as they do to the cluster started
+    by hand with 'ipcluster start -n 4 --profile=mpi'. Between notebooks, the engines are moved
+    to the working directory of the next notebook and their namespace is cleared.
+
+    Parameters
+    ----------
+    num_engines : int
+        Number of MPI engines.
+    profile : str
+        Name of the IPython profile the notebooks connect to.
+    timeout : float
+        Time in seconds to wait for the engines to register.
+    """
+
+    def __init__(self, num_engines=MPI_ENGINES, profile=MPI_PROFILE, timeout=CLUSTER_TIMEOUT):
+        self.num_engines = num_engines
+        self.profile = profile
+        self.timeout = timeout
+        self._cluster = None
+        self._client = None
+
+    def start(self):
+        """
+        Start the controller and the engines, and wait for all the engines to register.
+        """
+        import ipyparallel
+
+        # stop the cluster left behind by an interrupted run, whose controller would keep the
+        # new engines from registering
+        try:
+            stale = ipyparallel.Cluster.from_file(profile=self.profile, cluster_id='')
+        except FileNotFoundError:
+            pass
+        else:
+            stale.stop_cluster_sync()
+
+        # an empty cluster_id writes the 'ipcontroller-client.json' file that
+        # Client(profile=...) looks for
+        self._cluster = ipyparallel.Cluster(n=self.num_engines, engines='mpi',
+                                            profile=self.profile, cluster_id='')
+        self._cluster.start_cluster_sync()
+        self._client = self._cluster.connect_client_sync()
+        self._client.wait_for_engines(self.num_engines, timeout=self.timeout)
+
+    def prepare(self, path):
+        """
+        Move the engines to the given directory and clear their namespace.
+
+        Parameters
+        ----------
+        path : str
+            The working directory of the next notebook.
+        """
+        view = self._client[:]
+        # move first, since the directory of the previous notebook may have been removed
+        view.apply_sync(os.chdir, str(path))
+        view.execute('%reset -f', block=True)
+
+    def apply(self, func, *args, **kwargs):
+        """
+        Call a function on every engine and return the results, in the order of the engines.
+
+        Parameters
+        ----------
+        func : function
+            The function to call.
+        *args : list
+            Positional arguments of func.
+        **kwargs : dict
+            Keyword arguments of func.
+
+        Returns
+        -------
+        list
+            The value returned by func on each engine.
+        """
+        return self._client[:].apply_sync(func, *args, **kwargs)
+
+    def stop(self):
+        """
+        Stop the engines and the controller.
+        """
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self._cluster is not None:
+            self._cluster.stop_cluster_sync()
+            self._cluster = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def mirror_book(book_dir, nb_dir, work_root):
+    """
+    Create a private working directory for a notebook inside work_root.
+
+    The directory of the notebook is recreated under work_root at the same relative location
+    within the book. Its files and subdirectories are copied so that anything the notebook
+    writes stays private, while every other entry of the book (and of each parent directory) is
+    symlinked so that relative references such as '../circuit.py' keep working.
+
+    Parameters
+    ----------
+    book_dir : pathlib.Path
+        The directory containing the Jupyter-Book.
+    nb_dir : pathlib.Path
+        The directory containing the notebook.
+    work_root : pathlib.Path
+        The (empty) directory in which the mirror is created.
+
+    Returns
+    -------
+    pathlib.Path
+        The working directory in which the notebook should be executed.
+    """
+    src = book_dir
+    dst = work_root
+    for part in nb_dir.relative_to(book_dir).parts:
+        for entry in src.iterdir():
+            if entry.name != part and entry.name not in EXCLUDE_DIRS:
+                os.symlink(entry, dst / entry.name)
+        src = src / part
+        dst = dst / part
+        dst.mkdir()
+
+    for entry in src.iterdir():
+        if entry.name in EXCLUDE_DIRS:
+            continue
+        if entry.is_dir():
+            shutil.copytree(entry, dst / entry.name, symlinks=True,
+                            ignore=shutil.ignore_patterns(*EXCLUDE_DIRS))
+        else:
+            shutil.copy2(entry, dst / entry.name)
+
+    return dst
+
+
+def skip_traceback(traceback):
+    """
+    Return True if a failure with the given traceback should not be reported as an error.
+
+    If SNOPT is not available during PR builds, then don't raise an error.
+    SNOPT is only available during merge to main.
+
+    Parameters
+    ----------
+    traceback : str
+        The traceback of the failed cell.
+
+    Returns
+    -------
+    bool
+        True if the failure should be ignored.
+    """
+    GITHUB_EV = os.environ.get("GITHUB_EVENT_NAME")
+    PR = GITHUB_EV and GITHUB_EV == "pull_request"
+    return bool(PR and 'Optimizer SNOPT is not available' in traceback)
+
+
+class WarmKernel(object):
+    """
+    A kernel that is started once, imports OpenMDAO up front and executes many notebooks.
+
+    The user namespace and the process-wide state saved when the kernel starts (see
+    RESTORE_STATE_CODE) are reset between notebooks, and the kernel is replaced by a fresh one
+    after max_uses notebooks, or after a notebook times out or kills it.
+
+    Parameters
+    ----------
+    kernel_name : str
+        Name of the kernel.
+    timeout : int
+        Maximum time in seconds that a single cell may take to execute.
+    max_uses : int
+        Number of notebooks executed before the kernel is replaced.
+    warmup_code : str
+        Code executed when the kernel is started.
+    clear_prefixes : tuple of str
+        Modules imported from files under these paths are removed from sys.modules of the
+        kernel before each notebook.
+
+    Attributes
+    ----------
+    uses : int
+        Number of notebooks executed by the current kernel.
+    """
+
+    def __init__(self, kernel_name=KERNEL, timeout=TIMEOUT, max_uses=MAX_KERNEL_USES,
+                 warmup_code=WARMUP_CODE, clear_prefixes=()):
+        self.kernel_name = kernel_name
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.warmup_code = warmup_code
+        self.clear_prefixes = tuple(str(p) for p in clear_prefixes) + \
+            (os.path.realpath(tempfile.gettempdir()),)
+        self.uses = 0
+        self._client = None
+
+    def start(self):
+        """
+        Start the kernel and run the warmup code.
+        """
+        import nbformat
+        from nbclient import NotebookClient
+
+        client = NotebookClient(nbformat.v4.new_notebook(), timeout=int(self.timeout),
+                                kernel_name=self.kernel_name)
+        client.create_kernel_manager()
+        client.start_new_kernel(cwd=tempfile.gettempdir())
+        client.start_new_kernel_client()
+        self._client = client
+        self.uses = 0
+        if self.warmup_code:
+            self.run_code(self.warmup_code)
+        self.run_code(SAVE_STATE_CODE)
+
+    def shutdown(self):
+        """
+        Shut down the kernel, if it is running.
+        """
+        if self._client is not None:
+            try:
+                self._client._cleanup_kernel()
+            except Exception:
+                pass
+            self._client = None
+
+    def run_code(self, code):
+        """
+        Execute code in the kernel without touching the notebook being executed.
+
+        Parameters
+        ----------
+        code : str
+            The code to execute.
+
+        Returns
+        -------
+        NotebookNode
+            The executed cell, including its outputs.
+        """
+        import nbformat
+
+        client = self._client
+        save_nb = client.nb
+        client.nb = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell(code)])
+        try:
+            return client.execute_cell(client.nb.cells[0], 0, store_history=False)
+        finally:
+            client.nb = save_nb
+
+    def probe(self):
+        """
+        Return the CPU time and peak resident set size of the kernel process.
+
+        Returns
+        -------
+        tuple of (float, float)
+            The CPU time in seconds (including finished subprocesses) and the peak RSS in MB,
+            or (None, None) if they cannot be measured on this platform.
+        """
+        if resource is None:
+            return None, None
+        cell = self.run_code(PROBE_CODE)
+        text = ''.join(out.get('text', '') for out in cell.outputs if out.output_type == 'stream')
+        cpu_time, max_rss = text.split()
+        return float(cpu_time), float(max_rss) * _RSS_TO_MB
+
+    def execute(self, nb, path, cells=None, cell_cache=None, profiler=None):
+        """
+        Execute all cells of a notebook in place.
+
+        Parameters
+        ----------
+        nb : NotebookNode
+            The notebook to execute.
+        path : str
+            The working directory for the notebook.
+        cells : list or None
+            If given, a dict with the 'index', 'wall_time', 'cpu_time' and 'peak_rss' of each
+            executed code cell is appended to it.
+        cell_cache : CellCache or None
+            If given, the cells found in this cache are replayed instead of executed, and the
+            executed code cells are added to it.
+        profiler : NotebookProfiler or None
+            If given, the executed cells are profiled and the profile is written when the
+            notebook has been executed, also if a cell raised an error.
+        """
+        if self._client is not None and self.uses >= self.max_uses:
+            self.shutdown()
+        if self._client is None:
+            self.start()
+
+        self.uses += 1
+        self.run_code(RESET_CODE.format(prefixes=self.clear_prefixes, path=str(path)) +
+                      RESTORE_STATE_CODE)
+
+        client = self._client
+        client.nb = nb
+        client.reset_execution_trackers()
+
+        first = 0
+        if cell_cache is not None:
+            first = cell_cache.restore(self, nb, path)
+
+        if profiler is None:
+            self._execute_cells(nb, path, first, cells, cell_cache)
+            return
+
+        from nbclient.exceptions import CellExecutionError
+
+        profiler.start(self)
+        try:
+            self._execute_cells(nb, path, first, cells, cell_cache)
+        except CellExecutionError:
+            # the kernel is still usable after an error in a cell
+            profiler.stop(self, path)
+            raise
+        profiler.stop(self, path)
+
+    def _execute_cells(self, nb, path, first, cells, cell_cache):
+        """
+        Execute the cells of a notebook from index first, see execute.
+        """
+        client = self._client
+
+        if cells is not None:
+            cpu_time, _ = self.probe()
+
+        for index, cell in enumerate(nb.cells):
+            if index < first:
+                continue
+
+            if cell.cell_type != 'code' or (cells is None and cell_cache is None):
+                client.execute_cell(cell, index)
+                continue
+
+            start = time.perf_counter()
+            try:
+                client.execute_cell(cell, index)
+            finally:
+                wall_time = time.perf_counter() - start
+                if cells is not None:
+                    prev_cpu_time = cpu_time
+                    try:
+                        cpu_time, peak_rss = self.probe()
+                    except Exception:
+                        # The kernel timed out or died, let the original error propagate.
+                        cpu_time = peak_rss = None
+                    cells.append({
+                        'index': index,
+                        'wall_time': wall_time,
+                        'cpu_time': None if None in (cpu_time, prev_cpu_time)
+                        else cpu_time - prev_cpu_time,
+                        'peak_rss': peak_rss,
+                    })
+
+            if cell_cache is not None:
+                cell_cache.store(self, index, cell, wall_time, path)
+
+
+def _init_worker(kernel_name, timeout, book_dir):
+    """
+    Start a warm kernel in a worker process of the pool.
+    """
+    global _worker_kernel
+    _worker_kernel = WarmKernel(kernel_name=kernel_name, timeout=timeout,
+                                clear_prefixes=(os.path.realpath(book_dir),))
+    _worker_kernel.start()
+    atexit.register(_worker_kernel.shutdown)
+
+
+def _run_in_worker(nb_path, book_dir, timeout, kernel_name, isolate, keep, return_notebook,
+                   cell_cache, profile, instance_profile):
+    """
+    Execute a notebook with the warm kernel of this worker process.
+    """
+    return run_notebook(nb_path, book_dir=book_dir, timeout=timeout, kernel_name=kernel_name,
+                        isolate=isolate, keep=keep, return_notebook=return_notebook,
+                        kernel=_worker_kernel, cell_cache=cell_cache, profile=profile,
+                        instance_profile=instance_profile)
+
+
+def run_notebook(nb_path, book_dir=BOOK_DIR, timeout=TIMEOUT, kernel_name=KERNEL, isolate=True,
+                 keep=(), return_notebook=False, kernel=None, cluster=None, cell_cache=None,
+                 profile=None, instance_profile=False):
+    """
+    Execute a single notebook and return a summary of the execution.
+
+    The current working directory of this process is never changed. The notebook is executed
+    in its own directory or, if isolate is True, in a private mirror of that directory
+    so that notebooks sharing a directory can be executed concurrently.
+
+    Parameters
+    ----------
+    nb_path : str
+        Path to the notebook.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+    timeout : int
+        Maximum time in seconds that a single cell may take to execute.
+    kernel_name : str
+        Name of the kernel used to execute the notebook.
+    isolate : bool
+        If True, execute the notebook in a private copy of its directory.
+    keep : iter of str
+        Glob patterns of files written by an isolated notebook (e.g. '*.html') that are
+        copied back into the notebook's directory.
+    return_notebook : bool
+        If True, the executed notebook is included in the result under 'notebook'.
+    kernel : WarmKernel or None
+        A running kernel to execute the notebook with. If None, a new kernel is started
+        and shut down afterwards.
+    cluster : LocalCluster or None
+        A running cluster whose engines are prepared for this notebook before it is executed.
+    cell_cache : str or None
+        Directory of a cell cache (see notebook_cell_cache.py). If given, the code cells that
+        did not change since the notebook was last executed with this cache are replayed
+        instead of executed where possible. Only used if isolate is True and the notebook
+        does not need a cluster.
+    profile : str or None
+        If given, the notebook is profiled and its profile is written to this directory (see
+        notebook_profile.py). The cell cache is not used, since replayed cells are not
+        profiled.
+    instance_profile : bool
+        If True and the notebook builds a Problem, profile it with OpenMDAO's iprofile instead
+        of cProfile. Such a notebook is executed in a new kernel.
+
+    Returns
+    -------
+    dict
+        Summary of the execution with keys 'path', 'status' ('passed', 'failed' or
+        'skipped'), 'message', 'wall_time', 'cpu_time', 'peak_rss' and 'cells' (the
+        timing of each executed code cell). CPU times are in seconds and peak RSS in MB.
+        The peak RSS of a warm kernel includes the notebooks it executed before.
+        With a cell cache, the number of replayed code cells is given under 'cached_cells'.
+        When profiled, the path of the profile file is given under 'profile', or None if it
+        was not written.
+    """
+    import nbformat
+    from nbclient.exceptions import CellExecutionError
+
+    nb_path = pathlib.Path(nb_path).resolve()
+    book_dir = pathlib.Path(book_dir).resolve()
+    result = {
+        'path': nb_path.relative_to(book_dir).as_posix(),
+        'status': 'passed',
+        'message': '',
+        'wall_time': 0.0,
+        'cpu_time': None,
+        'peak_rss': None,
+        'cells': [],
+    }
+
+    try:
+        nb = nbformat.read(str(nb_path), as_version=4)
+    except Exception as err:
+        result['status'] = 'failed'
+        result['message'] = f'Unable to parse notebook: {err}'
+        return result
+
+    profiler = None
+    if profile is not None:
+        from notebook_profile import NotebookProfiler
+        profiler = NotebookProfiler(profile, nb_path, book_dir, instance_profile)
+        cell_cache = None
+
+    owns_kernel = kernel is None or (profiler is not None and profiler.needs_new_kernel)
+    if owns_kernel:
+        kernel = WarmKernel(kernel_name=kernel_name, timeout=timeout, warmup_code='')
+
+    work_root = tempfile.mkdtemp(prefix='nb_') if isolate else None
+    try:
+        if isolate:
+            run_path = mirror_book(book_dir, nb_path.parent, pathlib.Path(work_root))
+        else:
+            run_path = nb_path.parent
+
+        if cluster is not None:
+            cluster.prepare(run_path)
+
+        cache = None
+        if cell_cache is not None and isolate and not needs_cluster(nb_path):
+            from notebook_cell_cache import CellCache
+            cache = CellCache(cell_cache, nb_path, book_dir)
+
+        start = time.perf_counter()
+        try:
+            kernel.execute(nb, run_path, cells=result['cells'], cell_cache=cache,
+                           profiler=profiler)
+        except CellExecutionError as err:
+            if skip_traceback(err.traceback):
+                result['status'] = 'skipped'
+            else:
+                result['status'] = 'failed'
+            result['message'] = err.traceback
+        except TimeoutError:
+            result['status'] = 'failed'
+            result['message'] = 'Timeout executing the notebook.'
+            kernel.shutdown()
+        except Exception as err:
+            result['status'] = 'failed'
+            result['message'] = f'{type(err).__name__}: {err}'
+            kernel.shutdown()
+        result['wall_time'] = time.perf_counter() - start
+
+        if cache is not None:
+            # the cells executed before a failure are still worth keeping
+            cache.save()
+            result['cached_cells'] = cache.replayed
+
+        if profiler is not None:
+            result['profile'] = str(profiler.filename) if profiler.filename.is_file() else None
+
+        cpu_times = [c['cpu_time'] for c in result['cells'] if c['cpu_time'] is not None]
+        peak_rss = [c['peak_rss'] for c in result['cells'] if c['peak_rss'] is not None]
+        if cpu_times:
+            result['cpu_time'] = sum(cpu_times)
+            result['peak_rss'] = max(peak_rss)
+
+        if isolate and keep:
+            for entry in run_path.iterdir():
+                if entry.is_file() and not entry.is_symlink() and \
+                        any(fnmatch.fnmatch(entry.name, pattern) for pattern in keep):
+                    shutil.copy2(entry, nb_path.parent / entry.name)
+
+        if return_notebook:
+            result['notebook'] = nb
+    finally:
+        if owns_kernel:
+            kernel.shutdown()
+        if work_root is not None:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    return result
+
+
+def _failed_result(nb_path, book_dir, message):
+    """
+    Return the result of a notebook that could not be executed (see run_notebook).
+    """
+    return {
+        'path': pathlib.Path(nb_path).resolve().relative_to(
+            pathlib.Path(book_dir).resolve()).as_posix(),
+        'status': 'failed',
+        'message': message,
+        'wall_time': 0.0, 'cpu_time': None, 'peak_rss': None, 'cells': [],
+    }
+
+
+def run_notebooks(filenames, book_dir=BOOK_DIR, jobs=None, timeout=TIMEOUT, kernel_name=KERNEL,
+                  isolate=True, keep=(), return_notebook=False, warm=True, mpi_engines=0,
+                  cell_cache=None, profile=None, instance_profile=False):
+    """
+    Execute the given notebooks concurrently in a pool of worker processes.
+
+    If warm is True, each worker starts one kernel with OpenMDAO already imported and reuses
+    it for the notebooks it is given, so kernel startup and import costs are paid once per
+    worker rather than once per notebook.
+
+    Parameters
+    ----------
+    filenames : iter of str
+        Paths of the notebooks to execute.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+    jobs : int or None
+        Number of worker processes. Defaults to the number of CPUs.
+    timeout : int
+        Maximum time in seconds that a single cell may take to execute.
+    kernel_name : str
+        Name of the kernel used to execute the notebooks.
+    isolate : bool
+        If True, execute each notebook in a private copy of its directory.
+    keep : iter of str
+        Glob patterns of files written by isolated notebooks that are copied back into the book.
+    return_notebook : bool
+        If True, each result includes the executed notebook under 'notebook'.
+    warm : bool
+        If True, execute the notebooks with a pre-started kernel in each worker.
+    mpi_engines : int
+        If greater than 0, start a LocalCluster with this many MPI engines and execute the
+        notebooks that need it one after the other, after the others. If 0, all notebooks are
+        executed in the pool, and the MPI notebooks need a cluster started by hand.
+    cell_cache : str or None
+        Directory of a cell cache used for the notebooks that do not need a cluster (see
+        run_notebook).
+    profile : str or None
+        If given, every notebook is profiled and its profile is written to this directory (see
+        run_notebook).
+    instance_profile : bool
+        If True, the notebooks that build a Problem are profiled with iprofile (see
+        run_notebook).
+
+    Returns
+    -------
+    list of dict
+        The result of each notebook (see run_notebook), sorted by path.
+    """
+    filenames = list(filenames)
+    results = []
+
+    mpi_filenames = []
+    if mpi_engines > 0:
+        mpi_filenames = [n for n in filenames if needs_cluster(n)]
+        filenames = [n for n in filenames if n not in mpi_filenames]
+
+    if filenames:
+        if warm:
+            initializer = _init_worker
+            initargs = (kernel_name, timeout, book_dir)
+        else:
+            initializer = None
+            initargs = ()
+
+        # Forking a process that has already talked to a kernel over zmq is not safe.
+        ctx = multiprocessing.get_context('spawn')
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=ctx,
+                                                    initializer=initializer,
+                                                    initargs=initargs) as executor:
+            if warm:
+                futures = {executor.submit(_run_in_worker, n, book_dir, timeout, kernel_name,
+                                           isolate, keep, return_notebook, cell_cache, profile,
+                                           instance_profile): n
+                           for n in filenames}
+            else:
+                futures = {executor.submit(run_notebook, n, book_dir, timeout, kernel_name,
+                                           isolate, keep, return_notebook, None, None, cell_cache,
+                                           profile, instance_profile): n
+                           for n in filenames}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as err:
+                    # e.g. BrokenProcessPool when a worker process died, in which case all the
+                    # notebooks that have not finished yet fail the same way.
+                    result = _failed_result(futures[future], book_dir,
+                                            f'{type(err).__name__}: {err}')
+                print(f"{result['status']:>7}  {result['wall_time']:8.2f}s  {result['path']}",
+                      flush=True)
+                results.append(result)
+
+    if mpi_filenames:
+        results.extend(_run_mpi_notebooks(mpi_filenames, book_dir, timeout, kernel_name, isolate,
+                                          keep, return_notebook, mpi_engines, profile,
+                                          instance_profile))
+
+    return sorted(results, key=lambda r: r['path'])
+
+
+def _run_mpi_notebooks(filenames, book_dir, timeout, kernel_name, isolate, keep, return_notebook,
+                       mpi_engines, profile=None, instance_profile=False):
+    """
+    Execute the given notebooks one at a time, sharing one local cluster of MPI engines.
+    """
+    results = []
+    cluster = LocalCluster(mpi_engines)
+    try:
+        cluster.start()
+    except Exception as err:
+        cluster.stop()
+        for n in filenames:
+            results.append(_failed_result(n, book_dir,
+                                          f'Unable to start a cluster of {mpi_engines} MPI '
+                                          f'engines: {type(err).__name__}: {err}'))
+        return results
+
+    try:
+        # each notebook gets a fresh kernel, since its client is left connected to the cluster
+        for n in filenames:
+            result = run_notebook(n, book_dir=book_dir, timeout=timeout, kernel_name=kernel_name,
+                                  isolate=isolate, keep=keep, return_notebook=return_notebook,
+                                  cluster=cluster, profile=profile,
+                                  instance_profile=instance_profile)
+            print(f"{result['status']:>7}  {result['wall_time']:8.2f}s  {result['path']}",
+                  flush=True)
+            results.append(result)
+    finally:
+        cluster.stop()
+
+    return results
+
+
+def write_timings_csv(results, fname):
+    """
+    Write the timing of every notebook and every code cell to a CSV file.
+
+    Rows with an empty 'cell' column hold the totals of a notebook.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results returned by run_notebooks.
+    fname : str
+        Name of the CSV file.
+    """
+    with open(fname, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['path', 'cell', 'status', 'wall_time', 'cpu_time', 'peak_rss'])
+        for r in results:
+            writer.writerow([r['path'], '', r['status'], r['wall_time'], r['cpu_time'],
+                             r['peak_rss']])
+            for c in r['cells']:
+                writer.writerow([r['path'], c['index'], '', c['wall_time'], c['cpu_time'],
+                                 c['peak_rss']])
+
+
+def compare_timings(results, baseline, threshold=SLOWDOWN_THRESHOLD, min_time=MIN_BASELINE_TIME):
+    """
+    Return the notebooks that became slower than their baseline by more than threshold.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results returned by run_notebooks.
+    baseline : list of dict
+        Results of an earlier run, e.g. loaded from the JSON file written with --output.
+    threshold : float
+        Ratio of new to baseline wall time above which a notebook is flagged.
+    min_time : float
+        Notebooks whose baseline wall time is below this many seconds are not compared.
+
+    Returns
+    -------
+    list of tuple
+        (path, baseline wall time, new wall time, ratio) for each flagged notebook, slowest
+        ratio first.
+    """
+    old_times = {r['path']: r['wall_time'] for r in baseline if r['status'] == 'passed'}
+
+    slower = []
+    for r in results:
+        old_time = old_times.get(r['path'])
+        if r['status'] != 'passed' or old_time is None or old_time < min_time:
+            continue
+        ratio = r['wall_time'] / old_time
+        if ratio > threshold:
+            slower.append((r['path'], old_time, r['wall_time'], ratio))
+
+    return sorted(slower, key=lambda s: s[3], reverse=True)
+
+
+def report(results, out=sys.stdout, slowest=10):
+    """
+    Write a summary of the notebook results, including the failure messages.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results returned by run_notebooks.
+    out : file-like
+        Where the summary is written.
+    slowest : int
+        Number of slowest notebooks and cells to list.
+
+    Returns
+    -------
+    int
+        The number of failed notebooks.
+    """
+    failed = [r for r in results if r['status'] == 'failed']
+    for r in failed:
+        out.write(f"\n{'=' * 70}\n{r['path']} failed:\n{r['message']}\n")
+
+    if slowest:
+        out.write("\nSlowest notebooks:\n")
+        for r in sorted(results, key=lambda r: r['wall_time'], reverse=True)[:slowest]:
+            out.write(f"  {r['wall_time']:8.2f}s  {r['path']}\n")
+
+        cells = [(c['wall_time'], r['path'], c['index']) for r in results for c in r['cells']]
+        out.write("\nSlowest cells:\n")
+        for wall_time, path, index in sorted(cells, reverse=True)[:slowest]:
+            out.write(f"  {wall_time:8.2f}s  {path} [cell {index}]\n")
+
+    counts = {status: 0 for status in ('passed', 'failed', 'skipped')}
+    for r in results:
+        counts[r['status']] += 1
+    total_time = sum(r['wall_time'] for r in results)
+
+    out.write(f"\n{len(results)} notebooks: {counts['passed']} passed, {counts['failed']} failed, "
+              f"{counts['skipped']} skipped ({total_time:.2f}s of notebook execution time)\n")
+    return len(failed)
+
+
+def expand_paths(paths, book_dir):
+    """
+    Yield the notebooks named by paths, descending into any directories.
+
+    Parameters
+    ----------
+    paths : list of str
+        Notebooks and directories. If empty, the whole book.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+
+    Yields
+    ------
+    str
+        Path of each notebook.
+    """
+    if not paths:
+        paths = [book_dir]
+    for path in paths:
+        if os.path.isdir(path):
+            yield from collect_filenames(path)
+        else:
+            yield path
+
+
+def run_notebooks_cmd():
+    """
+    Run the notebooks of the book (or those passed in via the command line) concurrently.
+    """
+    parser = argparse.ArgumentParser(description='Execute notebooks of the book concurrently '
+                                                 'and report the results.')
+    parser.add_argument('paths', nargs='*',
+                        help='Notebooks or directories to execute (default is the whole book).')
+    parser.add_argument('-b', '--book', action='store', default=str(BOOK_DIR),
+                        help="The directory of the book (default is 'openmdao_book').")
+    parser.add_argument('--since', action='store', default=None,
+                        help="Only execute the notebooks affected by the files changed since this "
+                             "git revision (e.g. 'origin/main'), see notebook_deps.py.")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of notebooks executed concurrently (default is the number '
+                             'of CPUs).')
+    parser.add_argument('-t', '--timeout', type=int, default=TIMEOUT,
+                        help=f'Timeout in seconds for each cell (default is {TIMEOUT}).')
+    parser.add_argument('--no-isolate', action='store_true',
+                        help="Execute notebooks in their own directories instead of private "
+                             "copies. Notebooks that share a directory may then interfere.")
+    parser.add_argument('--cold', action='store_true',
+                        help='Start a new kernel for every notebook instead of reusing a warm '
+                             'kernel in each worker.')
+    parser.add_argument('--mpi-engines', type=int, default=0,
+                        help="Start a local ipyparallel cluster with this many MPI engines for "
+                             "the notebooks with '%%%%px' cells, and execute those notebooks one "
+                             "at a time after the others (e.g. 4). By default they are executed "
+                             "with the others and need a cluster started with 'ipcluster start "
+                             "--profile=mpi'.")
+    parser.add_argument('--cell-cache', nargs='?', const='', default=None, metavar='DIR',
+                        help="Replay the outputs of the code cells that did not change since the "
+                             "last run with this option, and resume execution from a snapshot of "
+                             "the kernel state where possible (needs dill). The cache is kept in "
+                             "DIR (default is '_build/.cell_cache' in the book).")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='DIR',
+                        help="Profile every notebook with cProfile, write the profiles to DIR "
+                             "(default is '_build/profiles' in the book) and report the OpenMDAO "
+                             "functions that took the most time over all of them, see "
+                             "notebook_profile.py.")
+    parser.add_argument('--iprofile', action='store_true',
+                        help="With --profile, profile the notebooks that build a Problem with "
+                             "OpenMDAO's iprofile instead of cProfile. Each of them is executed "
+                             "in a new kernel.")
+    parser.add_argument('-o', '--output', action='store', default=None,
+                        help='Write the results and timings of all notebooks to this JSON file.')
+    parser.add_argument('--csv', action='store', default=None,
+                        help='Write the timings of all notebooks and cells to this CSV file.')
+    parser.add_argument('--baseline', action='store', default=None,
+                        help='JSON file from an earlier run (see --output). Notebooks that became '
+                             'slower than the baseline are reported and cause a non-zero exit.')
+    parser.add_argument('--threshold', type=float, default=SLOWDOWN_THRESHOLD,
+                        help='Slowdown ratio relative to the baseline that is reported '
+                             f'(default is {SLOWDOWN_THRESHOLD}).')
+    args = parser.parse_args()
+
+    if args.cell_cache is not None and args.no_isolate:
+        parser.error('--cell-cache needs the notebooks to be isolated.')
+    if args.cell_cache == '':
+        args.cell_cache = str(pathlib.Path(args.book, '_build', '.cell_cache'))
+    if args.profile is not None and args.cell_cache is not None:
+        parser.error('--profile and --cell-cache cannot be used together, since the replayed '
+                     'cells would not be profiled.')
+    if args.iprofile and args.profile is None:
+        parser.error('--iprofile needs --profile.')
+    if args.profile == '':
+        args.profile = str(pathlib.Path(args.book, '_build', 'profiles'))
+
+    filenames = expand_paths(args.paths, args.book)
+    if args.since:
+        from notebook_deps import affected_notebooks, build_graph, changed_since
+
+        affected = affected_notebooks(build_graph(args.book), changed_since(args.since),
+                                      args.book)
+        affected = {str(pathlib.Path(args.book, nb).resolve()) for nb in affected}
+        filenames = [n for n in filenames if str(pathlib.Path(n).resolve()) in affected]
+    results = run_notebooks(filenames, book_dir=args.book, jobs=args.jobs, timeout=args.timeout,
+                            isolate=not args.no_isolate, warm=not args.cold,
+                            mpi_engines=args.mpi_engines, cell_cache=args.cell_cache,
+                            profile=args.profile, instance_profile=args.iprofile)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+
+    if args.csv:
+        write_timings_csv(results, args.csv)
+
+    status = report(results)
+
+    if args.profile is not None:
+        from notebook_profile import REPORT_FILE, profile_report
+
+        profiles = [r['profile'] for r in results if r.get('profile')]
+        if profiles:
+            report_file = pathlib.Path(args.profile, REPORT_FILE)
+            with open(report_file, 'w') as f:
+                profile_report(profiles, args.profile, f)
+            print(f"\nProfile report of {len(profiles)} notebooks written to {report_file}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = compare_timings(results, baseline, threshold=args.threshold)
+        for path, old_time, new_time, ratio in slower:
+            print(f"SLOWER  {path}: {old_time:.2f}s -> {new_time:.2f}s ({ratio:.1f}x)")
+        status += len(slower)
+
+    if status:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    run_notebooks_cmd()
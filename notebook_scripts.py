@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+"""
+Extract the code of the notebooks into Python scripts and run them without a Jupyter kernel.
+
+This is a smoke test of the code of the book: every notebook is converted to a script, in the
+percent format understood by editors and jupytext, and the scripts are run concurrently, each in
+a fresh Python process inside a private copy of its notebook's directory. No Jupyter kernel is
+needed, and starting a process is cheaper than starting a kernel, but every script imports
+OpenMDAO again, so notebook_runner.py with its warm kernels is faster. Outputs are not captured
+per cell, so this does not replace executing the notebooks for the book itself.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from notebook_deps import MAGIC_RE
+from notebook_runner import BOOK_DIR, TIMEOUT, expand_paths, mirror_book, report, \
+    skip_traceback, write_timings_csv
+
+# Name of the script written into the private copy of a notebook's directory.
+SCRIPT_NAME = '_notebook_script.py'
+
+# Cell magics that require something other than plain Python. Notebooks that use them are
+# skipped, e.g. '%%px' cells run on the engines of an ipyparallel cluster.
+UNSUPPORTED_CELL_MAGICS = {'%%px': 'needs an ipyparallel cluster (%%px cells)'}
+
+# Environment variables set for the scripts, so that plots are not shown.
+SCRIPT_ENV = {'MPLBACKEND': 'Agg'}
+
+# Tags of the code cells left out of the scripts by default: the cells that myst-nb does not
+# execute, or whose error it ignores. Tags such as 'remove-input' only change how a cell is
+# displayed, and the book executes such cells, so they are run too. They hold the hidden checks.
+SKIP_TAGS = ('skip-execution', 'raises-exception')
+
+
+def cell_to_code(source):
+    """
+    Return the source of a code cell with its magics and shell escapes made inert.
+
+    Each magic line is replaced by a 'pass' statement at the same indentation, so that a magic
+    inside a block (e.g. '!pip install' in an 'except ImportError:' clause) still leaves valid
+    Python behind.
+
+    Parameters
+    ----------
+    source : str
+        The source of the code cell.
+
+    Returns
+    -------
+    str
+        Python source.
+    """
+    lines = []
+    for line in source.splitlines():
+        if MAGIC_RE.match(line):
+            indent = line[:len(line) - len(line.lstrip())]
+            lines.append(f"{indent}pass  # {line.strip()}")
+        else:
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def notebook_to_script(nb, name='', skip_tags=SKIP_TAGS):
+    """
+    Convert a notebook to a Python script.
+
+    Parameters
+    ----------
+    nb : dict
+        The notebook, as read from its JSON file.
+    name : str
+        Name of the notebook, written in the header of the script.
+    skip_tags : iter of str
+        Code cells with any of these tags (e.g. 'remove-input') are left out of the script.
+
+    Returns
+    -------
+    tuple of (str, str or None)
+        The script, and the reason why it cannot be run without a kernel (or None).
+    """
+    skip_tags = set(skip_tags)
+    parts = [f"# Extracted from {name} by notebook_scripts.py\n"]
+    reason = None
+
+    for index, cell in enumerate(nb['cells']):
+        if cell['cell_type'] != 'code':
+            continue
+
+        source = cell['source']
+        if isinstance(source, list):
+            source = ''.join(source)
+        tags = cell.get('metadata', {}).get('tags', [])
+
+        first = source.lstrip().split(None, 1)
+        magic = first[0] if first and first[0].startswith('%%') else None
+        if magic in UNSUPPORTED_CELL_MAGICS and reason is None:
+            reason = UNSUPPORTED_CELL_MAGICS[magic]
+
+        header = f"# %% [{index}]" + (f" tags={json.dumps(tags)}" if tags else '')
+        if skip_tags.intersection(tags):
+            parts.append(f"{header} skipped\n")
+        elif magic is not None:
+            parts.append(f"{header} skipped {magic}\n")
+        else:
+            parts.append(f"{header}\n{cell_to_code(source)}\n")
+
+    return '\n'.join(parts), reason
+
+
+def run_script(nb_path, book_dir=BOOK_DIR, timeout=TIMEOUT, skip_tags=SKIP_TAGS,
+               keep_script=None):
+    """
+    Extract the script of a notebook and run it in a private copy of the notebook's directory.
+
+    Parameters
+    ----------
+    nb_path : str
+        Path to the notebook.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+    timeout : int
+        Maximum time in seconds that the script may take.
+    skip_tags : iter of str
+        Code cells with any of these tags are not run.
+    keep_script : str or None
+        If given, the script is also written to this directory, at the same relative location
+        as the notebook within the book.
+
+    Returns
+    -------
+    dict
+        Summary of the run with the same keys as the results of notebook_runner.run_notebook.
+        CPU time, peak RSS and cell timings are not measured.
+    """
+    nb_path = pathlib.Path(nb_path).resolve()
+    book_dir = pathlib.Path(book_dir).resolve()
+    rel_path = nb_path.relative_to(book_dir)
+    result = {
+        'path': rel_path.as_posix(),
+        'status': 'passed',
+        'message': '',
+        'wall_time': 0.0,
+        'cpu_time': None,
+        'peak_rss': None,
+        'cells': [],
+    }
+
+    try:
+        with open(nb_path, encoding='utf-8') as f:
+            nb = json.load(f)
+    except Exception as err:
+        result['status'] = 'failed'
+        result['message'] = f'Unable to parse notebook: {err}'
+        return result
+
+    script, reason = notebook_to_script(nb, result['path'], skip_tags)
+
+    if keep_script is not None:
+        script_path = pathlib.Path(keep_script, rel_path).with_suffix('.py')
+        script_path.parent.mkdir(parents=True, exist_ok=True)
+        script_path.write_text(script, encoding='utf-8')
+
+    if reason is not None:
+        result['status'] = 'skipped'
+        result['message'] = reason
+        return result
+
+    work_root = tempfile.mkdtemp(prefix='nbs_')
+    try:
+        run_path = mirror_book(book_dir, nb_path.parent, pathlib.Path(work_root))
+        (run_path / SCRIPT_NAME).write_text(script, encoding='utf-8')
+
+        env = dict(os.environ, **SCRIPT_ENV)
+        start = time.perf_counter()
+        try:
+            proc = subprocess.run([sys.executable, SCRIPT_NAME], cwd=run_path, env=env,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            result['status'] = 'failed'
+            result['message'] = 'Timeout running the script.'
+        else:
+            if proc.returncode != 0:
+                result['status'] = 'skipped' if skip_traceback(proc.stdout) else 'failed'
+                result['message'] = proc.stdout
+        result['wall_time'] = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    return result
+
+
+def run_scripts(filenames, book_dir=BOOK_DIR, jobs=None, timeout=TIMEOUT, skip_tags=SKIP_TAGS,
+                keep_script=None):
+    """
+    Run the scripts of the given notebooks concurrently.
+
+    Every script runs in its own Python process, so the threads of the pool only wait for
+    them to finish.
+
+    Parameters
+    ----------
+    filenames : iter of str
+        Paths of the notebooks.
+    book_dir : str
+        The directory containing the Jupyter-Book.
+    jobs : int or None
+        Number of scripts run concurrently. Defaults to the number of CPUs.
+    timeout : int
+        Maximum time in seconds that a single script may take.
+    skip_tags : iter of str
+        Code cells with any of these tags are not run.
+    keep_script : str or None
+        If given, the scripts are also written under this directory.
+
+    Returns
+    -------
+    list of dict
+        The result of each notebook (see run_script), sorted by path.
+    """
+    results = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = [executor.submit(run_script, n, book_dir, timeout, skip_tags, keep_script)
+                   for n in filenames]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            print(f"{result['status']:>7}  {result['wall_time']:8.2f}s  {result['path']}",
+                  flush=True)
+            results.append(result)
+
+    return sorted(results, key=lambda r: r['path'])
+
+
+def notebook_scripts_cmd():
+    """
+    Run the scripts of the notebooks of the book (or those passed in via the command line).
+    """
+    parser = argparse.ArgumentParser(description='Extract the code of notebooks into scripts and '
+                                                 'run them concurrently, without a kernel.')
+    parser.add_argument('paths', nargs='*',
+                        help='Notebooks or directories to run (default is the whole book).')
+    parser.add_argument('-b', '--book', action='store', default=str(BOOK_DIR),
+                        help="The directory of the book (default is 'openmdao_book').")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of scripts run concurrently (default is the number of CPUs).')
+    parser.add_argument('-t', '--timeout', type=int, default=TIMEOUT,
+                        help=f'Timeout in seconds for each script (default is {TIMEOUT}).')
+    parser.add_argument('--skip-tag', action='append', default=[], dest='skip_tags',
+                        help="Also leave out code cells with this tag (e.g. 'remove-input' to "
+                             "skip the hidden checks). May be given several times. Cells tagged "
+                             f"{' or '.join(SKIP_TAGS)} are always left out.")
+    parser.add_argument('--save', action='store', default=None,
+                        help='Also write the scripts under this directory.')
+    parser.add_argument('-o', '--output', action='store', default=None,
+                        help='Write the results of all notebooks to this JSON file.')
+    parser.add_argument('--csv', action='store', default=None,
+                        help='Write the timings of all notebooks to this CSV file.')
+    args = parser.parse_args()
+
+    results = run_scripts(expand_paths(args.paths, args.book), book_dir=args.book,
+                          jobs=args.jobs, timeout=args.timeout,
+                          skip_tags=SKIP_TAGS + tuple(args.skip_tags),
+                          keep_script=args.save)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+
+    if args.csv:
+        write_timings_csv(results, args.csv)
+
+    if report(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    notebook_scripts_cmd()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+#
+# Helpers to read and write the batch files used by the `--batch` mode of the
+# extcode_*.py scripts.
+#
+# A text batch file holds one point per line, with the values of the point separated by
+# whitespace, e.g. `x y` for extcode_paraboloid.py. The results are written the same way,
+# one line per point.
+#
+# Files ending in '.npy' are read and written in the binary NumPy format instead. They hold
+# one row per variable (e.g. a 2 x N array of `x` and `y` values for N points), and are
+# memory-mapped when read, so large arrays are neither formatted as text nor parsed.
+
+NPY_EXT = '.npy'
+
+
+def read_batch(filename):
+    """
+    Read a batch file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the batch file. Files ending in '.npy' are memory-mapped.
+
+    Returns
+    -------
+    ndarray
+        The values, with one row per variable.
+    """
+    import numpy as np
+
+    if filename.endswith(NPY_EXT):
+        return np.load(filename, mmap_mode='r')
+
+    return np.loadtxt(filename, ndmin=2, unpack=True)
+
+
+def write_batch(filename, *columns):
+    """
+    Write a batch file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the batch file. Files ending in '.npy' are written in binary.
+    *columns : ndarray
+        The values of each variable, one value per point.
+    """
+    import numpy as np
+
+    if filename.endswith(NPY_EXT):
+        np.save(filename, np.vstack(columns))
+    else:
+        np.savetxt(filename, np.column_stack(columns), fmt='%.16f')
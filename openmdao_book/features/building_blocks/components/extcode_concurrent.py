@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+#
+# Helper to run several independent external code evaluations at the same time.
+#
+# Each command runs in its own process. The threads of the pool only wait for the processes
+# to finish, so the number of workers, not the number of CPUs of the Python process, limits
+# how many evaluations run at once.
+
+import concurrent.futures
+import subprocess
+
+
+def run_concurrent(commands, max_workers=None, cwd=None, timeout=None, check=True):
+    """
+    Run the given commands concurrently and wait for all of them to finish.
+
+    Parameters
+    ----------
+    commands : list of list of str
+        The commands to run, e.g. [[sys.executable, 'extcode_paraboloid.py', 'in_0', 'out_0'], ...].
+    max_workers : int or None
+        Maximum number of commands running at the same time. Defaults to a number based on
+        the CPU count.
+    cwd : str, list of str or None
+        Working directory of the commands, or one working directory per command.
+    timeout : float or None
+        Time in seconds after which a command is killed and an error is raised.
+    check : bool
+        If True, raise a RuntimeError if any command returns a non-zero return code.
+
+    Returns
+    -------
+    list of subprocess.CompletedProcess
+        The completed processes, in the order of the commands.
+    """
+    if cwd is None or isinstance(cwd, str):
+        cwd = [cwd] * len(commands)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(subprocess.run, command, cwd=d, timeout=timeout)
+                   for command, d in zip(commands, cwd)]
+        results = [future.result() for future in futures]
+
+    if check:
+        failed = [result for result in results if result.returncode != 0]
+        if failed:
+            msg = '\n'.join(f"    {result.args} returned {result.returncode}" for result in failed)
+            raise RuntimeError(f"{len(failed)} of {len(results)} external code runs failed:\n{msg}")
+
+    return results
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 #
 # usage: extcode_mach.py input_filename output_filename
+#        extcode_mach.py --batch outputs|residuals input_filename output_filename
+#        extcode_mach.py --server
 #
 # Evaluates the output and residual for the implicit relationship
 #     between the area ratio and mach number.
@@ -9,35 +11,118 @@
 # and writes the values or residuals of `mach` to output file depending on what is requested.
 # What is requested is given by the first line in the file read. It can be either 'residuals' or
 # 'outputs'.
+#
+# With `--batch`, the input file holds one point per line, `area_ratio super_sonic` (with
+# super_sonic given as 0 or 1) for outputs or `area_ratio mach` for residuals, all points are
+# evaluated at once with numpy, and the output file gets one value per line (see extcode_batch.py).
+# Batch files ending in '.npy' are exchanged in the binary NumPy format instead of text.
+#
+# With `--server`, keep running and evaluate one `input_filename output_filename`
+# request per line read from stdin (see extcode_server.py). Recent solutions are then kept
+# as starting points for the following requests.
+
+import numpy as np
+
+GAMMA = 1.4
+
+# Number of recent solutions kept, for each branch, as starting points for mach_solve.
+CACHE_SIZE = 1000
+
+# Area ratios and solutions of each branch, oldest first.
+_cache = {False: (np.empty(0), np.empty(0)), True: (np.empty(0), np.empty(0))}
+
 
 def area_ratio_explicit(mach):
     """Explicit isentropic relationship between area ratio and Mach number"""
-    gamma = 1.4
-    gamma_p_1 = gamma + 1
-    gamma_m_1 = gamma - 1
+    gamma_p_1 = GAMMA + 1
+    gamma_m_1 = GAMMA - 1
     exponent = gamma_p_1 / (2 * gamma_m_1)
     return (gamma_p_1 / 2.) ** -exponent * (
             (1 + gamma_m_1 / 2. * mach ** 2) ** exponent) / mach
 
+def area_ratio_derivative(mach):
+    """Derivative of area_ratio_explicit with respect to Mach number"""
+    gamma_p_1 = GAMMA + 1
+    gamma_m_1 = GAMMA - 1
+    exponent = gamma_p_1 / (2 * gamma_m_1)
+    return area_ratio_explicit(mach) * (
+            exponent * gamma_m_1 * mach / (1 + gamma_m_1 / 2. * mach ** 2) - 1. / mach)
+
 def mach_residual(mach, area_ratio_target):
     """If area_ratio is known, then finding Mach is an implicit relationship"""
     return area_ratio_target - area_ratio_explicit(mach)
 
-def mach_solve(area_ratio, super_sonic=False):
-    """Solve for mach, given area ratio"""
-    if super_sonic:
-        initial_guess = 4
-    else:
-        initial_guess = .1
-    mach = fsolve(func=mach_residual, x0=initial_guess, args=(area_ratio,))[0]
-    return mach
+def _initial_guess(area_ratio, super_sonic):
+    """Start from the cached solution with the closest area ratio, or from 0.1 or 4"""
+    guess = np.where(super_sonic, 4., .1)
+    for branch in (False, True):
+        ratios, machs = _cache[branch]
+        mask = super_sonic == branch
+        if ratios.size and mask.any():
+            order = np.argsort(ratios)
+            ratios = ratios[order]
+            idx = np.searchsorted(ratios, area_ratio[mask]).clip(1, len(ratios) - 1)
+            if len(ratios) > 1:
+                # pick the closer of the two neighbors
+                left = area_ratio[mask] - ratios[idx - 1] < ratios[idx] - area_ratio[mask]
+                idx = np.where(left, idx - 1, idx)
+            else:
+                idx = np.zeros_like(idx)
+            guess[mask] = machs[order][idx]
+    return guess
 
-if __name__ == '__main__':
-    import sys
-    from scipy.optimize import fsolve
+def _update_cache(area_ratio, super_sonic, mach):
+    """Remember the most recent solutions"""
+    for branch in (False, True):
+        mask = super_sonic == branch
+        if not mask.any():
+            continue
+        # only the last CACHE_SIZE points of the branch can stay in the cache
+        ratios = np.concatenate((_cache[branch][0], area_ratio[mask][-CACHE_SIZE:]))
+        machs = np.concatenate((_cache[branch][1], mach[mask][-CACHE_SIZE:]))
+        # keep the most recent solution of each area ratio, in the order they were solved
+        _, last = np.unique(ratios[::-1], return_index=True)
+        keep = np.sort(len(ratios) - 1 - last)[-CACHE_SIZE:]
+        _cache[branch] = (ratios[keep], machs[keep])
+
+def mach_solve(area_ratio, super_sonic=False, tol=1e-12, maxiter=100):
+    """Solve for mach, given area ratio(s), with a vectorized Newton iteration"""
+    scalar = np.ndim(area_ratio) == 0
+    area_ratio = np.atleast_1d(np.asarray(area_ratio, dtype=float))
+    super_sonic = np.broadcast_to(np.asarray(super_sonic, dtype=bool), area_ratio.shape)
 
-    input_filename = sys.argv[1]
-    output_filename = sys.argv[2]
+    mach = _initial_guess(area_ratio, super_sonic)
+
+    # keep each point on its branch, where area_ratio_explicit is monotonic
+    lower = np.where(super_sonic, 1., 1e-10)
+    upper = np.where(super_sonic, np.inf, 1.)
+
+    for i in range(maxiter):
+        deriv = area_ratio_derivative(mach)
+        # the derivative is zero at Mach 1, which is as close as area ratios <= 1 can get
+        zero = deriv == 0.
+        step = np.where(zero, 0., mach_residual(mach, area_ratio) / np.where(zero, 1., deriv))
+        mach = np.clip(mach + step, lower, upper)
+        if np.all(np.abs(step) <= tol * mach):
+            break
+
+    _update_cache(area_ratio, super_sonic, mach)
+
+    return mach[0] if scalar else mach
+
+def main(args):
+    if args[0] == '--batch':
+        from extcode_batch import read_batch, write_batch
+
+        output_or_resids = args[1]
+        area_ratio, value = read_batch(args[2])
+        if output_or_resids == 'outputs':
+            write_batch(args[3], mach_solve(area_ratio, super_sonic=value != 0))
+        elif output_or_resids == 'residuals':
+            write_batch(args[3], mach_residual(value, area_ratio))
+        return
+
+    input_filename, output_filename = args
 
     with open(input_filename, 'r') as input_file:
         output_or_resids = input_file.readline().strip()
@@ -56,3 +141,8 @@ if __name__ == '__main__':
         mach_resid = mach_residual(mach, area_ratio)
         with open(output_filename, 'w') as output_file:
             output_file.write('%.16f\n' % mach_resid)
+
+if __name__ == '__main__':
+    from extcode_server import run_script
+
+    run_script(main)
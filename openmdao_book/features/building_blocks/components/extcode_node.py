@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 #
 # usage: extcode_node.py input_filename output_filename
+#        extcode_node.py --server
 #
 # Evaluates the residual equation (Kirchhoff's law) for the node
 #   by calculating the sum of the currents flowing towards the node minus the
@@ -8,12 +9,12 @@
 #
 # Read the count and values for the currents flowing towards and flowing away from the node.
 # Write the residual value to the output file.
+#
+# With `--server`, keep running and evaluate one `input_filename output_filename`
+# request per line read from stdin (see extcode_server.py).
 
-if __name__ == '__main__':
-    import sys
-
-    input_filename = sys.argv[1]
-    output_filename = sys.argv[2]
+def main(args):
+    input_filename, output_filename = args
 
     with open(input_filename, 'r') as input_file:
         file_contents = iter(input_file.readlines())
@@ -29,3 +30,9 @@ if __name__ == '__main__':
 
     with open(output_filename, 'w') as output_file:
         output_file.write('%.16f\n' % resid_V)
+
+
+if __name__ == '__main__':
+    from extcode_server import run_script
+
+    run_script(main)
@@ -1,24 +1,47 @@
 #!/usr/bin/env python
 #
 # usage: extcode_paraboloid.py input_filename output_filename
+#        extcode_paraboloid.py --batch input_filename output_filename
+#        extcode_paraboloid.py --server
 #
 # Evaluates the equation f(x,y) = (x-3)^2 + xy + (y+4)^2 - 3.
 #
 # Read the values of `x` and `y` from input file
 # and write the value of `f_xy` to output file.
+#
+# With `--batch`, the input file holds one `x y` point per line, all points are evaluated
+# at once with numpy, and the output file gets one value of `f_xy` per line (see extcode_batch.py).
+# Batch files ending in '.npy' are exchanged in the binary NumPy format instead of text.
+#
+# With `--server`, keep running and evaluate one `input_filename output_filename`
+# request per line read from stdin (see extcode_server.py).
 
-if __name__ == '__main__':
-    import sys
+def paraboloid(x, y):
+    return (x-3.0)**2 + x*y + (y+4.0)**2 - 3.0
+
+
+def main(args):
+    if args[0] == '--batch':
+        from extcode_batch import read_batch, write_batch
 
-    input_filename = sys.argv[1]
-    output_filename = sys.argv[2]
+        x, y = read_batch(args[1])
+        write_batch(args[2], paraboloid(x, y))
+        return
+
+    input_filename, output_filename = args
 
     with open(input_filename, 'r') as input_file:
         file_contents = input_file.readlines()
 
     x, y = [float(f) for f in file_contents]
 
-    f_xy = (x-3.0)**2 + x*y + (y+4.0)**2 - 3.0
+    f_xy = paraboloid(x, y)
 
     with open(output_filename, 'w') as output_file:
         output_file.write('%.16f\n' % f_xy)
+
+
+if __name__ == '__main__':
+    from extcode_server import run_script
+
+    run_script(main)
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 #
 # usage: extcode_paraboloid_derivs.py input_filename output_filename derivs_filename
+#        extcode_paraboloid_derivs.py --batch input_filename output_filename derivs_filename
+#        extcode_paraboloid_derivs.py --server
 #
 # Evaluates the equation f(x,y) = (x-3)^2 + xy + (y+4)^2 - 3.
 #
@@ -8,26 +10,54 @@
 # and write the value of `f_xy` to output file.
 #
 # Also write derivatives to another output file.
+#
+# With `--batch`, the input file holds one `x y` point per line, all points are evaluated
+# at once with numpy, and the output files get one line per point: `f_xy` in the output file
+# and the two partials in the derivs file (see extcode_batch.py).
+# Batch files ending in '.npy' are exchanged in the binary NumPy format instead of text.
+#
+# With `--server`, keep running and evaluate one `input_filename output_filename derivs_filename`
+# request per line read from stdin (see extcode_server.py).
+
+def paraboloid(x, y):
+    return (x-3.0)**2 + x*y + (y+4.0)**2 - 3.0
+
+
+def paraboloid_derivs(x, y):
+    # partials['f_xy', 'x'], partials['f_xy', 'y']
+    return 2.0*x - 6.0 + y, 2.0*y + 8.0 + x
 
-if __name__ == '__main__':
-    import sys
 
-    input_filename = sys.argv[1]
-    output_filename = sys.argv[2]
-    derivs_filename = sys.argv[3]
+def main(args):
+    if args[0] == '--batch':
+        from extcode_batch import read_batch, write_batch
+
+        x, y = read_batch(args[1])
+        write_batch(args[2], paraboloid(x, y))
+        write_batch(args[3], *paraboloid_derivs(x, y))
+        return
+
+    input_filename, output_filename, derivs_filename = args
 
     with open(input_filename, 'r') as input_file:
         file_contents = input_file.readlines()
 
     x, y = [float(f) for f in file_contents]
 
-    f_xy = (x-3.0)**2 + x*y + (y+4.0)**2 - 3.0
+    f_xy = paraboloid(x, y)
 
     with open(output_filename, 'w') as output_file:
         output_file.write('%.16f\n' % f_xy)
 
     with open(derivs_filename, 'w') as derivs_file:
+        df_dx, df_dy = paraboloid_derivs(x, y)
         # partials['f_xy', 'x']
-        derivs_file.write('%.16f\n' % (2.0*x - 6.0 + y))
+        derivs_file.write('%.16f\n' % df_dx)
         # partials['f_xy', 'y']
-        derivs_file.write('%.16f\n' % (2.0*y + 8.0 + x))
+        derivs_file.write('%.16f\n' % df_dy)
+
+
+if __name__ == '__main__':
+    from extcode_server import run_script
+
+    run_script(main)
@@ -1,18 +1,32 @@
 #!/usr/bin/env python
 #
 # usage: extcode_resistor.py input_filename output_filename
+#        extcode_resistor.py --batch input_filename output_filename
+#        extcode_resistor.py --server
 #
 # Evaluates the equation
 #              I = ( V_in - V_out ) / R
 #
 # Read the values of V_in, V_out, R from input file
 # and write the value of `I` to output file.
+#
+# With `--batch`, the input file holds one `V_in V_out R` point per line, all points are
+# evaluated at once with numpy, and the output file gets one value of `I` per line
+# (see extcode_batch.py).
+# Batch files ending in '.npy' are exchanged in the binary NumPy format instead of text.
+#
+# With `--server`, keep running and evaluate one `input_filename output_filename`
+# request per line read from stdin (see extcode_server.py).
 
-if __name__ == '__main__':
-    import sys
+def main(args):
+    if args[0] == '--batch':
+        from extcode_batch import read_batch, write_batch
+
+        V_in, V_out, R = read_batch(args[1])
+        write_batch(args[2], (V_in - V_out) / R)
+        return
 
-    input_filename = sys.argv[1]
-    output_filename = sys.argv[2]
+    input_filename, output_filename = args
 
     with open(input_filename, 'r') as input_file:
         file_contents = input_file.readlines()
@@ -23,3 +37,9 @@ if __name__ == '__main__':
 
     with open(output_filename, 'w') as output_file:
         output_file.write('%.16f\n' % I)
+
+
+if __name__ == '__main__':
+    from extcode_server import run_script
+
+    run_script(main)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#
+# Helpers to run one of the extcode_*.py scripts as a long-lived server.
+#
+# Started with `--server`, a script reads one request per line from stdin. Each request holds the
+# same arguments that would otherwise be given on the command line (e.g. the names of the input
+# and output files), and the server replies with one line: 'ok', or 'error' followed by a message.
+# The process is started, and its modules are imported, only once for any number of evaluations.
+# The server exits when its stdin is closed.
+
+import shlex
+import subprocess
+import sys
+import traceback
+
+
+def serve(main, stdin=None, stdout=None):
+    """
+    Run main once for every request read from stdin, until stdin is closed.
+
+    Parameters
+    ----------
+    main : function
+        Function that takes a list of command line arguments and performs one evaluation.
+    stdin : file or None
+        Stream the requests are read from. Defaults to sys.stdin.
+    stdout : file or None
+        Stream the replies are written to. Defaults to sys.stdout.
+    """
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+
+    # anything printed by main must not end up in the replies
+    orig_stdout = sys.stdout
+    sys.stdout = sys.stderr
+
+    try:
+        for line in stdin:
+            try:
+                main(shlex.split(line))
+            except Exception as err:
+                traceback.print_exc()
+                reply = f"error {type(err).__name__}: {err}".replace('\n', ' ')
+            else:
+                reply = 'ok'
+            stdout.write(reply + '\n')
+            stdout.flush()
+    finally:
+        sys.stdout = orig_stdout
+
+
+def run_script(main):
+    """
+    Run main on the command line arguments, or as a server if the first one is '--server'.
+
+    Parameters
+    ----------
+    main : function
+        Function that takes a list of command line arguments and performs one evaluation.
+    """
+    if sys.argv[1:] == ['--server']:
+        serve(main)
+    else:
+        main(sys.argv[1:])
+
+
+class ExternalCodeServer(object):
+    """
+    Client for an extcode_*.py script running as a server in a subprocess.
+
+    Parameters
+    ----------
+    command : list of str
+        The command that runs the script, e.g. [sys.executable, 'extcode_paraboloid.py'].
+        '--server' is appended to it.
+    **kwargs : dict
+        Additional arguments passed to subprocess.Popen (e.g. cwd or env).
+    """
+
+    def __init__(self, command, **kwargs):
+        self._command = list(command) + ['--server']
+        self._kwargs = kwargs
+        self._proc = None
+
+    def start(self):
+        """
+        Start the server process, if it is not running already.
+        """
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(self._command, stdin=subprocess.PIPE,
+                                          stdout=subprocess.PIPE, text=True, bufsize=1,
+                                          **self._kwargs)
+
+    def run(self, *args):
+        """
+        Perform one evaluation, starting the server first if needed.
+
+        Parameters
+        ----------
+        *args : str
+            The command line arguments of the evaluation, e.g. the input and output file names.
+        """
+        self.start()
+        self._proc.stdin.write(' '.join(shlex.quote(str(arg)) for arg in args) + '\n')
+        self._proc.stdin.flush()
+
+        reply = self._proc.stdout.readline().strip()
+        if reply != 'ok':
+            if not reply:
+                reply = f"server exited with return code {self._proc.wait()}"
+            raise RuntimeError(f"External code server {self._command} failed: {reply}")
+
+    def close(self):
+        """
+        Stop the server process.
+        """
+        if self._proc is not None:
+            self._proc.stdin.close()
+            self._proc.wait()
+            self._proc.stdout.close()
+            self._proc = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.stdin.close()
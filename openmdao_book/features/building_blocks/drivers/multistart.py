@@ -0,0 +1,207 @@
+"""
+Run an optimization from many starting points in parallel worker processes.
+
+Each worker builds and sets up its Problem once, when it starts, and then runs the driver for
+every starting point it is given, only changing the values of the design variables in between.
+The results are gathered in the order of the starting points, and unique_optima merges the
+runs that converged to the same point.
+"""
+import concurrent.futures
+import time
+
+import numpy as np
+
+import openmdao.api as om
+from openmdao.test_suite.components.paraboloid import Paraboloid
+from openmdao.test_suite.components.sellar_feature import SellarMDA
+
+# The Problem of the current worker process, built by _init_worker.
+_worker_prob = None
+
+
+def sample_starts(bounds, num_starts, seed=None):
+    """
+    Return starting points sampled uniformly between the given bounds.
+
+    Parameters
+    ----------
+    bounds : dict
+        Lower and upper bounds, as a (lower, upper) tuple of floats or arrays, keyed by the
+        name of each design variable.
+    num_starts : int
+        Number of starting points.
+    seed : int or None
+        Seed of the random number generator.
+
+    Returns
+    -------
+    list of dict
+        The value of each design variable, keyed by name, for each starting point.
+    """
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for name, (lower, upper) in bounds.items():
+        lower, upper = np.broadcast_arrays(np.asarray(lower, dtype=float),
+                                           np.asarray(upper, dtype=float))
+        samples[name] = lower + (upper - lower) * rng.random((num_starts,) + lower.shape)
+
+    return [{name: values[i] for name, values in samples.items()} for i in range(num_starts)]
+
+
+def _run_start(prob, index, start):
+    """
+    Run the driver of an already set up Problem from one starting point.
+    """
+    for name, value in start.items():
+        prob.set_val(name, value)
+
+    t0 = time.perf_counter()
+    prob.run_driver()
+    elapsed = time.perf_counter() - t0
+
+    model = prob.model
+    return {
+        'index': index,
+        'start': start,
+        'success': not prob.driver.fail,
+        'objective': float(prob.get_val(next(iter(model.get_objectives())))[0]),
+        'design_vars': {name: prob.get_val(name).copy() for name in model.get_design_vars()},
+        'model_evals': prob.driver.iter_count,
+        'time': elapsed,
+    }
+
+
+def _init_worker(build_problem):
+    global _worker_prob
+    _worker_prob = build_problem()
+
+
+def _run_worker_start(args):
+    return _run_start(_worker_prob, *args)
+
+
+def run_multistart(build_problem, starts, num_workers=1):
+    """
+    Run the optimization returned by build_problem from each of the given starting points.
+
+    Parameters
+    ----------
+    build_problem : function
+        Function, defined at module level so that it can be sent to the worker processes, that
+        returns a Problem on which setup has been called. It is called once per worker.
+    starts : list of dict
+        The values of the design variables, keyed by name, for each starting point.
+    num_workers : int
+        Number of worker processes. With 1, the starts are run one after the other in this
+        process.
+
+    Returns
+    -------
+    list of dict
+        For each starting point, in order, the 'index' and 'start', whether the driver
+        reported 'success', the 'objective' and 'design_vars' found, the number of
+        'model_evals' and the 'time' taken by run_driver.
+    """
+    if num_workers <= 1:
+        prob = build_problem()
+        return [_run_start(prob, i, start) for i, start in enumerate(starts)]
+
+    # send several starts at a time, but keep enough chunks to balance the workers
+    chunksize = max(1, len(starts) // (4 * num_workers))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers,
+                                                initializer=_init_worker,
+                                                initargs=(build_problem,)) as executor:
+        return list(executor.map(_run_worker_start, enumerate(starts), chunksize=chunksize))
+
+
+def unique_optima(results, tol=1e-4, include_failed=False):
+    """
+    Merge the results of run_multistart that converged to the same design point.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results of run_multistart.
+    tol : float
+        Two results are the same optimum if no design variable differs by more than tol,
+        relative to the largest of their magnitudes or 1.
+    include_failed : bool
+        If True, also keep the runs for which the driver did not report success.
+
+    Returns
+    -------
+    list of dict
+        The best result of each distinct optimum, sorted by objective, with the number of runs
+        that found it in 'count' and their indices in 'indices'.
+    """
+    optima = []
+    for res in sorted(results, key=lambda res: res['objective']):
+        if not (res['success'] or include_failed):
+            continue
+
+        x = np.concatenate([np.ravel(v) for v in res['design_vars'].values()])
+        for opt in optima:
+            if np.all(np.abs(x - opt['_x']) <= tol * np.maximum(1., np.maximum(np.abs(x),
+                                                                              np.abs(opt['_x'])))):
+                opt['count'] += 1
+                opt['indices'].append(res['index'])
+                break
+        else:
+            optima.append(dict(res, count=1, indices=[res['index']], _x=x))
+
+    for opt in optima:
+        del opt['_x']
+
+    return optima
+
+
+def paraboloid_problem():
+    """
+    Return the Paraboloid problem of the ScipyOptimizeDriver examples, set up.
+
+    Returns
+    -------
+    Problem
+        The problem, with design variables 'x' and 'y' between -50 and 50.
+    """
+    prob = om.Problem(reports=None)
+    prob.model.add_subsystem('comp', Paraboloid(), promotes=['*'])
+
+    prob.driver = om.ScipyOptimizeDriver(optimizer='SLSQP', tol=1e-9, disp=False)
+
+    prob.model.add_design_var('x', lower=-50.0, upper=50.0)
+    prob.model.add_design_var('y', lower=-50.0, upper=50.0)
+    prob.model.add_objective('f_xy')
+
+    prob.setup()
+
+    return prob
+
+
+def sellar_problem():
+    """
+    Return the Sellar optimization problem of the Basic User Guide, set up.
+
+    Returns
+    -------
+    Problem
+        The problem, with design variables 'x' between 0 and 10 and 'z' between 0 and 10.
+    """
+    prob = om.Problem(model=SellarMDA(), reports=None)
+
+    prob.driver = om.ScipyOptimizeDriver(optimizer='SLSQP', tol=1e-8, disp=False)
+
+    prob.model.add_design_var('x', lower=0, upper=10)
+    prob.model.add_design_var('z', lower=0, upper=10)
+    prob.model.add_objective('obj')
+    prob.model.add_constraint('con1', upper=0)
+    prob.model.add_constraint('con2', upper=0)
+
+    prob.set_solver_print(level=0)
+    prob.setup()
+
+    # starting points far from the optimum need more than the default 10 iterations
+    prob.model.cycle.nonlinear_solver.options['maxiter'] = 50
+
+    return prob
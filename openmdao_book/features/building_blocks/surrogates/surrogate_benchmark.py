@@ -0,0 +1,444 @@
+#!/usr/bin/env python
+"""
+Time the training and prediction of the surrogate models for a range of problem sizes.
+
+The workloads fit a smooth function of dim inputs on [0, 1]**dim and predict it at a batch of
+random points:
+
+- 'surrogate': a KrigingSurrogate, NearestNeighbor or ResponseSurface used on its own. The
+  batch is passed to predict in one call if the surrogate accepts several points, and one point
+  at a time otherwise.
+- 'unstructured': a MetaModelUnStructuredComp with vec_size equal to the batch size, using
+  one of those surrogates.
+- 'structured': a MetaModelStructuredComp with vec_size equal to the batch size, for each
+  interpolation method, on a regular grid with about the same number of training points.
+
+For the surrogates, the train time is the time taken by train. For the components, it covers
+setup, final_setup and the first run_model, which trains the component and makes a first
+prediction. The predict time is the best of a few predictions of the batch (a run_model for the
+components), and the peak memory is the peak of the memory allocated during training and
+prediction, as traced by tracemalloc in a separate run.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import openmdao.api as om
+from openmdao.components.interp_util.interp import TABLE_METHODS
+
+SURROGATES = {
+    'kriging': om.KrigingSurrogate,
+    'nearest_neighbor': om.NearestNeighbor,
+    'response_surface': om.ResponseSurface,
+}
+
+# ResponseSurface.predict only takes a single point.
+_SINGLE_POINT = ('response_surface',)
+
+WORKLOADS = ['surrogate', 'unstructured', 'structured']
+
+# The structured grids have at least this many points per dimension, which every method in
+# TABLE_METHODS accepts.
+MIN_GRID_POINTS = 6
+
+# Number of predictions of which the fastest is reported.
+PREDICT_REPEAT = 3
+
+
+def response(x):
+    """
+    Return the function fitted by the surrogates.
+
+    Parameters
+    ----------
+    x : ndarray
+        Points, with the inputs along the last axis.
+
+    Returns
+    -------
+    ndarray
+        The value at each point.
+    """
+    return np.sum(np.sin(2. * np.pi * x), axis=-1) + 0.5 * np.sum(x**2, axis=-1)
+
+
+def _measure(make, memory):
+    """
+    Time the train and predict functions returned by make, and measure their peak memory.
+    """
+    train, predict = make()
+
+    start = time.perf_counter()
+    train()
+    train_time = time.perf_counter() - start
+
+    predict_time = np.inf
+    for i in range(PREDICT_REPEAT):
+        start = time.perf_counter()
+        predict()
+        predict_time = min(predict_time, time.perf_counter() - start)
+
+    peak_mem = None
+    if memory:
+        # tracemalloc slows down Python code, so memory is measured in a run of its own
+        train, predict = make()
+        tracemalloc.start()
+        try:
+            train()
+            predict()
+            peak_mem = tracemalloc.get_traced_memory()[1] / 1024**2
+        finally:
+            tracemalloc.stop()
+
+    return train_time, predict_time, peak_mem
+
+
+def _result(workload, surrogate, method, dim, num_train, batch, timings):
+    train_time, predict_time, peak_mem = timings
+    return {
+        'workload': workload,
+        'surrogate': surrogate,
+        'method': method,
+        'dim': dim,
+        'num_train': num_train,
+        'batch': batch,
+        'train_time': train_time,
+        'predict_time': predict_time,
+        'throughput': batch / predict_time,
+        'peak_mem': peak_mem,
+    }
+
+
+def time_surrogate(name, num_train, dim, batch, seed=0, memory=True):
+    """
+    Time the training and prediction of a surrogate used on its own.
+
+    Parameters
+    ----------
+    name : str
+        One of the keys of SURROGATES.
+    num_train : int
+        Number of training points.
+    dim : int
+        Number of inputs.
+    batch : int
+        Number of points predicted.
+    seed : int
+        Seed of the random training and prediction points.
+    memory : bool
+        If True, also measure the peak memory.
+
+    Returns
+    -------
+    dict
+        The 'train_time' and 'predict_time' in seconds, the 'throughput' in points per second
+        and the 'peak_mem' in MB (or None), plus the parameters of the workload.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.random((num_train, dim))
+    y = response(x)[:, np.newaxis]
+    x_pred = rng.random((batch, dim))
+
+    def make():
+        surrogate = SURROGATES[name]()
+
+        def train():
+            surrogate.train(x, y)
+
+        def predict():
+            if name in _SINGLE_POINT:
+                for point in x_pred:
+                    surrogate.predict(point)
+            else:
+                surrogate.predict(x_pred)
+
+        return train, predict
+
+    return _result('surrogate', name, '', dim, num_train, batch, _measure(make, memory))
+
+
+def time_unstructured(name, num_train, dim, batch, seed=0, memory=True):
+    """
+    Time the training and prediction of a MetaModelUnStructuredComp.
+
+    Parameters
+    ----------
+    name : str
+        The surrogate of the component, one of the keys of SURROGATES.
+    num_train : int
+        Number of training points.
+    dim : int
+        Number of inputs.
+    batch : int
+        Number of points predicted, which is the vec_size of the component.
+    seed : int
+        Seed of the random training and prediction points.
+    memory : bool
+        If True, also measure the peak memory.
+
+    Returns
+    -------
+    dict
+        The timings and parameters of the workload, see time_surrogate.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.random((num_train, dim))
+    y = response(x)
+    x_pred = rng.random((batch, dim))
+
+    def make():
+        comp = om.MetaModelUnStructuredComp(vec_size=batch, default_surrogate=SURROGATES[name]())
+        for i in range(dim):
+            comp.add_input(f'x{i}', np.zeros(batch), training_data=x[:, i])
+        comp.add_output('y', np.zeros(batch), training_data=y)
+
+        prob = om.Problem(reports=None)
+        prob.model.add_subsystem('mm', comp)
+
+        def train():
+            prob.setup()
+            for i in range(dim):
+                prob.set_val(f'mm.x{i}', x_pred[:, i])
+            prob.run_model()
+
+        def predict():
+            prob.run_model()
+
+        return train, predict
+
+    return _result('unstructured', name, '', dim, num_train, batch, _measure(make, memory))
+
+
+def time_structured(method, num_train, dim, batch, seed=0, memory=True):
+    """
+    Time the setup and prediction of a MetaModelStructuredComp.
+
+    Parameters
+    ----------
+    method : str
+        The interpolation method, one of TABLE_METHODS.
+    num_train : int
+        Approximate number of training points. The grid has the same number of points in
+        every dimension, and at least MIN_GRID_POINTS.
+    dim : int
+        Number of inputs.
+    batch : int
+        Number of points predicted, which is the vec_size of the component.
+    seed : int
+        Seed of the random prediction points.
+    memory : bool
+        If True, also measure the peak memory.
+
+    Returns
+    -------
+    dict
+        The timings and parameters of the workload, see time_surrogate. 'num_train' is the
+        actual number of grid points.
+    """
+    num_points = _grid_points(num_train, dim)
+    grid = [np.linspace(0., 1., num_points)] * dim
+    values = response(np.stack(np.meshgrid(*grid, indexing='ij'), axis=-1))
+    x_pred = np.random.default_rng(seed).random((batch, dim))
+
+    def make():
+        comp = om.MetaModelStructuredComp(method=method, vec_size=batch)
+        for i in range(dim):
+            comp.add_input(f'x{i}', np.zeros(batch), training_data=grid[i])
+        comp.add_output('y', np.zeros(batch), training_data=values)
+
+        prob = om.Problem(reports=None)
+        prob.model.add_subsystem('mm', comp)
+
+        def train():
+            prob.setup()
+            for i in range(dim):
+                prob.set_val(f'mm.x{i}', x_pred[:, i])
+            prob.run_model()
+
+        def predict():
+            prob.run_model()
+
+        return train, predict
+
+    return _result('structured', 'MetaModelStructuredComp', method, dim, num_points**dim, batch,
+                   _measure(make, memory))
+
+
+def _grid_points(num_train, dim):
+    """
+    Return the number of points per dimension of the structured grid for num_train points.
+    """
+    return max(int(round(num_train ** (1. / dim))), MIN_GRID_POINTS)
+
+
+def _fixed_dim(method):
+    """
+    Return the only dimension a method supports, e.g. 2 for '2D-slinear', or None.
+    """
+    if method[0].isdigit() and method[1:3] == 'D-':
+        return int(method[0])
+    return None
+
+
+def run_benchmark(workloads=WORKLOADS, num_trains=(50, 200), dims=(1, 2, 4), batches=(1, 100),
+                  surrogates=tuple(SURROGATES), methods=TABLE_METHODS, seed=0, memory=True,
+                  out=None):
+    """
+    Run every combination of the given workloads and parameters.
+
+    Parameters
+    ----------
+    workloads : iter of str
+        The workloads to run, from WORKLOADS.
+    num_trains : iter of int
+        Numbers of training points.
+    dims : iter of int
+        Numbers of inputs.
+    batches : iter of int
+        Numbers of points predicted at once.
+    surrogates : iter of str
+        The surrogates of the 'surrogate' and 'unstructured' workloads.
+    methods : iter of str
+        The interpolation methods of the 'structured' workload. The methods for a fixed
+        dimension (e.g. '3D-slinear') are only run with that dimension.
+    seed : int
+        Seed of the random training and prediction points.
+    memory : bool
+        If True, also measure the peak memory of each workload.
+    out : file or None
+        If given, each result is printed to it as a row of a table as soon as it is available.
+
+    Returns
+    -------
+    list of dict
+        The result of each workload, see time_surrogate.
+    """
+    cases = []
+    for workload in workloads:
+        for dim in dims:
+            grids = set()
+            for num_train in num_trains:
+                # small sizes can give the same grid in high dimensions
+                if workload == 'structured':
+                    num_points = _grid_points(num_train, dim)
+                    if num_points in grids:
+                        continue
+                    grids.add(num_points)
+                for batch in batches:
+                    if workload == 'structured':
+                        cases.extend((time_structured, method, num_train, dim, batch)
+                                     for method in methods
+                                     if _fixed_dim(method) in (None, dim))
+                    elif workload == 'unstructured':
+                        cases.extend((time_unstructured, name, num_train, dim, batch)
+                                     for name in surrogates)
+                    else:
+                        cases.extend((time_surrogate, name, num_train, dim, batch)
+                                     for name in surrogates)
+
+    if out is not None:
+        print(_header(), file=out)
+
+    results = []
+    for func, name, num_train, dim, batch in cases:
+        res = func(name, num_train, dim, batch, seed=seed, memory=memory)
+        results.append(res)
+        if out is not None:
+            print(_row(res), file=out, flush=True)
+
+    return results
+
+
+def _name(res):
+    if res['workload'] == 'structured':
+        return f"MetaModelStructuredComp ({res['method']})"
+    if res['workload'] == 'unstructured':
+        return f"MetaModelUnStructuredComp ({res['surrogate']})"
+    return res['surrogate']
+
+
+def _header():
+    return (f"{'model':>46}{'dim':>5}{'train pts':>11}{'batch':>8}{'train (s)':>12}"
+            f"{'predict (s)':>13}{'points/s':>12}{'peak MB':>10}")
+
+
+def _row(res):
+    mem = '' if res['peak_mem'] is None else f"{res['peak_mem']:10.2f}"
+    return (f"{_name(res):>46}{res['dim']:5d}{res['num_train']:11d}{res['batch']:8d}"
+            f"{res['train_time']:12.4f}{res['predict_time']:13.5f}{res['throughput']:12.4g}{mem}")
+
+
+def markdown_table(results):
+    """
+    Return the results as a markdown table.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results of run_benchmark.
+
+    Returns
+    -------
+    str
+        The table.
+    """
+    lines = ['| Model | Inputs | Training points | Batch | Train (s) | Predict (s) | Points/s '
+             '| Peak memory (MB) |',
+             '|---|--:|--:|--:|--:|--:|--:|--:|']
+    for res in results:
+        mem = '' if res['peak_mem'] is None else f"{res['peak_mem']:.2f}"
+        lines.append(f"| {_name(res)} | {res['dim']} | {res['num_train']} | {res['batch']} "
+                     f"| {res['train_time']:.4f} | {res['predict_time']:.5f} "
+                     f"| {res['throughput']:.4g} | {mem} |")
+    return '\n'.join(lines) + '\n'
+
+
+def surrogate_benchmark_cmd():
+    """
+    Run the surrogate benchmark for the sizes given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Time the training and prediction of the '
+                                                 'surrogate models and metamodel components.')
+    parser.add_argument('-w', '--workload', nargs='+', choices=WORKLOADS, default=WORKLOADS,
+                        help='Workloads to run (default is all of them).')
+    parser.add_argument('-n', '--num-train', nargs='+', type=int, default=[50, 200, 800],
+                        help='Numbers of training points. Training a KrigingSurrogate grows '
+                             'with the cube of this number.')
+    parser.add_argument('-d', '--dim', nargs='+', type=int, default=[1, 2, 4],
+                        help='Numbers of inputs.')
+    parser.add_argument('-b', '--batch', nargs='+', type=int, default=[1, 100, 1000],
+                        help='Numbers of points predicted at once.')
+    parser.add_argument('-s', '--surrogate', nargs='+', choices=list(SURROGATES),
+                        default=list(SURROGATES),
+                        help="Surrogates of the 'surrogate' and 'unstructured' workloads.")
+    parser.add_argument('-m', '--method', nargs='+', choices=TABLE_METHODS, default=TABLE_METHODS,
+                        help="Methods of the 'structured' workload.")
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the random training and prediction points.')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Do not measure the peak memory, which runs every workload twice.')
+    parser.add_argument('-o', '--output', action='store', default=None,
+                        help='Write the results to this JSON file.')
+    parser.add_argument('--markdown', action='store', default=None,
+                        help='Write the results as a markdown table to this file.')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.workload, args.num_train, args.dim, args.batch, args.surrogate,
+                            args.method, seed=args.seed, memory=not args.no_memory,
+                            out=sys.stdout)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+
+    if args.markdown:
+        with open(args.markdown, 'w') as f:
+            f.write(markdown_table(results))
+
+
+if __name__ == '__main__':
+    sys.exit(surrogate_benchmark_cmd())
@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+"""
+Record a DOE with many cases and time how its data can be read back.
+
+Two things are measured:
+
+- The cost of recording, by running the same DOE without a recorder and with a recorder for
+  each of the settings of the driver's recording_options in RECORDING_SETTINGS.
+- The cost of reading the values of a few variables for every case, by calling
+  CaseReader.get_case for each case, with and without pre_load, and by reading the whole
+  driver table of the database at once with case_arrays.
+
+The model is a Paraboloid with a constraint and a component with an array output whose size
+can be changed, so that recording the outputs costs more than recording the design variables
+and responses.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import openmdao.api as om
+from openmdao.test_suite.components.paraboloid import Paraboloid
+
+# Size of the array output of the model.
+DEFAULT_SIZE = 10
+
+# The recording_options of the driver for each setting of the recording benchmark. None means
+# no recorder at all. By default, a driver records the design variables and responses, and
+# 'includes' adds the other outputs (by promoted name) and, if record_inputs is True as it is by
+# default, the inputs (by absolute name).
+RECORDING_SETTINGS = {
+    'none': None,
+    'desvars': {'record_objectives': False, 'record_constraints': False,
+                'record_responses': False},
+    'default': {},
+    'all_outputs': {'includes': ['*'], 'record_inputs': False},
+    'excludes': {'includes': ['*'], 'excludes': ['g'], 'record_inputs': False},
+    'inputs': {'includes': ['*']},
+    'residuals': {'includes': ['*'], 'record_inputs': False, 'record_residuals': True},
+    'derivatives': {'record_derivatives': True},
+}
+
+# How the values of every case are read back: get_case for each case, with the cases loaded
+# into memory when the CaseReader is created (its default) or read from the database one at a
+# time, or case_arrays.
+EXTRACTION_METHODS = ['get_case', 'get_case_no_preload', 'case_arrays']
+
+
+def doe_problem(size=DEFAULT_SIZE):
+    """
+    Return the model of the benchmark in a Problem, with its design variables and responses.
+
+    Parameters
+    ----------
+    size : int
+        Size of the array output 'g'.
+
+    Returns
+    -------
+    Problem
+        The problem, which has not been set up.
+    """
+    prob = om.Problem(reports=None)
+    model = prob.model
+
+    model.add_subsystem('comp', Paraboloid(), promotes=['*'])
+    model.add_subsystem('con', om.ExecComp('c = x - y'), promotes=['*'])
+    model.add_subsystem('field', om.ExecComp('g = a * x + y', g={'shape': size},
+                                             a={'val': np.linspace(0., 1., size)}),
+                        promotes=['*'])
+
+    model.set_input_defaults('x', 0.0)
+    model.set_input_defaults('y', 0.0)
+
+    model.add_design_var('x', lower=-50.0, upper=50.0)
+    model.add_design_var('y', lower=-50.0, upper=50.0)
+    model.add_objective('f_xy')
+    model.add_constraint('c', lower=15.0)
+
+    return prob
+
+
+def record_doe(filename, num_cases, options=None, size=DEFAULT_SIZE, seed=0):
+    """
+    Run a DOE of random cases and record it.
+
+    Parameters
+    ----------
+    filename : str or None
+        The database to record to. It is not used if options is None.
+    num_cases : int
+        Number of cases of the DOE.
+    options : dict or None
+        The recording_options of the driver that differ from the defaults. If None, the DOE is
+        not recorded.
+    size : int
+        Size of the array output of the model.
+    seed : int
+        Seed of the UniformGenerator.
+
+    Returns
+    -------
+    float
+        The time taken by run_driver.
+    """
+    prob = doe_problem(size)
+    prob.driver = om.DOEDriver(om.UniformGenerator(num_samples=num_cases, seed=seed))
+
+    if options is not None:
+        # a relative path would be taken relative to the outputs directory of the problem
+        prob.driver.add_recorder(om.SqliteRecorder(os.path.abspath(filename),
+                                                   record_viewer_data=False))
+        for name, value in options.items():
+            prob.driver.recording_options[name] = value
+
+    prob.setup()
+    prob.final_setup()
+
+    start = time.perf_counter()
+    prob.run_driver()
+    elapsed = time.perf_counter() - start
+
+    prob.cleanup()
+
+    return elapsed
+
+
+def case_arrays(filename, names=None):
+    """
+    Return the values of variables in all the driver cases of a database.
+
+    Instead of creating a Case for every case, the outputs of all the driver cases are read
+    from the database in a single query. Like Case.get_val, the values are in the units of
+    the model and unscaled.
+
+    Parameters
+    ----------
+    filename : str
+        The database written by a SqliteRecorder attached to the driver.
+    names : iter of str or None
+        Promoted names of the variables. By default, all the recorded outputs.
+
+    Returns
+    -------
+    dict
+        An array for each variable, with the cases along the first axis in the order they
+        were recorded.
+    """
+    # by default, a CaseReader creates every Case when it is created
+    cr = om.CaseReader(filename, pre_load=False)
+    case_ids = cr.list_cases('driver', recurse=False, out_stream=None)
+    if not case_ids:
+        return {}
+
+    # the cases are keyed by the absolute names of the outputs. The outputs of the automatic
+    # IndepVarComp have the promoted names of the inputs connected to them.
+    first = cr.get_case(case_ids[0])
+    keys = {meta['prom_name']: abs_name
+            for abs_name, meta in first.get_io_metadata('output').items()}
+    if names is not None:
+        missing = [name for name in names if name not in keys]
+        if missing:
+            raise KeyError(f"{missing} are not recorded outputs of '{filename}'.")
+        keys = {name: keys[name] for name in names}
+
+    with contextlib.closing(sqlite3.connect(filename)) as con:
+        rows = con.execute('SELECT outputs FROM driver_iterations ORDER BY id').fetchall()
+
+    cases = [json.loads(row[0]) for row in rows]
+
+    return {name: np.array([case[key] for case in cases]) for name, key in keys.items()}
+
+
+def time_recording(directory, num_cases, settings=tuple(RECORDING_SETTINGS), size=DEFAULT_SIZE):
+    """
+    Time the same DOE without a recorder and with each of the given recording settings.
+
+    Parameters
+    ----------
+    directory : str
+        The directory the databases are written to.
+    num_cases : int
+        Number of cases of the DOE.
+    settings : iter of str
+        Keys of RECORDING_SETTINGS.
+    size : int
+        Size of the array output of the model.
+
+    Returns
+    -------
+    list of dict
+        The 'setting', the 'wall_time' of run_driver, the 'overhead' per case in seconds
+        compared to running without a recorder and the 'file_size' of the database in bytes,
+        for each setting.
+    """
+    base = record_doe(None, num_cases, None, size)
+
+    results = []
+    for setting in settings:
+        options = RECORDING_SETTINGS[setting]
+        filename = os.path.join(directory, f'record_{setting}.sql')
+        if options is None:
+            wall_time = base
+        else:
+            wall_time = record_doe(filename, num_cases, options, size)
+
+        results.append({
+            'setting': setting,
+            'wall_time': wall_time,
+            'overhead': (wall_time - base) / num_cases,
+            'file_size': os.path.getsize(filename) if options is not None else 0,
+        })
+
+    return results
+
+
+def time_extraction(filename, names, methods=EXTRACTION_METHODS):
+    """
+    Time reading the values of variables in all the driver cases of a database.
+
+    Parameters
+    ----------
+    filename : str
+        The database.
+    names : list of str
+        Promoted names of the variables to read.
+    methods : iter of str
+        Items of EXTRACTION_METHODS.
+
+    Returns
+    -------
+    list of dict
+        The 'method', the 'wall_time' it took, including opening the database, and the
+        resulting arrays in 'values', for each method.
+    """
+    results = []
+    for method in methods:
+        start = time.perf_counter()
+
+        if method == 'case_arrays':
+            values = case_arrays(filename, names)
+        else:
+            cr = om.CaseReader(filename, pre_load=(method == 'get_case'))
+
+            lists = {name: [] for name in names}
+            for case_id in cr.list_cases('driver', recurse=False, out_stream=None):
+                case = cr.get_case(case_id)
+                for name in names:
+                    lists[name].append(case.get_val(name))
+            values = {name: np.array(vals) for name, vals in lists.items()}
+
+        results.append({'method': method, 'wall_time': time.perf_counter() - start,
+                        'values': values})
+
+    return results
+
+
+def report(recording=None, extraction=None, num_cases=None, out=None):
+    """
+    Print tables of the results of time_recording and time_extraction.
+
+    Parameters
+    ----------
+    recording : list of dict or None
+        The results of time_recording.
+    extraction : list of dict or None
+        The results of time_extraction.
+    num_cases : int or None
+        Number of cases, used to show the extraction time per case.
+    out : file or None
+        Stream to write to. Defaults to stdout.
+    """
+    if recording:
+        print(f"{'setting':>22}{'run_driver (s)':>16}{'overhead/case (us)':>20}{'file MB':>10}",
+              file=out)
+        for res in recording:
+            print(f"{res['setting']:>22}{res['wall_time']:16.3f}{res['overhead'] * 1e6:20.1f}"
+                  f"{res['file_size'] / 1024**2:10.2f}", file=out)
+
+    if recording and extraction:
+        print(file=out)
+
+    if extraction:
+        print(f"{'method':>22}{'wall time (s)':>16}{'per case (us)':>20}", file=out)
+        for res in extraction:
+            per_case = f"{res['wall_time'] / num_cases * 1e6:20.1f}" if num_cases else ''
+            print(f"{res['method']:>22}{res['wall_time']:16.3f}{per_case}", file=out)
+
+
+def markdown_table(recording=None, extraction=None, num_cases=None):
+    """
+    Return the results of time_recording and time_extraction as markdown tables.
+
+    Parameters
+    ----------
+    recording : list of dict or None
+        The results of time_recording.
+    extraction : list of dict or None
+        The results of time_extraction.
+    num_cases : int or None
+        Number of cases, used to show the extraction time per case.
+
+    Returns
+    -------
+    str
+        The tables.
+    """
+    tables = []
+    if recording:
+        lines = ['| Setting | run_driver (s) | Overhead per case (us) | File size (MB) |',
+                 '|:---|--:|--:|--:|']
+        for res in recording:
+            lines.append(f"| {res['setting']} | {res['wall_time']:.3f} "
+                         f"| {res['overhead'] * 1e6:.1f} | {res['file_size'] / 1024**2:.2f} |")
+        tables.append('\n'.join(lines) + '\n')
+
+    if extraction:
+        lines = ['| Method | Wall time (s) | Per case (us) |', '|:---|--:|--:|']
+        for res in extraction:
+            per_case = f"{res['wall_time'] / num_cases * 1e6:.1f}" if num_cases else ''
+            lines.append(f"| {res['method']} | {res['wall_time']:.3f} | {per_case} |")
+        tables.append('\n'.join(lines) + '\n')
+
+    return '\n'.join(tables)
+
+
+def large_case_benchmark_cmd():
+    """
+    Run the recording and extraction benchmarks for the sizes given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Time recording a large DOE and reading the '
+                                                 'recorded cases back.')
+    parser.add_argument('-w', '--workload', nargs='+', choices=['recording', 'extraction'],
+                        default=['recording', 'extraction'],
+                        help='Benchmarks to run (default is both).')
+    parser.add_argument('-n', '--num-cases', type=int, default=100000,
+                        help='Number of cases of the DOE read back by the extraction benchmark '
+                             '(default is 100000).')
+    parser.add_argument('--recording-cases', type=int, default=10000,
+                        help='Number of cases of the DOE run for each recording setting '
+                             '(default is 10000).')
+    parser.add_argument('-s', '--size', type=int, default=DEFAULT_SIZE,
+                        help=f'Size of the array output of the model (default is {DEFAULT_SIZE}).')
+    parser.add_argument('--setting', nargs='+', choices=list(RECORDING_SETTINGS),
+                        default=list(RECORDING_SETTINGS),
+                        help='Recording settings to compare (default is all of them).')
+    parser.add_argument('-m', '--method', nargs='+', choices=EXTRACTION_METHODS,
+                        default=EXTRACTION_METHODS,
+                        help='Extraction methods to compare (default is all of them).')
+    parser.add_argument('--dir', action='store', default=None,
+                        help='Keep the databases in this directory instead of a temporary one.')
+    parser.add_argument('-o', '--output', action='store', default=None,
+                        help='Write the results to this JSON file.')
+    parser.add_argument('--markdown', action='store', default=None,
+                        help='Write the results as markdown tables to this file.')
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if args.dir is None:
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+        else:
+            directory = args.dir
+            os.makedirs(directory, exist_ok=True)
+
+        recording = extraction = None
+        if 'recording' in args.workload:
+            recording = time_recording(directory, args.recording_cases, args.setting, args.size)
+
+        if 'extraction' in args.workload:
+            filename = os.path.join(directory, 'cases.sql')
+            if os.path.exists(filename):
+                os.remove(filename)
+            record_time = record_doe(filename, args.num_cases, RECORDING_SETTINGS['all_outputs'],
+                                     args.size)
+            print(f"Recorded {args.num_cases} cases in {record_time:.2f} s "
+                  f"({os.path.getsize(filename) / 1024**2:.1f} MB)\n")
+            extraction = time_extraction(filename, ['x', 'y', 'f_xy', 'c', 'g'], args.method)
+
+    report(recording, extraction, args.num_cases)
+
+    if extraction:
+        extraction = [{k: v for k, v in res.items() if k != 'values'} for res in extraction]
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'recording_cases': args.recording_cases, 'num_cases': args.num_cases,
+                       'size': args.size, 'recording': recording, 'extraction': extraction},
+                      f, indent=1)
+
+    if args.markdown:
+        with open(args.markdown, 'w') as f:
+            f.write(markdown_table(recording, extraction, args.num_cases))
+
+
+if __name__ == '__main__':
+    sys.exit(large_case_benchmark_cmd())
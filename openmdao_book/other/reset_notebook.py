@@ -1,6 +1,14 @@
+import argparse
+import concurrent.futures
+import glob
 import json
+import os
+import sys
 
-def reset_notebook(fname):
+EXCLUDE_DIRS = ('_build', '_srcdocs', '.ipynb_checkpoints')
+
+
+def reset_notebook(fname, dryrun=False):
     """
     Empties the output fields and resets execution_count in all code cells in the given notebook.
 
@@ -10,11 +18,13 @@ def reset_notebook(fname):
     ----------
     fname : str
         Name of the notebook file.
+    dryrun : bool
+        If True, only report whether the notebook needs to be reset, without writing it.
 
     Returns
     -------
     bool
-        True if the file was updated.
+        True if the file was updated (or would be updated, if dryrun is True).
     """
 
     with open(fname) as f:
@@ -37,36 +47,114 @@ def reset_notebook(fname):
 
     dct['cells'] = newcells
 
-    if changed:
+    if changed and not dryrun:
         with open(fname, 'w') as f:
             json.dump(dct, f, indent=1, ensure_ascii=False)
 
     return changed
 
 
-def reset_notebook_cmd():
+def find_notebooks(paths):
     """
-    Run reset_notebook on any notebook files passed in via the command line.
+    Return the notebook files named by the given files, directories and glob patterns.
+
+    Directories are searched recursively, skipping build outputs and checkpoints.
+
+    Parameters
+    ----------
+    paths : list of str
+        Notebook files (the '.ipynb' extension may be omitted), directories or glob patterns.
+
+    Returns
+    -------
+    tuple of (list of str, list of str)
+        The notebook files found, and the paths that did not match anything.
     """
-    import os, sys
-    if len(sys.argv) < 2:
-        print(f"usage: python {os.path.basename(sys.argv[0])} <notebook_file(s)>")
-        sys.exit(-1)
+    found = []
+    missing = []
+    for path in paths:
+        if glob.has_magic(path):
+            matches = glob.glob(path, recursive=True)
+        else:
+            if not os.path.isdir(path) and os.path.splitext(path)[-1] != '.ipynb':
+                path += '.ipynb'
+            matches = [path] if os.path.exists(path) else []
+
+        if not matches:
+            missing.append(path)
+
+        for match in matches:
+            if os.path.isdir(match):
+                for root, dirs, files in os.walk(match, topdown=True):
+                    dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+                    found.extend(os.path.join(root, f) for f in sorted(files)
+                                 if f.endswith('.ipynb'))
+            elif match.endswith('.ipynb'):
+                found.append(match)
+
+    # remove duplicates, keeping the order
+    return list(dict.fromkeys(found)), missing
+
 
-    for fname in sys.argv[1:]:
-        if os.path.splitext(fname)[-1] != '.ipynb':
-            fname += '.ipynb'
+def reset_notebooks(fnames, dryrun=False, jobs=None):
+    """
+    Run reset_notebook concurrently on the given notebooks.
+
+    Parameters
+    ----------
+    fnames : list of str
+        Names of the notebook files.
+    dryrun : bool
+        If True, only report which notebooks need to be reset, without writing them.
+    jobs : int or None
+        Number of processes to use. Defaults to a number based on the CPU count.
+
+    Returns
+    -------
+    list of str
+        The notebooks that were updated (or would be updated, if dryrun is True).
+    """
+    if jobs == 1 or len(fnames) < 2:
+        changed = [reset_notebook(fname, dryrun) for fname in fnames]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            changed = list(executor.map(reset_notebook, fnames, [dryrun] * len(fnames),
+                                        chunksize=8))
 
-        if not os.path.isfile(fname):
-            print(f"Can't find file '{fname}'.")
-            sys.exit(-1)
+    return [fname for fname, updated in zip(fnames, changed) if updated]
 
-        if reset_notebook(fname):
+
+def reset_notebook_cmd():
+    """
+    Run reset_notebook on any notebook files, directories or globs passed in via the command line.
+    """
+    parser = argparse.ArgumentParser(description='Clear the outputs of notebooks.')
+    parser.add_argument('paths', nargs='+',
+                        help='Notebook files, directories (searched recursively) or glob '
+                             'patterns.')
+    parser.add_argument('--check', action='store_true',
+                        help='Do not write any files; exit with a non-zero status if any '
+                             'notebook has outputs or empty code cells.')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of processes used to reset notebooks.')
+    args = parser.parse_args()
+
+    fnames, missing = find_notebooks(args.paths)
+    for path in missing:
+        print(f"Can't find file '{path}'.")
+
+    changed = reset_notebooks(fnames, dryrun=args.check, jobs=args.jobs)
+    for fname in changed:
+        if args.check:
+            print("Would update file", fname)
+        else:
             print("Updated file", fname)
 
+    if missing or (args.check and changed):
+        sys.exit(-1)
+
 
 # TODO: once OpenMDAO_Book is a python package, register a console script to call reset_notebook
 
 if __name__ == '__main__':
     reset_notebook_cmd()
-
@@ -2,42 +2,66 @@
 import openmdao.api as om
 import numpy as np
 
-# note: size must be an even number
+# default number of points (note: size must be an even number)
 SIZE = 10
 
 
 class CircleOpt(om.Group):
 
+    def initialize(self):
+        self.options.declare('size', types=int, default=SIZE,
+                             desc='Number of points, which must be an even number.')
+        self.options.declare('seed', types=int, default=0, allow_none=True,
+                             desc='Seed used to generate the initial points. With the default '
+                                  'size and seed, a fixed set of points is used. If None, the '
+                                  'points are different every time.')
+        self.options.declare('diag_partials', types=bool, default=True,
+                             desc='Declare the partials of the vectorized ExecComps as diagonal.')
+
     def setup(self):
+        size = self.options['size']
+        diag = self.options['diag_partials']
+
+        if size % 2:
+            raise ValueError(f"{self.msginfo}: size must be an even number, but it is {size}.")
+
         indeps = self.add_subsystem('indeps', om.IndepVarComp(), promotes_outputs=['*'])
 
-        # the following were randomly generated using np.random.random(10)*2-1 to randomly
-        # disperse them within a unit circle centered at the origin.
-        indeps.add_output('x', np.array([ 0.55994437, -0.95923447,  0.21798656, -0.02158783,  0.62183717,
-                                          0.04007379,  0.46044942, -0.10129622,  0.27720413, -0.37107886]))
-        indeps.add_output('y', np.array([ 0.52577864,  0.30894559,  0.8420792 ,  0.35039912, -0.67290778,
-                                          -0.86236787, -0.97500023,  0.47739414,  0.51174103,  0.10052582]))
+        if self.options['seed'] == 0 and size == SIZE:
+            # the following were randomly generated using np.random.random(10)*2-1 to randomly
+            # disperse them within a unit circle centered at the origin.
+            x = np.array([ 0.55994437, -0.95923447,  0.21798656, -0.02158783,  0.62183717,
+                           0.04007379,  0.46044942, -0.10129622,  0.27720413, -0.37107886])
+            y = np.array([ 0.52577864,  0.30894559,  0.8420792 ,  0.35039912, -0.67290778,
+                           -0.86236787, -0.97500023,  0.47739414,  0.51174103,  0.10052582])
+        else:
+            rng = np.random.default_rng(self.options['seed'])
+            x = rng.random(size)*2-1
+            y = rng.random(size)*2-1
+
+        indeps.add_output('x', x)
+        indeps.add_output('y', y)
         indeps.add_output('r', .7)
 
-        self.add_subsystem('arctan_yox', om.ExecComp('g=arctan(y/x)', has_diag_partials=True,
-                                                     g=np.ones(SIZE), x=np.ones(SIZE), y=np.ones(SIZE)))
+        self.add_subsystem('arctan_yox', om.ExecComp('g=arctan(y/x)', has_diag_partials=diag,
+                                                     g=np.ones(size), x=np.ones(size), y=np.ones(size)))
 
         self.add_subsystem('circle', om.ExecComp('area=pi*r**2'))
 
-        self.add_subsystem('r_con', om.ExecComp('g=x**2 + y**2 - r', has_diag_partials=True,
-                                                g=np.ones(SIZE), x=np.ones(SIZE), y=np.ones(SIZE)))
+        self.add_subsystem('r_con', om.ExecComp('g=x**2 + y**2 - r', has_diag_partials=diag,
+                                                g=np.ones(size), x=np.ones(size), y=np.ones(size)))
 
-        thetas = np.linspace(0, np.pi/4, SIZE)
-        self.add_subsystem('theta_con', om.ExecComp('g = x - theta', has_diag_partials=True,
-                                                    g=np.ones(SIZE), x=np.ones(SIZE),
+        thetas = np.linspace(0, np.pi/4, size)
+        self.add_subsystem('theta_con', om.ExecComp('g = x - theta', has_diag_partials=diag,
+                                                    g=np.ones(size), x=np.ones(size),
                                                     theta=thetas))
-        self.add_subsystem('delta_theta_con', om.ExecComp('g = even - odd', has_diag_partials=True,
-                                                          g=np.ones(SIZE//2), even=np.ones(SIZE//2),
-                                                          odd=np.ones(SIZE//2)))
+        self.add_subsystem('delta_theta_con', om.ExecComp('g = even - odd', has_diag_partials=diag,
+                                                          g=np.ones(size//2), even=np.ones(size//2),
+                                                          odd=np.ones(size//2)))
 
-        self.add_subsystem('l_conx', om.ExecComp('g=x-1', has_diag_partials=True, g=np.ones(SIZE), x=np.ones(SIZE)))
+        self.add_subsystem('l_conx', om.ExecComp('g=x-1', has_diag_partials=diag, g=np.ones(size), x=np.ones(size)))
 
-        IND = np.arange(SIZE, dtype=int)
+        IND = np.arange(size, dtype=int)
         ODD_IND = IND[1::2]  # all odd indices
         EVEN_IND = IND[0::2]  # all even indices
 
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Time the phases of the CircleOpt problem for a range of sizes.
+
+For each size, the time taken by setup (including final_setup), run_model, compute_totals and
+run_driver is reported. With total coloring, the first call to compute_totals also computes the
+coloring, so both the first and a repeated call are timed.
+
+compute_totals returns the total jacobian as a dense array, and the coloring is computed from
+dense total jacobians as well. With about 2 * size rows and columns, that needs several GB of
+memory at a few thousand points, so by default only setup and run_model are timed above
+TOTALS_MAX_SIZE.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import openmdao.api as om
+
+from circle_opt import CircleOpt
+
+# SLSQP works with dense matrices, so the optimization is skipped above this size by default.
+DRIVER_MAX_SIZE = 500
+
+# Above this size, compute_totals is skipped by default. The memory used grows with the square of
+# the size: computing the coloring of 5000 points took 4 GB (and 47 s).
+TOTALS_MAX_SIZE = 2000
+
+
+def time_circle_opt(size, seed=0, coloring=True, diag_partials=True, mode='fwd',
+                    totals=True, run_driver=True, maxiter=200, work_dir=None):
+    """
+    Build and run the CircleOpt problem of the given size, timing each phase.
+
+    Parameters
+    ----------
+    size : int
+        Number of points, which must be an even number.
+    seed : int
+        Seed used to generate the initial points.
+    coloring : bool
+        If True, use total derivative coloring.
+    diag_partials : bool
+        If True, declare the partials of the vectorized ExecComps as diagonal.
+    mode : str
+        Derivative direction, 'fwd' or 'rev'.
+    totals : bool
+        If True, time compute_totals.
+    run_driver : bool
+        If True, also run the optimization.
+    maxiter : int
+        Maximum number of SLSQP iterations.
+    work_dir : str or None
+        Directory in which the problem writes its coloring file (default is the current
+        directory).
+
+    Returns
+    -------
+    dict
+        The time in seconds of each phase (None for the phases that were not run), plus the
+        'size', the 'area' found by the optimizer and its 'error' relative to pi (None if the
+        driver was not run).
+    """
+    options = {} if work_dir is None else {'work_dir': work_dir}
+    p = om.Problem(model=CircleOpt(size=size, seed=seed, diag_partials=diag_partials),
+                   driver=om.ScipyOptimizeDriver(optimizer='SLSQP', maxiter=maxiter, disp=False),
+                   reports=None, **options)
+    if coloring:
+        p.driver.declare_coloring()
+
+    timings = {'size': size}
+
+    start = time.perf_counter()
+    p.setup(mode=mode)
+    p.final_setup()
+    timings['setup'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    p.run_model()
+    timings['run_model'] = time.perf_counter() - start
+
+    timings['first_totals'] = timings['compute_totals'] = None
+    if totals:
+        start = time.perf_counter()
+        p.compute_totals()
+        timings['first_totals'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        p.compute_totals()
+        timings['compute_totals'] = time.perf_counter() - start
+
+    timings['run_driver'] = timings['area'] = timings['error'] = None
+    if run_driver:
+        start = time.perf_counter()
+        p.run_driver()
+        timings['run_driver'] = time.perf_counter() - start
+        timings['area'] = p.get_val('circle.area')[0]
+        timings['error'] = abs(timings['area'] - np.pi) / np.pi
+
+    return timings
+
+
+COLUMNS = ['setup', 'run_model', 'first_totals', 'compute_totals', 'run_driver']
+
+
+def _header():
+    return f"{'size':>8}" + ''.join(f"{col:>16}" for col in COLUMNS) + f"{'area error':>12}"
+
+
+def _row(res):
+    times = ''.join(f"{'-':>16}" if res[col] is None else f"{res[col]:16.4f}" for col in COLUMNS)
+    error = '-' if res['error'] is None else f"{res['error']:.2e}"
+    return f"{res['size']:8d}{times}{error:>12}"
+
+
+def report(results, out=None):
+    """
+    Print a table of the results of time_circle_opt.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results of time_circle_opt for each size.
+    out : file or None
+        Stream to write to. Defaults to stdout.
+    """
+    print(_header(), file=out)
+    for res in results:
+        print(_row(res), file=out)
+
+
+def circle_opt_benchmark_cmd():
+    """
+    Run the CircleOpt benchmark for the sizes given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Time setup, run_model, compute_totals and '
+                                                 'run_driver of CircleOpt at several sizes.')
+    parser.add_argument('sizes', nargs='*', type=int, default=[10, 100, 1000, 10000],
+                        help='Numbers of points (even numbers).')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed used to generate the initial points.')
+    parser.add_argument('--no-coloring', action='store_true',
+                        help='Do not use total derivative coloring.')
+    parser.add_argument('--no-diag-partials', action='store_true',
+                        help='Do not declare the partials of the ExecComps as diagonal.')
+    parser.add_argument('--mode', choices=['fwd', 'rev'], default='fwd',
+                        help='Derivative direction.')
+    parser.add_argument('--totals-max-size', type=int, default=TOTALS_MAX_SIZE,
+                        help='Only time compute_totals and run the optimization for sizes up to '
+                             'this one, since the total jacobian is a dense array '
+                             f'(default {TOTALS_MAX_SIZE}).')
+    parser.add_argument('--no-totals', action='store_true',
+                        help='Only time setup and run_model.')
+    parser.add_argument('--driver-max-size', type=int, default=DRIVER_MAX_SIZE,
+                        help='Only run the optimization for sizes up to this one '
+                             f'(default {DRIVER_MAX_SIZE}).')
+    parser.add_argument('--maxiter', type=int, default=200,
+                        help='Maximum number of SLSQP iterations.')
+    args = parser.parse_args()
+
+    results = []
+    # keep the coloring files out of the book
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            totals = not args.no_totals and size <= args.totals_max_size
+            results.append(time_circle_opt(size, seed=args.seed, coloring=not args.no_coloring,
+                                           diag_partials=not args.no_diag_partials,
+                                           mode=args.mode, totals=totals,
+                                           run_driver=totals and size <= args.driver_max_size,
+                                           maxiter=args.maxiter, work_dir=work_dir))
+
+    # coloring reports are printed while the problems run, so print the table at the end
+    print()
+    report(results)
+
+
+if __name__ == '__main__':
+    circle_opt_benchmark_cmd()
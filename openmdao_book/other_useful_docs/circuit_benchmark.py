@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Time the solution of CircuitNetwork with each linear solver for a range of sizes.
+
+For each topology, number of nodes and linear solver, the time taken by setup (including
+final_setup), by run_model (the Newton solve) and by compute_totals (one more linear solve) is
+reported, along with the number of Newton iterations and the voltage at the source, which should
+be the same for every linear solver.
+"""
+import argparse
+import time
+import warnings
+
+import openmdao.api as om
+
+from circuit_network import CircuitNetwork, TOPOLOGIES, LINEAR_SOLVERS
+
+# The dense assembled jacobian has (about 4 * num_nodes)**2 entries, so it is skipped above
+# this number of nodes by default.
+DENSE_MAX_NODES = 2000
+
+
+def time_circuit(topology, num_nodes, linear_solver, seed=0):
+    """
+    Build and solve a CircuitNetwork, timing each phase.
+
+    Parameters
+    ----------
+    topology : str
+        One of TOPOLOGIES.
+    num_nodes : int
+        Number of nodes.
+    linear_solver : str
+        One of LINEAR_SOLVERS.
+    seed : int
+        Seed used to pick the diodes and the random connections.
+
+    Returns
+    -------
+    dict
+        The time in seconds of each phase, plus the 'topology', 'num_nodes' and
+        'linear_solver', the number of 'newton_iters' and the source voltage 'V_source'.
+    """
+    p = om.Problem(reports=None)
+    p.model.add_subsystem('circuit', CircuitNetwork(topology=topology, num_nodes=num_nodes,
+                                                    linear_solver=linear_solver, seed=seed))
+    p.model.set_input_defaults('circuit.I_in', 0.1, units='A')
+    p.model.set_input_defaults('circuit.Vg', 0., units='V')
+
+    timings = {'topology': topology, 'num_nodes': num_nodes, 'linear_solver': linear_solver}
+
+    start = time.perf_counter()
+    p.setup()
+    p.final_setup()
+    timings['setup'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    p.run_model()
+    timings['run_model'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    p.compute_totals(of=['circuit.n0.V'], wrt=['circuit.I_in'])
+    timings['compute_totals'] = time.perf_counter() - start
+
+    timings['newton_iters'] = p.model.circuit.nonlinear_solver._iter_count
+    timings['V_source'] = p.get_val('circuit.n0.V')[0]
+
+    return timings
+
+
+COLUMNS = ['setup', 'run_model', 'compute_totals']
+
+
+def _header():
+    return (f"{'topology':>8}{'nodes':>8}{'solver':>8}" + ''.join(f"{col:>16}" for col in COLUMNS)
+            + f"{'newton iters':>14}{'V_source':>12}")
+
+
+def _row(res):
+    times = ''.join(f"{res[col]:16.4f}" for col in COLUMNS)
+    return (f"{res['topology']:>8}{res['num_nodes']:8d}{res['linear_solver']:>8}{times}"
+            f"{res['newton_iters']:14d}{res['V_source']:12.6f}")
+
+
+def report(results, out=None):
+    """
+    Print a table of the results of time_circuit.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results of time_circuit.
+    out : file or None
+        Stream to write to. Defaults to stdout.
+    """
+    print(_header(), file=out)
+    for res in results:
+        print(_row(res), file=out)
+
+
+def circuit_benchmark_cmd():
+    """
+    Run the circuit benchmark for the sizes given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Time the Newton solution of large circuits '
+                                                 'with dense and sparse direct solvers and GMRES.')
+    parser.add_argument('sizes', nargs='*', type=int, default=[100, 300, 1000],
+                        help='Numbers of nodes. There are about 3 components per node, so '
+                             'setup takes most of the time at a few thousand nodes.')
+    parser.add_argument('-t', '--topology', nargs='+', choices=TOPOLOGIES, default=TOPOLOGIES,
+                        help='Topologies of the circuits.')
+    parser.add_argument('-s', '--linear-solver', nargs='+', choices=LINEAR_SOLVERS,
+                        default=LINEAR_SOLVERS, help='Linear solvers to compare.')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed used to pick the diodes and the random connections.')
+    parser.add_argument('--dense-max-nodes', type=int, default=DENSE_MAX_NODES,
+                        help='Only use the dense jacobian for sizes up to this one '
+                             f'(default {DENSE_MAX_NODES}).')
+    args = parser.parse_args()
+
+    # the DirectSolver warns about the format of the jacobian the other solvers prefer
+    warnings.simplefilter('ignore', om.OpenMDAOWarning)
+
+    print(_header())
+    for topology in args.topology:
+        for num_nodes in args.sizes:
+            for solver in args.linear_solver:
+                if solver == 'dense' and num_nodes > args.dense_max_nodes:
+                    continue
+                print(_row(time_circuit(topology, num_nodes, solver, seed=args.seed)),
+                      flush=True)
+
+
+if __name__ == '__main__':
+    circuit_benchmark_cmd()
@@ -0,0 +1,170 @@
+"""
+Circuits of any size, built from the Resistor, Diode and Node components of circuit.py.
+
+A current source feeds node 0 of the network and every node is connected to ground through a
+resistor or, for a fraction of them, a diode. The nodes are connected to each other by resistors
+in one of the following topologies:
+
+- 'ladder': a chain of nodes, like a transmission line.
+- 'grid': a square grid, with each node connected to its neighbors.
+- 'mesh': a chain of nodes plus random connections between any two nodes.
+"""
+import numpy as np
+
+import openmdao.api as om
+from openmdao.test_suite.scripts.circuit_analysis import Resistor, Diode, Node
+
+TOPOLOGIES = ['ladder', 'grid', 'mesh']
+
+LINEAR_SOLVERS = ['dense', 'csc', 'gmres']
+
+
+def circuit_edges(topology, num_nodes, diode_fraction=0.1, seed=0):
+    """
+    Return the elements of a circuit with the given topology.
+
+    Parameters
+    ----------
+    topology : str
+        One of TOPOLOGIES.
+    num_nodes : int
+        Number of nodes. For the 'grid' topology, it is rounded down to a square number.
+    diode_fraction : float
+        Fraction of the nodes connected to ground through a diode instead of a resistor.
+    seed : int
+        Seed used to pick the diodes and the connections of the 'mesh' topology.
+
+    Returns
+    -------
+    list of tuple
+        One (kind, from_node, to_node) tuple per element, where kind is 'R' or 'D' and to_node
+        is None for the connections to ground.
+    """
+    rng = np.random.default_rng(seed)
+
+    if topology == 'ladder':
+        links = [(i, i + 1) for i in range(num_nodes - 1)]
+    elif topology == 'grid':
+        n = int(np.sqrt(num_nodes))
+        num_nodes = n * n
+        links = [(i * n + j, i * n + j + 1) for i in range(n) for j in range(n - 1)]
+        links += [(i * n + j, (i + 1) * n + j) for i in range(n - 1) for j in range(n)]
+    elif topology == 'mesh':
+        links = [(i, i + 1) for i in range(num_nodes - 1)]
+        extra = rng.integers(num_nodes, size=(num_nodes, 2))
+        links += sorted({(min(a, b), max(a, b)) for a, b in extra if a != b} - set(links))
+    else:
+        raise ValueError(f"Unknown topology '{topology}'. Valid topologies are {TOPOLOGIES}.")
+
+    edges = [('R', a, b) for a, b in links]
+
+    # node 0 has the source, so it is always grounded through a resistor
+    diodes = rng.random(num_nodes) < diode_fraction
+    diodes[0] = False
+    edges += [('D' if diode else 'R', i, None) for i, diode in enumerate(diodes)]
+
+    return edges
+
+
+class CircuitNetwork(om.Group):
+    """
+    A circuit with many nodes, solved with Newton's method.
+    """
+
+    def initialize(self):
+        self.options.declare('topology', default='ladder', values=TOPOLOGIES,
+                             desc='How the nodes are connected to each other.')
+        self.options.declare('num_nodes', default=100, types=int, desc='Number of nodes.')
+        self.options.declare('diode_fraction', default=0.1,
+                             desc='Fraction of the nodes grounded through a diode.')
+        self.options.declare('seed', default=0, types=int,
+                             desc='Seed used to pick the diodes and the random connections.')
+        self.options.declare('R_link', default=100., desc='Resistance between two nodes.')
+        self.options.declare('R_ground', default=10000., desc='Resistance to ground.')
+        self.options.declare('linear_solver', default='csc', values=LINEAR_SOLVERS,
+                             desc='DirectSolver with a dense or a CSC assembled jacobian, or '
+                                  'ScipyKrylov (GMRES) with an assembled jacobian.')
+
+    def setup(self):
+        opts = self.options
+        edges = circuit_edges(opts['topology'], opts['num_nodes'], opts['diode_fraction'],
+                              opts['seed'])
+        num_nodes = max(a for _, a, _ in edges) + 1
+
+        n_in = np.zeros(num_nodes, dtype=int)
+        n_out = np.zeros(num_nodes, dtype=int)
+        n_in[0] = 1  # the source
+
+        connections = []
+        for k, (kind, a, b) in enumerate(edges):
+            name = f"{kind}{k}"
+            if kind == 'R':
+                comp = Resistor(R=opts['R_link'] if b is not None else opts['R_ground'])
+            else:
+                comp = Diode()
+
+            if b is None:
+                self.add_subsystem(name, comp, promotes_inputs=[('V_out', 'Vg')])
+            else:
+                self.add_subsystem(name, comp)
+                connections.append((f'n{b}.V', f'{name}.V_out'))
+                connections.append((f'{name}.I', f'n{b}.I_in:{n_in[b]}'))
+                n_in[b] += 1
+
+            connections.append((f'n{a}.V', f'{name}.V_in'))
+            connections.append((f'{name}.I', f'n{a}.I_out:{n_out[a]}'))
+            n_out[a] += 1
+
+        # n0 has the source, so its first input is the source current
+        self.add_subsystem('n0', Node(n_in=int(n_in[0]), n_out=int(n_out[0])),
+                           promotes_inputs=[('I_in:0', 'I_in')])
+        for i in range(1, num_nodes):
+            self.add_subsystem(f'n{i}', Node(n_in=int(n_in[i]), n_out=int(n_out[i])))
+
+        for src, tgt in connections:
+            self.connect(src, tgt)
+
+        self.nonlinear_solver = om.NewtonSolver(solve_subsystems=False, maxiter=50, iprint=0)
+        self.nonlinear_solver.linesearch = om.ArmijoGoldsteinLS(iprint=-1)
+
+        self._num_nodes = num_nodes
+        self._first_guess = True
+
+        solver = opts['linear_solver']
+        if solver in ('dense', 'csc'):
+            self.options['assembled_jac_type'] = solver
+            self.linear_solver = om.DirectSolver(assemble_jac=True)
+        else:
+            self.linear_solver = om.ScipyKrylov(assemble_jac=True, maxiter=1000, atol=1e-12,
+                                                rtol=1e-12, iprint=-1)
+
+    def guess_nonlinear(self, inputs, outputs, residuals):
+        # At the default of 5 V, the diodes are so deep into conduction that Newton's method
+        # needs a step per 25 mV to bring them back, and from 0 V its first step overshoots
+        # into overflow. Start the first solve near the forward voltage of the diodes instead.
+        if self._first_guess:
+            self._first_guess = False
+            for i in range(self._num_nodes):
+                outputs[f'n{i}.V'] = 0.7
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Solve a circuit with many nodes.')
+    parser.add_argument('topology', choices=TOPOLOGIES, help='How the nodes are connected.')
+    parser.add_argument('num_nodes', type=int, help='Number of nodes.')
+    parser.add_argument('--linear-solver', choices=LINEAR_SOLVERS, default='csc',
+                        help='Linear solver of the Newton iterations.')
+    args = parser.parse_args()
+
+    p = om.Problem(reports=None)
+    p.model.add_subsystem('circuit', CircuitNetwork(topology=args.topology,
+                                                    num_nodes=args.num_nodes,
+                                                    linear_solver=args.linear_solver))
+    p.model.set_input_defaults('circuit.I_in', 0.1, units='A')
+    p.model.set_input_defaults('circuit.Vg', 0., units='V')
+    p.setup()
+    p.run_model()
+
+    print('Source voltage:', p.get_val('circuit.n0.V')[0])
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Time the multipoint beam optimization for a range of sizes and numbers of workers.
+
+For each combination of number of elements, number of load cases and number of workers, the
+optimization is run and the wall time per optimizer iteration is reported. With 0 workers, the
+load cases are solved by MultipointBeamGroup, one after the other, or in parallel when run under
+MPI. With 1 or more workers, they are solved in a local process pool, so the multipoint speedup
+can be measured on a single machine without MPI.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from multipoint_beam_opt import build_problem
+
+
+def time_beam_opt(num_elements, num_load_cases, num_workers, maxiter=20):
+    """
+    Run the multipoint beam optimization and return the time per optimizer iteration.
+
+    Parameters
+    ----------
+    num_elements : int
+        Number of beam elements.
+    num_load_cases : int
+        Number of load cases.
+    num_workers : int
+        Number of processes solving the load cases, or 0 to use MultipointBeamGroup.
+    maxiter : int
+        Maximum number of SLSQP iterations.
+
+    Returns
+    -------
+    dict
+        The 'num_elements', 'num_load_cases' and 'num_workers', the number of optimizer
+        'iterations' (gradient evaluations), the 'run_driver' time in seconds and the
+        'time_per_iter'.
+    """
+    prob = build_problem(num_elements, num_load_cases, num_workers, maxiter=maxiter, disp=False)
+    prob.final_setup()
+
+    # the driver reports the iteration limit being reached even with disp=False
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        prob.run_driver()
+        elapsed = time.perf_counter() - start
+
+    iterations = prob.driver.result.deriv_evals
+
+    return {'num_elements': num_elements, 'num_load_cases': num_load_cases,
+            'num_workers': num_workers, 'iterations': iterations, 'run_driver': elapsed,
+            'time_per_iter': elapsed / max(iterations, 1)}
+
+
+COLUMNS = ['num_elements', 'num_load_cases', 'num_workers', 'iterations', 'run_driver',
+           'time_per_iter']
+
+
+def _header():
+    return ''.join(f"{col:>16}" for col in COLUMNS)
+
+
+def _row(res):
+    return ''.join(f"{res[col]:16.4f}" if isinstance(res[col], float) else f"{res[col]:16d}"
+                   for col in COLUMNS)
+
+
+def report(results, out=None):
+    """
+    Print a table of the results of time_beam_opt.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results of time_beam_opt.
+    out : file or None
+        Stream to write to. Defaults to stdout.
+    """
+    print(_header(), file=out)
+    for res in results:
+        print(_row(res), file=out)
+
+
+def multipoint_beam_benchmark_cmd():
+    """
+    Run the multipoint beam benchmark for the sizes given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Time the multipoint beam optimization per '
+                                                 'optimizer iteration.')
+    parser.add_argument('--num-elements', type=int, nargs='+', default=[50, 200, 1000],
+                        help='Numbers of beam elements. Some partials of the beam components '
+                             'are dense, so memory use grows with the square of this number '
+                             '(about 1 GB at 2000 elements).')
+    parser.add_argument('--num-load-cases', type=int, nargs='+', default=[2, 8],
+                        help='Numbers of load cases.')
+    parser.add_argument('-j', '--workers', type=int, nargs='+', default=[0, 1, 2, 4],
+                        help='Numbers of processes solving the load cases. 0 uses '
+                             'MultipointBeamGroup.')
+    parser.add_argument('--maxiter', type=int, default=20,
+                        help='Maximum number of SLSQP iterations.')
+    args = parser.parse_args()
+
+    print(_header())
+    for num_elements in args.num_elements:
+        for num_load_cases in args.num_load_cases:
+            for num_workers in args.workers:
+                print(_row(time_beam_opt(num_elements, num_load_cases, num_workers,
+                                         maxiter=args.maxiter)), flush=True)
+
+
+if __name__ == '__main__':
+    multipoint_beam_benchmark_cmd()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+"""
+Lint engine for the notebooks of the book.
+
+Each notebook is parsed once and all rules are run against the parsed notebook. A rule is a
+function that takes the file name and the parsed notebook and returns a list of messages,
+one for each violation it finds.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+
+EXCLUDE_DIRS = [
+    'tests',
+    'test',
+    '_build',
+    '.ipynb_checkpoints',
+    '_srcdocs'
+]
+
+BOOK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADER = ["try:\n",
+          "    import openmdao.api as om\n",
+          "except ImportError:\n",
+          "    !python -m pip install openmdao[notebooks]\n",
+          "    import openmdao.api as om"]
+
+MPI_HEADER = ['%pylab inline\n',
+              'from ipyparallel import Client, error\n',
+              'cluster=Client(profile="mpi")\n',
+              'view=cluster[:]\n',
+              'view.block=True\n',
+              '\n'] + HEADER
+
+HEADER_TAGS = ['active-ipynb', 'remove-input', 'remove-output']
+
+# These notebooks are exempt from the header rule.
+HEADER_EXEMPT = ['getting_started.ipynb']
+
+
+def get_files(top=BOOK_DIR):
+    """
+    Return the notebooks under top that should be linted.
+
+    Parameters
+    ----------
+    top : str
+        The directory to search.
+
+    Yields
+    ------
+    str
+        The name of a notebook.
+    """
+    for root, dirs, files in os.walk(top, topdown=True):
+        # do not bother looking further down in excluded dirs
+        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+        if root == top:
+            continue
+        for file_name in sorted(files):
+            if not file_name.startswith('_') and file_name.endswith('.ipynb'):
+                yield os.path.join(root, file_name)
+
+
+def check_output(file, nb):
+    """
+    Check that no code cell has been executed, i.e. the notebook has no output.
+    """
+    for cell in nb['cells']:
+        if 'execution_count' in cell and cell['execution_count'] is not None:
+            msg = "Clear output with 'jupyter nbconvert  --clear-output " \
+                  f"--inplace path_to_notebook.ipynb'"
+            return [f"Output found in {file}.\n{msg}"]
+    return []
+
+
+def check_header(file, nb):
+    """
+    Check that the first cell is the code cell installing openmdao, with the right tags.
+    """
+    if any(exempt in file for exempt in HEADER_EXEMPT):
+        return []
+
+    code_cells = [cell for cell in nb['cells'] if cell['cell_type'] == 'code']
+    if len(code_cells) < 1:
+        return []
+
+    first_block = nb['cells'][0]['source']
+    if first_block != HEADER and first_block != MPI_HEADER:
+        header_text = '\n'.join(HEADER)
+        return [f'required header not found in notebook {file}\n'
+                f'All notebooks should contain the following block before '
+                f'any other code blocks:\n'
+                f'-----------------------------------------\n'
+                f'{header_text}\n'
+                f'-----------------------------------------\n']
+
+    try:
+        first_cell = nb['cells'][0]['metadata']['tags']
+    except KeyError:
+        return [f"Missing metadata tags in header in notebook {file}. "
+                f"Headers must contain the following tags: {HEADER_TAGS}."]
+
+    if sorted(first_cell) != sorted(HEADER_TAGS):
+        return [f"Incorrect header tags in notebook {file}. Found "
+                f"{sorted(first_cell)}, should be: {sorted(HEADER_TAGS)}."]
+
+    return []
+
+
+def check_assert(file, nb):
+    """
+    Make sure any code cells with asserts are hidden.
+    """
+    msgs = []
+    for i, block in enumerate(nb['cells'][1:], 1):
+
+        # Don't check markup cells
+        if block['cell_type'] != 'code':
+            continue
+
+        tags = block['metadata'].get('tags')
+        if tags:
+
+            # Don't check hidden cells
+            if 'remove-input' in tags and 'remove-output' in tags:
+                continue
+
+            # We allow an assert in a cell if you tag it.
+            if "allow-assert" in tags:
+                continue
+
+        code = ''.join(block['source'])
+        if 'assert' in code:
+            msgs.append(f"Assert found in a code block (cell {i}) in {file}. ")
+
+    return msgs
+
+
+RULES = {
+    'output': check_output,
+    'header': check_header,
+    'assert': check_assert,
+}
+
+
+def lint_notebook(file, rules=None):
+    """
+    Parse a notebook once and run every rule against it.
+
+    Parameters
+    ----------
+    file : str
+        Name of the notebook file.
+    rules : dict or None
+        Mapping of rule name to rule function. Defaults to RULES.
+
+    Returns
+    -------
+    dict
+        Mapping of rule name to the list of messages for the violations found. A notebook that
+        cannot be parsed is reported under 'json'.
+    """
+    if rules is None:
+        rules = RULES
+
+    try:
+        with open(file) as f:
+            nb = json.load(f)
+    except (OSError, ValueError) as err:
+        return {'json': [f"Unable to parse notebook {file}: {err}"]}
+
+    return {name: rule(file, nb) for name, rule in rules.items()}
+
+
+def lint_files(files, rules=None, jobs=None):
+    """
+    Lint the given notebooks, optionally in parallel.
+
+    Parameters
+    ----------
+    files : iter of str
+        Names of the notebook files.
+    rules : dict or None
+        Mapping of rule name to rule function. Defaults to RULES. When jobs is given, the rule
+        functions must be importable module-level functions.
+    jobs : int or None
+        If given, lint the notebooks in this many processes.
+
+    Returns
+    -------
+    dict
+        Mapping of file name to the result of lint_notebook for that file.
+    """
+    files = list(files)
+    if jobs and jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(lint_notebook, files, [rules] * len(files),
+                                   chunksize=max(1, len(files) // (4 * jobs)))
+            return dict(zip(files, results))
+
+    return {file: lint_notebook(file, rules) for file in files}
+
+
+def lint_cmd():
+    """
+    Lint the notebooks passed in via the command line (or the whole book).
+    """
+    parser = argparse.ArgumentParser(description='Lint the notebooks of the book.')
+    parser.add_argument('paths', nargs='*',
+                        help='Notebooks or directories to lint (default is the whole book).')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of processes used to lint the notebooks.')
+    parser.add_argument('-r', '--rule', action='append', choices=sorted(RULES), default=None,
+                        help='Only run this rule (may be given more than once).')
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths or [BOOK_DIR]:
+        if os.path.isdir(path):
+            files.extend(get_files(path))
+        else:
+            files.append(path)
+
+    rules = RULES if args.rule is None else {name: RULES[name] for name in args.rule}
+
+    n_errors = 0
+    for file, violations in lint_files(files, rules, args.jobs).items():
+        for rule, msgs in violations.items():
+            for msg in msgs:
+                print(f"[{rule}] {msg}")
+                n_errors += 1
+
+    if n_errors:
+        print(f"{n_errors} problems found in {len(files)} notebooks.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    lint_cmd()
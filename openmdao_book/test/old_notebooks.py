@@ -1,44 +1,15 @@
 #!/usr/bin/env python
 # coding: utf-8
 import pathlib
-import fnmatch
-import json
-import os
+import sys
 import unittest
-import nbformat
-from nbconvert.preprocessors import ExecutePreprocessor
-from nbconvert.preprocessors.execute import CellExecutionError
 
 from parameterized import parameterized
 
-
-RUN_PATH = '.'
-TIMEOUT = 600
-KERNEL = 'python3'
-EXCLUDE_DIRS = set(['_build', '_srcdocs', '.ipynb_checkpoints'])
 BOOK_DIR = pathlib.PurePath(__file__).parent.parent
+sys.path.insert(0, str(BOOK_DIR.parent))
 
-
-def collect_filenames(book_dir='openmdao_book'):
-    """
-    Return filenames of notebooks under book_dir.
-
-    Parameters
-    ----------
-    book_dir : str
-        The directory containing the Jupyter-Book to be created.
-
-    Yields
-    ------
-    str
-        The name of a notebook.
-
-    """
-    for dirpath, dirs, files in os.walk(book_dir, topdown=True):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        for f in files:
-            if f.endswith('.ipynb'):
-                yield str(pathlib.PurePath(dirpath, f))
+from notebook_runner import collect_filenames, run_notebooks, TIMEOUT, KERNEL
 
 
 def f2str(func, nparams, params):
@@ -48,38 +19,20 @@ def f2str(func, nparams, params):
 
 class TestNotebooks(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # All notebooks are executed up front by the pool of warm kernels of run_notebooks,
+        # each in a private copy of its directory, and every test checks its own result. The
+        # pool already runs them concurrently, so run this file in one process (testflo -n 1).
+        results = run_notebooks(collect_filenames(BOOK_DIR), book_dir=BOOK_DIR, timeout=TIMEOUT,
+                                kernel_name=KERNEL)
+        cls.results = {result['path']: result for result in results}
+
     @parameterized.expand(collect_filenames(BOOK_DIR), name_func=f2str)
     def test_notebooks(self, n):
-        nb_path = pathlib.PurePath(n)
-        nb_rel_path = nb_path.relative_to(BOOK_DIR)
-        os.chdir(str(nb_path.parent))
-        with open(n) as f:
-            try:
-                nb = nbformat.read(f, as_version=4)
-            except json.read.NotJSONError:
-                self.fail(f'Notebook is not valid JSON: {nb_rel_path}.\n')
-            except json.decoder.JSONDecodeError:
-                self.fail(f'Unable to parse notebook {nb_rel_path}.\n')
-
-            ep = ExecutePreprocessor(timeout=int(TIMEOUT), kernel_name=KERNEL)
-            try:
-                ep.preprocess(nb, {'metadata': {'path': RUN_PATH}})
-            except CellExecutionError as e:
-                trb = e.traceback
-
-                # If SNOPT is not available during PR builds, then don't raise an error.
-                # SNOPT is only available during merge to main.
-                GITHUB_EV = os.environ.get("GITHUB_EVENT_NAME")
-                PR = GITHUB_EV and GITHUB_EV == "pull_request"
-                if not (PR and 'Optimizer SNOPT is not available' in trb):
-                    self.fail(f'{nb_rel_path} failed due to exception.\n{trb}')
-            except TimeoutError:
-                self.fail(f'Timeout executing the notebook {n}.\n')
-            finally:
-                # This is where we could optionally write the notebook to an output file
-                # with open(n_out + '.ipynb', mode='wt') as f:
-                #     nbformat.write(nb, f)
-                pass
+        result = self.results[pathlib.PurePath(n).relative_to(BOOK_DIR).as_posix()]
+        if result['status'] == 'failed':
+            self.fail(f"{result['path']} failed due to exception.\n{result['message']}")
 
 
 if __name__ == '__main__':
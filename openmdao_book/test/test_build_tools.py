@@ -0,0 +1,605 @@
+import unittest
+import importlib.util
+import io
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import build_jupyter_book
+import notebook_cell_cache
+import notebook_deps
+import notebook_profile
+import notebook_runner
+import notebook_scripts
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import notebook_lint
+
+sys.path.insert(0, str(REPO_ROOT / 'openmdao_book' / 'other'))
+
+import reset_notebook
+
+
+def _write_notebook(fname, cells):
+    nb = {"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 4}
+    with open(fname, 'w') as f:
+        json.dump(nb, f, indent=1)
+
+
+def _code_cell(source):
+    return {"cell_type": "code", "execution_count": None, "metadata": {}, "outputs": [],
+            "source": source}
+
+
+def _markdown_cell(source):
+    return {"cell_type": "markdown", "metadata": {}, "source": source}
+
+
+class TestNotebookFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.nb_path = os.path.join(self.tempdir, 'nb.ipynb')
+        _write_notebook(self.nb_path, [_markdown_cell(["# Title"]), _code_cell(["x = 1"])])
+        with open(os.path.join(self.tempdir, 'helper.py'), 'w') as f:
+            f.write('y = 2\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_markdown_change_keeps_fingerprint(self):
+        fp = build_jupyter_book.notebook_fingerprint(self.nb_path, '3.0')
+        _write_notebook(self.nb_path, [_markdown_cell(["# New title"]), _code_cell(["x = 1"])])
+        self.assertEqual(build_jupyter_book.notebook_fingerprint(self.nb_path, '3.0'), fp)
+
+    def test_inputs_change_fingerprint(self):
+        fp = build_jupyter_book.notebook_fingerprint(self.nb_path, '3.0')
+        self.assertNotEqual(build_jupyter_book.notebook_fingerprint(self.nb_path, '3.1'), fp)
+
+        with open(os.path.join(self.tempdir, 'helper.py'), 'w') as f:
+            f.write('y = 3\n')
+        fp_helper = build_jupyter_book.notebook_fingerprint(self.nb_path, '3.0')
+        self.assertNotEqual(fp_helper, fp)
+
+        _write_notebook(self.nb_path, [_markdown_cell(["# Title"]), _code_cell(["x = 2"])])
+        self.assertNotEqual(build_jupyter_book.notebook_fingerprint(self.nb_path, '3.0'),
+                            fp_helper)
+
+
+class TestCollectFilenames(unittest.TestCase):
+
+    def setUp(self):
+        self.book_dir = pathlib.Path(tempfile.mkdtemp())
+        for rel_path in ('intro.ipynb', 'other/template.ipynb', 'other/page.ipynb',
+                         'other/.ipynb_checkpoints/page-checkpoint.ipynb'):
+            (self.book_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            _write_notebook(self.book_dir / rel_path, [_code_cell(["x = 1"])])
+        (self.book_dir / '_config.yml').write_text(
+            'exclude_patterns : [_build, "**.ipynb_checkpoints", "template.ipynb"]\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.book_dir)
+
+    def test_exclude_patterns(self):
+        found = sorted(pathlib.Path(f).relative_to(self.book_dir).as_posix()
+                       for f in notebook_runner.collect_filenames(self.book_dir))
+        self.assertEqual(found, ['intro.ipynb', 'other/page.ipynb'])
+
+        fingerprints = build_jupyter_book.collect_fingerprints(self.book_dir)
+        self.assertEqual(sorted(fingerprints), found)
+
+
+class TestMirrorBook(unittest.TestCase):
+
+    def setUp(self):
+        self.book_dir = pathlib.Path(tempfile.mkdtemp())
+        self.work_root = pathlib.Path(tempfile.mkdtemp())
+        nb_dir = self.book_dir / 'section' / 'chapter'
+        (nb_dir / 'data').mkdir(parents=True)
+        (nb_dir / 'helper.py').write_text('x = 1\n')
+        (nb_dir / 'data' / 'input.txt').write_text('1\n')
+        (self.book_dir / 'section' / 'shared.py').write_text('y = 2\n')
+        self.nb_dir = nb_dir
+
+    def tearDown(self):
+        shutil.rmtree(self.book_dir)
+        shutil.rmtree(self.work_root)
+
+    def test_mirror(self):
+        run_path = notebook_runner.mirror_book(self.book_dir, self.nb_dir, self.work_root)
+
+        self.assertEqual(run_path, self.work_root / 'section' / 'chapter')
+        self.assertEqual((run_path / 'helper.py').read_text(), 'x = 1\n')
+        self.assertFalse((run_path / 'helper.py').is_symlink())
+        self.assertEqual((run_path / '..' / 'shared.py').read_text(), 'y = 2\n')
+
+        # files written by a notebook must not leak into the book
+        (run_path / 'helper.py').write_text('x = 3\n')
+        (run_path / 'cases.sql').write_text('')
+        self.assertEqual((self.nb_dir / 'helper.py').read_text(), 'x = 1\n')
+        self.assertFalse((self.nb_dir / 'cases.sql').exists())
+
+        # neither into its subdirectories
+        self.assertEqual((run_path / 'data' / 'input.txt').read_text(), '1\n')
+        (run_path / 'data' / 'input.txt').write_text('2\n')
+        (run_path / 'data' / 'output.txt').write_text('')
+        self.assertEqual((self.nb_dir / 'data' / 'input.txt').read_text(), '1\n')
+        self.assertFalse((self.nb_dir / 'data' / 'output.txt').exists())
+
+
+class TestWarmKernel(unittest.TestCase):
+
+    def setUp(self):
+        self.book_dir = pathlib.Path(tempfile.mkdtemp()).resolve()
+        self.kernel = notebook_runner.WarmKernel(clear_prefixes=(str(self.book_dir),))
+
+    def tearDown(self):
+        self.kernel.shutdown()
+        shutil.rmtree(self.book_dir)
+
+    def test_two_notebooks(self):
+        first = self.book_dir / 'first.ipynb'
+        second = self.book_dir / 'second.ipynb'
+        _write_notebook(first, [_code_cell([
+            "import os, sys, warnings\n",
+            "import numpy as np\n",
+            "x = 1\n",
+            "np.set_printoptions(precision=3)\n",
+            "warnings.simplefilter('error')\n",
+            "os.environ['NBR_TEST'] = '1'\n",
+            "sys.path.append('nowhere')"])])
+        _write_notebook(second, [_code_cell([
+            "import os, sys, warnings\n",
+            "import numpy as np\n",
+            "assert 'x' not in globals()\n",
+            "assert np.get_printoptions()['precision'] == 8\n",
+            "warnings.warn('not an error')\n",
+            "assert 'NBR_TEST' not in os.environ\n",
+            "assert 'nowhere' not in sys.path"])])
+
+        # the private directory of the first notebook is gone when the second one starts
+        results = [notebook_runner.run_notebook(nb, book_dir=self.book_dir, kernel=self.kernel)
+                   for nb in (first, second)]
+
+        self.assertEqual([(r['status'], r['message']) for r in results], [('passed', '')] * 2)
+        self.assertEqual(self.kernel.uses, 2)
+
+
+class TestRunNotebooks(unittest.TestCase):
+
+    def setUp(self):
+        self.book_dir = pathlib.Path(tempfile.mkdtemp()).resolve()
+
+    def tearDown(self):
+        shutil.rmtree(self.book_dir)
+
+    def test_worker_crash(self):
+        nb_path = self.book_dir / 'crash.ipynb'
+        # the kernel kills the worker process that started it
+        _write_notebook(nb_path, [_code_cell(["import os, signal\n",
+                                              "os.kill(os.getppid(), signal.SIGKILL)"])])
+
+        results = notebook_runner.run_notebooks([nb_path], book_dir=self.book_dir, jobs=1,
+                                                warm=False)
+
+        self.assertEqual([(r['path'], r['status']) for r in results], [('crash.ipynb', 'failed')])
+        self.assertIn('BrokenProcessPool', results[0]['message'])
+
+
+class TestNeedsCluster(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.nb_path = os.path.join(self.tempdir, 'nb.ipynb')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_needs_cluster(self):
+        _write_notebook(self.nb_path, [_markdown_cell(["%%px\n", "x = 1"]),
+                                       _code_cell(["x = 1\n", "%%px"])])
+        self.assertFalse(notebook_runner.needs_cluster(self.nb_path))
+
+        _write_notebook(self.nb_path, [_code_cell(["x = 1"]),
+                                       _code_cell(["\n", "%%px\n", "from mpi4py import MPI"])])
+        self.assertTrue(notebook_runner.needs_cluster(self.nb_path))
+
+
+class TestParallelDOEBenchmark(unittest.TestCase):
+
+    @unittest.skipUnless(importlib.util.find_spec('mpi4py'), 'mpi4py is not installed')
+    def test_single_engine(self):
+        # a cluster of one engine that is this process, in a subprocess to keep MPI out of the
+        # test process
+        code = '\n'.join([
+            'import json, parallel_doe_benchmark',
+            'class Cluster(object):',
+            '    num_engines = 1',
+            '    def apply(self, func, *args):',
+            '        return [func(*args)]',
+            'print(json.dumps(parallel_doe_benchmark.time_parallel_doe(Cluster(), (1,), 4, 0.)))',
+        ])
+        proc = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True,
+                              text=True)
+
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        results = json.loads(proc.stdout.splitlines()[-1])
+        self.assertEqual([(r['procs'], r['speedup']) for r in results], [(1, 1.)])
+
+
+class TestCompareTimings(unittest.TestCase):
+
+    def _result(self, path, wall_time, status='passed'):
+        return {'path': path, 'status': status, 'message': '', 'wall_time': wall_time,
+                'cpu_time': None, 'peak_rss': None, 'cells': []}
+
+    def test_compare(self):
+        baseline = [self._result('fast.ipynb', 0.1), self._result('same.ipynb', 10.),
+                    self._result('slow.ipynb', 5.), self._result('failed.ipynb', 5.)]
+        results = [self._result('fast.ipynb', 1.), self._result('same.ipynb', 12.),
+                   self._result('slow.ipynb', 11.), self._result('failed.ipynb', 20., 'failed'),
+                   self._result('new.ipynb', 30.)]
+
+        slower = notebook_runner.compare_timings(results, baseline)
+
+        self.assertEqual(slower, [('slow.ipynb', 5., 11., 2.2)])
+
+
+class TestNotebookDeps(unittest.TestCase):
+
+    def setUp(self):
+        self.book_dir = pathlib.Path(tempfile.mkdtemp()).resolve()
+        self.nb_dir = self.book_dir / 'section' / 'chapter'
+        self.nb_dir.mkdir(parents=True)
+        (self.nb_dir / 'extcode_thing.py').write_text('print(1)\n')
+        (self.nb_dir / 'helper.py').write_text('from openmdao.test_suite.components.sellar '
+                                               'import SellarDis1\n')
+        (self.book_dir / 'section' / 'circuit.py').write_text('')
+        (self.book_dir / 'section' / 'unused.py').write_text('')
+        self.nb_path = self.nb_dir / 'nb.ipynb'
+        _write_notebook(self.nb_path, [
+            _code_cell(["%matplotlib inline\n", "import numpy as np\n", "import helper\n"]),
+            _code_cell(["cmd = ['python', 'extcode_thing.py', 'in.dat']"]),
+            _code_cell(["!openmdao tree ../circuit.py"]),
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.book_dir)
+
+    def test_dependencies(self):
+        files, modules = notebook_deps.notebook_dependencies(self.nb_path, self.book_dir)
+
+        self.assertEqual(files, {'section/chapter/extcode_thing.py', 'section/chapter/helper.py',
+                                 'section/chapter/in.dat', 'section/circuit.py'})
+        self.assertIn('numpy', modules)
+        self.assertIn('openmdao.test_suite.components.sellar', modules)
+        self.assertNotIn('helper', modules)
+
+    def test_affected(self):
+        graph = notebook_deps.build_graph(self.book_dir)
+        nb = 'section/chapter/nb.ipynb'
+
+        self.assertEqual(notebook_deps.affected_notebooks(graph, ['section/circuit.py'],
+                                                          self.book_dir), [nb])
+        self.assertEqual(notebook_deps.affected_notebooks(
+            graph, ['openmdao/test_suite/components/sellar.py'], self.book_dir), [nb])
+        self.assertEqual(notebook_deps.affected_notebooks(graph, ['section/unused.py'],
+                                                          self.book_dir), [])
+
+    def test_deleted_helper(self):
+        (self.nb_dir / 'helper.py').unlink()
+        (self.nb_dir / 'extcode_thing.py').unlink()
+        graph = notebook_deps.build_graph(self.book_dir)
+        nb = 'section/chapter/nb.ipynb'
+
+        self.assertEqual(notebook_deps.affected_notebooks(graph, ['section/chapter/helper.py'],
+                                                          self.book_dir), [nb])
+        self.assertEqual(notebook_deps.affected_notebooks(
+            graph, ['section/chapter/extcode_thing.py'], self.book_dir), [nb])
+
+    def test_changed_since(self):
+        def git(*args):
+            subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@test',
+                            *args], cwd=self.book_dir, check=True, capture_output=True)
+
+        git('init', '-q')
+        (self.book_dir / '.gitignore').write_text('*.sql\n')
+        git('add', '.')
+        git('commit', '-q', '-m', 'first')
+
+        (self.book_dir / 'section' / 'circuit.py').write_text('x = 1\n')
+        (self.nb_dir / 'new_helper.py').write_text('')
+        (self.nb_dir / 'cases.sql').write_text('')
+
+        self.assertEqual(sorted(notebook_deps.changed_since('HEAD', self.book_dir)),
+                         ['section/chapter/new_helper.py', 'section/circuit.py'])
+
+
+class TestNotebookLint(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_all_violations(self):
+        nb_path = os.path.join(self.tempdir, 'nb.ipynb')
+        executed = _code_cell(["assert x == 1"])
+        executed['execution_count'] = 1
+        _write_notebook(nb_path, [_code_cell(["import openmdao.api as om"]), executed,
+                                  _code_cell(["assert y == 2"])])
+
+        results = notebook_lint.lint_files([nb_path], jobs=2)[nb_path]
+
+        self.assertEqual(len(results['output']), 1)
+        self.assertEqual(len(results['header']), 1)
+        self.assertEqual(len(results['assert']), 2)
+
+    def test_custom_rule(self):
+        nb_path = os.path.join(self.tempdir, 'nb.ipynb')
+        _write_notebook(nb_path, [_markdown_cell(["# Title"])])
+
+        def count_cells(file, nb):
+            return [f"{len(nb['cells'])} cells in {file}"]
+
+        results = notebook_lint.lint_notebook(nb_path, {'count': count_cells})
+
+        self.assertEqual(results, {'count': [f"1 cells in {nb_path}"]})
+
+
+class TestResetNotebook(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tempdir, 'sub', '_build'))
+        executed = _code_cell(["x = 1"])
+        executed['execution_count'] = 1
+        self.dirty = os.path.join(self.tempdir, 'sub', 'dirty.ipynb')
+        self.clean = os.path.join(self.tempdir, 'clean.ipynb')
+        _write_notebook(self.dirty, [executed, _code_cell([])])
+        _write_notebook(self.clean, [_code_cell(["x = 1"])])
+        _write_notebook(os.path.join(self.tempdir, 'sub', '_build', 'built.ipynb'), [executed])
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_find_notebooks(self):
+        found, missing = reset_notebook.find_notebooks([self.tempdir,
+                                                        os.path.join(self.tempdir, '*.ipynb'),
+                                                        os.path.join(self.tempdir, 'nope')])
+
+        self.assertEqual(sorted(found), sorted([self.clean, self.dirty]))
+        self.assertEqual(missing, [os.path.join(self.tempdir, 'nope.ipynb')])
+
+    def test_check_and_reset(self):
+        with open(self.dirty) as f:
+            before = f.read()
+
+        changed = reset_notebook.reset_notebooks([self.clean, self.dirty], dryrun=True, jobs=2)
+
+        self.assertEqual(changed, [self.dirty])
+        with open(self.dirty) as f:
+            self.assertEqual(f.read(), before)
+
+        changed = reset_notebook.reset_notebooks([self.clean, self.dirty], jobs=2)
+
+        self.assertEqual(changed, [self.dirty])
+        with open(self.dirty) as f:
+            cells = json.load(f)['cells']
+        self.assertEqual(len(cells), 1)
+        self.assertIsNone(cells[0]['execution_count'])
+        self.assertEqual(reset_notebook.reset_notebooks([self.clean, self.dirty]), [])
+
+
+class TestCellCache(unittest.TestCase):
+
+    def setUp(self):
+        self.book_dir = pathlib.Path(tempfile.mkdtemp()).resolve()
+        self.cache_dir = pathlib.Path(tempfile.mkdtemp()).resolve()
+        self.nb_path = self.book_dir / 'nb.ipynb'
+        (self.book_dir / 'helper.py').write_text('y = 2\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.book_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def test_cell_keys(self):
+        cells = [_code_cell(["x = 1"]), _markdown_cell(["# Title"]), _code_cell(["y = 2"]),
+                 _code_cell(["z = 3"])]
+        keys = notebook_cell_cache.cell_keys({'cells': cells}, 'env')
+        self.assertIsNone(keys[1])
+        self.assertEqual(len(set(keys)), 4)
+
+        # a change only affects the keys of the cells from the changed one onward
+        cells[2] = _code_cell(["y = 4"])
+        new_keys = notebook_cell_cache.cell_keys({'cells': cells}, 'env')
+        self.assertEqual(new_keys[:2], keys[:2])
+        self.assertNotEqual(new_keys[2], keys[2])
+        self.assertNotEqual(new_keys[3], keys[3])
+
+        self.assertNotEqual(notebook_cell_cache.cell_keys({'cells': cells}, 'env2')[0],
+                            new_keys[0])
+
+    def test_environment_key(self):
+        _write_notebook(self.nb_path, [_code_cell(["x = 1"])])
+        key = notebook_cell_cache.environment_key(self.nb_path, self.book_dir)
+        (self.book_dir / 'helper.py').write_text('y = 3\n')
+        self.assertNotEqual(notebook_cell_cache.environment_key(self.nb_path, self.book_dir), key)
+
+        # e.g. a new NumPy version
+        key = notebook_cell_cache.environment_key(self.nb_path, self.book_dir)
+        installed_packages = notebook_cell_cache.installed_packages
+        notebook_cell_cache.installed_packages = lambda: 'numpy==0.0\n'
+        try:
+            self.assertNotEqual(notebook_cell_cache.environment_key(self.nb_path, self.book_dir),
+                                key)
+        finally:
+            notebook_cell_cache.installed_packages = installed_packages
+
+    def test_replay_unchanged(self):
+        import nbformat
+
+        _write_notebook(self.nb_path, [_markdown_cell(["# Title"]), _code_cell(["print(1)"])])
+        nb = nbformat.read(str(self.nb_path), as_version=4)
+
+        cache = notebook_cell_cache.CellCache(self.cache_dir, self.nb_path, self.book_dir)
+        self.assertEqual(cache.restore(None, nb, self.book_dir), 0)
+        nb.cells[1].outputs = [nbformat.v4.new_output('stream', name='stdout', text='1\n')]
+        nb.cells[1].execution_count = 1
+        cache.store(None, 1, nb.cells[1], 0.0, self.book_dir)
+        cache.save()
+
+        # nothing changed, so every cell is replayed without a kernel
+        nb = nbformat.read(str(self.nb_path), as_version=4)
+        cache = notebook_cell_cache.CellCache(self.cache_dir, self.nb_path, self.book_dir)
+        self.assertEqual(cache.restore(None, nb, self.book_dir), 2)
+        self.assertEqual(cache.replayed, 1)
+        self.assertEqual(nb.cells[1].outputs[0].text, '1\n')
+        self.assertEqual(nb.cells[1].execution_count, 1)
+
+        # without a snapshot, a changed cell means executing the notebook from the start
+        _write_notebook(self.nb_path, [_code_cell(["print(1)"]), _code_cell(["print(2)"])])
+        nb = nbformat.read(str(self.nb_path), as_version=4)
+        cache = notebook_cell_cache.CellCache(self.cache_dir, self.nb_path, self.book_dir)
+        self.assertEqual(cache.restore(None, nb, self.book_dir), 0)
+
+
+class TestNotebookScripts(unittest.TestCase):
+
+    def setUp(self):
+        self.book_dir = pathlib.Path(tempfile.mkdtemp()).resolve()
+        self.nb_dir = self.book_dir / 'section'
+        self.nb_dir.mkdir()
+        (self.nb_dir / 'helper.py').write_text('x = 1\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.book_dir)
+
+    def test_convert(self):
+        nb = {'cells': [
+            _code_cell(["try:\n", "    import helper\n", "except ImportError:\n",
+                        "    !python -m pip install helper\n", "    import helper"]),
+            _markdown_cell(["# Title"]),
+            _code_cell(["%matplotlib inline\n", "y = helper.x + 1"]),
+            _code_cell(["%%time\n", "z = 2"]),
+            _code_cell(["raise RuntimeError()"]),
+        ]}
+        nb['cells'][2]['metadata']['tags'] = ['remove-input']
+        nb['cells'][4]['metadata']['tags'] = ['raises-exception']
+
+        script, reason = notebook_scripts.notebook_to_script(nb, 'nb.ipynb')
+
+        self.assertIsNone(reason)
+        compile(script, 'nb.py', 'exec')
+        self.assertIn("    pass  # !python -m pip install helper\n", script)
+        self.assertIn('# %% [2] tags=["remove-input"]\npass  # %matplotlib inline\n', script)
+        self.assertIn("# %% [3] skipped %%time\n", script)
+        self.assertIn('# %% [4] tags=["raises-exception"] skipped\n', script)
+
+        script, _ = notebook_scripts.notebook_to_script(nb, 'nb.ipynb', skip_tags=['remove-input'])
+        self.assertNotIn('y = helper.x + 1', script)
+
+        nb['cells'].append(_code_cell(["%%px\n", "import mpi4py"]))
+        _, reason = notebook_scripts.notebook_to_script(nb, 'nb.ipynb')
+        self.assertIn('ipyparallel', reason)
+
+    def test_run(self):
+        passing = self.nb_dir / 'passing.ipynb'
+        failing = self.nb_dir / 'failing.ipynb'
+        _write_notebook(passing, [_code_cell(["!echo hi\n", "import helper\n",
+                                              "open('out.txt', 'w').close()"]),
+                                  _code_cell(["assert helper.x == 1"])])
+        _write_notebook(failing, [_code_cell(["assert False, 'oops'"])])
+        save_dir = self.book_dir / 'scripts'
+
+        results = notebook_scripts.run_scripts([passing, failing], book_dir=self.book_dir, jobs=2,
+                                               keep_script=save_dir)
+
+        self.assertEqual([(r['path'], r['status']) for r in results],
+                         [('section/failing.ipynb', 'failed'), ('section/passing.ipynb', 'passed')])
+        self.assertIn('AssertionError: oops', results[0]['message'])
+        self.assertTrue((save_dir / 'section' / 'passing.py').is_file())
+        # the script runs in a private copy of the directory
+        self.assertFalse((self.nb_dir / 'out.txt').exists())
+
+
+class TestNotebookProfile(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = pathlib.Path(tempfile.mkdtemp()).resolve()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_builds_problem(self):
+        nb_path = self.tempdir / 'nb.ipynb'
+        _write_notebook(nb_path, [_markdown_cell(["prob = om.Problem()"]),
+                                  _code_cell(["from openmdao.api import Problem"])])
+        self.assertFalse(notebook_profile.builds_problem(nb_path))
+
+        _write_notebook(nb_path, [_code_cell(["import openmdao.api as om\n",
+                                              "prob = om.Problem(reports=None)"])])
+        self.assertTrue(notebook_profile.builds_problem(nb_path))
+
+    def test_cprofile_report(self):
+        import cProfile
+
+        # functions that look like they are defined in the openmdao package
+        namespace = {}
+        code = "def _setup_procs(n):\n    return sum(range(n))\n"
+        exec(compile(code, '/site-packages/openmdao/core/group.py', 'exec'), namespace)
+        exec(compile(code.replace('_setup', '_other'), '/openmdao_book/openmdao/helper.py',
+                     'exec'), namespace)
+
+        for name, calls in (('a', 1), ('b', 3)):
+            profiler = cProfile.Profile()
+            profiler.enable()
+            for i in range(calls):
+                namespace['_setup_procs'](1000)
+                namespace['_other_procs'](1000)
+            profiler.disable()
+            profiler.dump_stats(str(self.tempdir / f'{name}.prof'))
+
+        filenames = notebook_profile.find_profiles(self.tempdir)
+        totals = notebook_profile.cprofile_totals(filenames)
+
+        self.assertEqual(list(totals), ['openmdao/core/group.py:1(_setup_procs)'])
+        tot = totals['openmdao/core/group.py:1(_setup_procs)']
+        self.assertEqual(tot['calls'], 4)
+        self.assertEqual(tot['notebooks'], 2)
+
+        out = io.StringIO()
+        notebook_profile.profile_report(filenames, self.tempdir, out)
+        self.assertIn('cProfile of 2 notebooks', out.getvalue())
+        self.assertIn('openmdao/core/group.py:1(_setup_procs)', out.getvalue())
+        self.assertTrue((self.tempdir / notebook_profile.MERGED_FILE).is_file())
+
+    def test_iprofile_totals(self):
+        with open(self.tempdir / 'nb.iprof', 'w') as f:
+            f.write("$total 2 3.0\n"
+                    "$total|<Problem#1.setup> 1 2.0\n"
+                    "$total|<Problem#1.setup>|.<Group._setup_procs> 1 1.5\n"
+                    "$total|<Problem#1.setup>|.<Group._setup_procs>|"
+                    "sub.<Group._setup_procs> 2 1.0\n"
+                    "$total|<Problem#1.setup>|comp.<ExecComp.setup> 1 0.25\n")
+
+        totals = notebook_profile.iprofile_totals([self.tempdir / 'nb.iprof'])
+
+        self.assertEqual(totals['Problem.setup']['cumtime'], 2.0)
+        # the calls on the subgroup happened within the call on the model
+        self.assertEqual(totals['Group._setup_procs']['cumtime'], 1.5)
+        self.assertEqual(totals['Group._setup_procs']['calls'], 3)
+        self.assertEqual(totals['ExecComp.setup']['cumtime'], 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Measure the speedup of a DOEDriver that runs its cases in parallel under MPI.
+
+A local cluster of MPI engines is started, as notebook_runner does for the MPI notebooks, and the
+same DOE is run on the first 1, 2, 4, ... engines. The model is a Paraboloid whose compute takes a
+fixed time, either sleeping (as a model waiting on an external code would) or spinning the CPU
+(as a model computing in Python would). Spinning only shows a speedup when there are at least as
+many CPUs as engines. Like the MPI notebooks, this needs mpi4py and petsc4py.
+"""
+import argparse
+import json
+import sys
+
+from notebook_runner import MPI_ENGINES, LocalCluster
+
+
+def _time_doe(num_procs, num_cases, delay, busy):
+    """
+    Run the DOE on the first num_procs engines and return its wall time on the first one.
+
+    This runs on every engine of the cluster, and the engines not taking part return None.
+    """
+    # imported here since this function is sent to the engines without its module
+    import time
+
+    from mpi4py import MPI
+
+    import openmdao.api as om
+
+    comm = MPI.COMM_WORLD
+    sub = comm.Split(0 if comm.rank < num_procs else MPI.UNDEFINED, comm.rank)
+    if sub == MPI.COMM_NULL:
+        return None
+
+    class SlowParaboloid(om.ExplicitComponent):
+
+        def setup(self):
+            self.add_input('x', val=0.0)
+            self.add_input('y', val=0.0)
+            self.add_output('f_xy', val=0.0)
+
+        def compute(self, inputs, outputs):
+            start = time.perf_counter()
+            if busy:
+                while time.perf_counter() - start < delay:
+                    pass
+            else:
+                time.sleep(delay)
+
+            x = inputs['x']
+            y = inputs['y']
+            outputs['f_xy'] = (x - 3.0)**2 + x * y + (y + 4.0)**2 - 3.0
+
+    prob = om.Problem(comm=sub, reports=None)
+    prob.model.add_subsystem('comp', SlowParaboloid(), promotes=['*'])
+    prob.model.add_design_var('x', lower=0.0, upper=1.0)
+    prob.model.add_design_var('y', lower=0.0, upper=1.0)
+    prob.model.add_objective('f_xy')
+
+    prob.driver = om.DOEDriver(om.UniformGenerator(num_samples=num_cases, seed=0))
+    prob.driver.options['run_parallel'] = True
+    prob.driver.options['procs_per_model'] = 1
+
+    prob.setup()
+    prob.final_setup()
+
+    sub.barrier()
+    start = time.perf_counter()
+    prob.run_driver()
+    elapsed = sub.allreduce(time.perf_counter() - start, op=MPI.MAX)
+
+    prob.cleanup()
+    rank = sub.rank
+    sub.Free()
+
+    return elapsed if rank == 0 else None
+
+
+def time_parallel_doe(cluster, procs=(1, 2, 4), num_cases=32, delay=0.05, busy=False):
+    """
+    Time the same DOE on an increasing number of MPI processes.
+
+    Parameters
+    ----------
+    cluster : LocalCluster
+        A running cluster, with at least max(procs) engines.
+    procs : iter of int
+        Numbers of processes to run the DOE on.
+    num_cases : int
+        Number of cases of the DOE.
+    delay : float
+        Time in seconds taken by each evaluation of the model.
+    busy : bool
+        If True, the model spins the CPU for delay seconds instead of sleeping.
+
+    Returns
+    -------
+    list of dict
+        The number of 'procs', the 'wall_time' of run_driver, and the 'speedup' and
+        'efficiency' relative to the first number of processes, for each number of processes.
+    """
+    results = []
+    for num_procs in procs:
+        if num_procs > cluster.num_engines:
+            raise ValueError(f"Can't run on {num_procs} processes with a cluster of "
+                             f"{cluster.num_engines} engines.")
+        wall_time = cluster.apply(_time_doe, num_procs, num_cases, delay, busy)[0]
+        results.append({'procs': num_procs, 'wall_time': wall_time})
+
+    base = results[0]
+    for res in results:
+        res['speedup'] = base['wall_time'] / res['wall_time']
+        res['efficiency'] = res['speedup'] * base['procs'] / res['procs']
+
+    return results
+
+
+def report(results, out=None):
+    """
+    Print a table of the results of time_parallel_doe.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results of time_parallel_doe.
+    out : file or None
+        Stream to write to. Defaults to stdout.
+    """
+    print(f"{'procs':>6}{'wall time':>12}{'speedup':>10}{'efficiency':>12}", file=out)
+    for res in results:
+        print(f"{res['procs']:6d}{res['wall_time']:12.3f}{res['speedup']:10.2f}"
+              f"{res['efficiency']:12.2f}", file=out)
+
+
+def parallel_doe_benchmark_cmd():
+    """
+    Run the parallel DOE benchmark for the numbers of processes given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Measure the speedup of a DOE run in parallel '
+                                                 'on a local cluster of MPI engines.')
+    parser.add_argument('procs', nargs='*', type=int, default=[1, 2, MPI_ENGINES],
+                        help=f'Numbers of processes (default is 1, 2 and {MPI_ENGINES}).')
+    parser.add_argument('-n', '--num-cases', type=int, default=32,
+                        help='Number of cases of the DOE (default is 32).')
+    parser.add_argument('-d', '--delay', type=float, default=0.05,
+                        help='Time in seconds taken by each model evaluation (default is 0.05).')
+    parser.add_argument('--busy', action='store_true',
+                        help='Spin the CPU during each model evaluation instead of sleeping.')
+    parser.add_argument('-o', '--output', action='store', default=None,
+                        help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    with LocalCluster(max(args.procs)) as cluster:
+        results = time_parallel_doe(cluster, args.procs, args.num_cases, args.delay, args.busy)
+
+    report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == '__main__':
+    sys.exit(parallel_doe_benchmark_cmd())